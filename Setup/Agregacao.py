@@ -0,0 +1,117 @@
+import numpy as np
+
+# Agregações oferecidas na seção Barras (nome -> quantil, quando for um quantil)
+AGGREGATIONS = ("soma", "média", "contagem", "desvio", "mediana", "p05", "p25", "p75", "p95")
+QUANTILE_AGGREGATIONS = {"mediana": 0.5, "p05": 0.05, "p25": 0.25, "p75": 0.75, "p95": 0.95}
+MAX_GROUPS = 50  # Acima disso a estratificação é ignorada
+
+
+class BarResult:
+    """Barras agregadas: posição de cada categoria de X e valor (e erro) por grupo."""
+
+    def __init__(self, positions, values, errors=None, group_labels=None):
+        self.positions = positions  # Posição no eixo X de cada categoria
+        self.values = values  # Array (grupos, categorias); NaN onde o grupo não tem linhas
+        self.errors = errors  # Array (grupos, 2, categorias) com as distâncias abaixo/acima, ou None
+        self.group_labels = group_labels
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in (self.positions, self.values, self.errors) if values is not None)
+
+
+def group_codes(dataset, name, mask):
+    """Códigos 0..n-1 da coluna nas linhas da máscara, posições no eixo e rótulos.
+
+    Colunas numéricas ficam na sua própria posição (valores distintos ordenados);
+    categóricas usam os códigos em cache do dataset com rótulos nos ticks.
+    """
+    if dataset.is_numeric(name):
+        positions, codes = np.unique(dataset.numeric(name)[mask], return_inverse=True)
+        return codes.ravel(), positions, None
+
+    codes, labels = dataset.encoded(name)
+    return codes[mask], np.arange(len(labels)), labels
+
+
+def grouped_quantiles(cells, values, n_cells, quantiles):
+    """Quantis (interpolação linear, como np.quantile) de values em cada célula, com uma única ordenação.
+
+    Retorna um array (len(quantiles), n_cells); células sem linhas ficam como NaN.
+    """
+    order = np.lexsort((values, cells))
+    sorted_values = values[order]
+    counts = np.bincount(cells, minlength=n_cells)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((len(quantiles), n_cells), np.nan)
+    has_rows = counts > 0
+    for row, q in enumerate(quantiles):
+        position = starts[has_rows] + q * (counts[has_rows] - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        result[row, has_rows] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+    return result
+
+
+def aggregate(cells, values, n_cells, funcao):
+    """Valor e erro (None ou array (2, n_cells)) de cada célula para a agregação escolhida."""
+    counts = np.bincount(cells, minlength=n_cells).astype(float)
+    empty = counts == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if funcao == "contagem":
+            return counts, None
+        sums = np.bincount(cells, weights=values, minlength=n_cells)
+        if funcao == "soma":
+            sums[empty] = np.nan
+            return sums, None
+
+        means = sums / counts
+        # Segunda passagem sobre os desvios: soma dos quadrados - n·média² perde a precisão com valores grandes
+        squares = np.bincount(cells, weights=(values - means[cells]) ** 2, minlength=n_cells)
+        std = np.sqrt(squares / (counts - 1))
+        std[counts < 2] = np.nan
+        if funcao == "média":
+            return means, np.vstack([std, std])  # Média ± desvio padrão
+        if funcao == "desvio":
+            return std, None
+
+    if funcao not in QUANTILE_AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {funcao}")
+    if funcao != "mediana":
+        return grouped_quantiles(cells, values, n_cells, [QUANTILE_AGGREGATIONS[funcao]])[0], None
+    # Mediana com barras de erro do intervalo interquartil
+    q25, median, q75 = grouped_quantiles(cells, values, n_cells, [0.25, 0.5, 0.75])
+    return median, np.vstack([median - q25, q75 - median])
+
+
+def aggregate_bars(dataset, x_name, height_name, group_name=None, funcao="soma"):
+    """Agrupa height por X (e pelo grupo de estratificação) com operações vetorizadas.
+
+    Linhas com X, altura ou grupo nulos são ignoradas. Retorna (BarResult, rótulos de X).
+    """
+    mask = dataset.valid_mask(x_name) & dataset.valid_mask(height_name)
+    strata, group_labels = None, None
+    if group_name:
+        codes, labels = dataset.encoded(group_name)
+        if len(labels) > MAX_GROUPS:
+            print(f"Estratificação ignorada: {group_name} tem mais de {MAX_GROUPS} categorias.")
+        elif labels:
+            mask = mask & (codes >= 0)
+            strata = codes[mask]
+            group_labels = [labels[code] for code in range(len(labels))]
+
+    x_codes, positions, x_labels = group_codes(dataset, x_name, mask)
+    values = dataset.numeric(height_name)[mask]
+    n_x = len(positions)
+    n_groups = len(group_labels) if group_labels else 1
+
+    cells = x_codes.astype(np.int64)
+    if strata is not None:
+        cells = strata.astype(np.int64) * n_x + cells
+
+    result, errors = aggregate(cells, values, n_groups * n_x, funcao)
+    if errors is not None:
+        errors = errors.reshape(2, n_groups, n_x).transpose(1, 0, 2)
+    return BarResult(positions, result.reshape(n_groups, n_x), errors, group_labels), x_labels
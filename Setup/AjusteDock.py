@@ -6,6 +6,7 @@ class AjusteDock(QDockWidget):
     """Janela flutuante com um QToolBox para ajustes"""
     def __init__(self, parent=None):
         super().__init__("Ajustes de Modelos RNA", parent)
+        self.setObjectName("ajuste_dock")
 
         self.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
         self.setFloating(True)  # Permite que o Dock fique independente
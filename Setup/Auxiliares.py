@@ -1,18 +1,21 @@
-import pickle
 from functools import partial
 
-from PyQt5.QtGui import QStandardItem, QStandardItemModel
+from PyQt5.QtGui import QStandardItemModel
 from PyQt5.QtWidgets import QButtonGroup, QInputDialog, QHBoxLayout, QSpinBox, QGridLayout, QLabel, QDoubleSpinBox, \
-    QComboBox, QAbstractItemView, QTableWidgetItem, QMdiSubWindow, QTableWidget, QVBoxLayout, QWidget, QMdiArea, \
-    QTextEdit
+    QComboBox, QAbstractItemView, QMdiSubWindow, QVBoxLayout, QWidget, QMdiArea, \
+    QTextEdit, QTableView
 from PyQt5.QtWidgets import QMenu, QAction, QFileDialog, QTreeView, QFileSystemModel
 from PyQt5.QtCore import QDir, Qt, QSettings, QTimer
 import os, sys
-import pandas as pd
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 from Setup.AjusteDock import open_ajuste_dock
-from Setup.GraficosDock import open_graficos_dock
+from Setup.Camadas import SPEC_PATH_ROLE, get_layer_registry
+from Setup.IndiceArquivos import DataFileSystemModel, dimension_text, workbook_sheets
+from Setup.Leitores import is_supported, source_label, supported_extensions
+from Setup.TabelaModel import create_table_view
+
+# Carregamento, Datasets, Perfil, Especificacoes e GraficosDock são importados nas funções que
+# os usam: pandas e matplotlib só carregam quando a primeira tabela ou gráfico é aberto
 
 
 class CustomMdiSubWindow(QMdiSubWindow):
@@ -30,22 +33,20 @@ def resource_path(relative_path):
 
 
 def setup_file_browser(tree_view, opened_subwindows, mdi_area):
-    """QTreeView setup file browser"""
-    model = QFileSystemModel()
-    model.setRootPath('')  # Root system
+    """QTreeView setup file browser (project folder only, supported table formats only)"""
+    model = DataFileSystemModel(tree_view)
 
-    # Configuração do TreeView
+    # Configuração do TreeView: a raiz é a pasta do projeto (ou o diretório atual até um projeto ser aberto),
+    # assim o QFileSystemModel não observa o sistema de arquivos inteiro
     tree_view.setModel(model)
-    tree_view.setRootIndex(model.index(''))  # Initial root
+    tree_view.setRootIndex(model.set_project(getattr(tree_view.window(), 'project_folder', None) or os.getcwd()))
     tree_view.setSortingEnabled(True)
 
-    # Oculta colunas desnecessárias
-    tree_view.hideColumn(1)  # Oculta coluna "Tamanho"
-    tree_view.hideColumn(2)  # Oculta coluna "Tipo"
+    # Colunas: nome, tamanho e dimensões (linhas × colunas, do índice de metadados)
     tree_view.hideColumn(3)  # Oculta coluna "Data de modificação"
 
     tree_view.setDragEnabled(True)  # Enable dragging from file browser
-    tree_view.setSelectionMode(QAbstractItemView.SingleSelection)
+    tree_view.setSelectionMode(QAbstractItemView.ExtendedSelection)  # Several files can be dragged/imported at once
     tree_view.setDefaultDropAction(Qt.MoveAction)
 
     # Habilita o menu de contexto
@@ -60,7 +61,9 @@ def update_file_browser_root(tree_view, new_root):
     """Update the root directory of the file browser."""
     model = tree_view.model()
 
-    if isinstance(model, QFileSystemModel):
+    if isinstance(model, DataFileSystemModel):
+        tree_view.setRootIndex(model.set_project(new_root))  # Root path and metadata index of the project
+    elif isinstance(model, QFileSystemModel):
         model.setRootPath(new_root)  # Update the model's root path
         tree_view.setRootIndex(model.index(new_root))
 
@@ -84,6 +87,19 @@ def show_context_menu(tree_view, point, opened_subwindows, mdi_area):
         create_folder_action.triggered.connect(partial(create_new_folder, tree_view, point))
         context_menu.addAction(create_folder_action)
 
+        # Importa todas as tabelas da pasta (e subpastas) em paralelo
+        import_folder_action = QAction("Importar Pasta", tree_view)
+        import_folder_action.triggered.connect(
+            lambda: bulk_import(tree_view.window(), [tree_view.model().filePath(index)]))
+        context_menu.addAction(import_folder_action)
+
+    # Vários arquivos selecionados: importação em paralelo
+    selected_paths = [tree_view.model().filePath(row) for row in tree_view.selectionModel().selectedRows(0)]
+    if len(selected_paths) > 1:
+        import_selected_action = QAction(f"Importar Selecionados ({len(selected_paths)})", tree_view)
+        import_selected_action.triggered.connect(lambda: bulk_import(tree_view.window(), selected_paths))
+        context_menu.addAction(import_selected_action)
+
     # Adiciona a ação de 'Abrir Arquivo'
     open_file_action = QAction("Visualizar Arquivo", tree_view)
     open_file_action.triggered.connect(lambda: add_layer_from_file(tree_view, point, opened_subwindows, mdi_area))  # No need for point
@@ -153,37 +169,60 @@ def handle_drag_move(event):
 
 
 def handle_drop(event, tree_view, mdi_area, opened_subwindows):
-    """Handle the drop event: Add file to layers and open it"""
+    """Handle the drop event: Add file to layers and open it (several files or folders are imported in parallel)"""
     mime_data = event.mimeData()
 
     if mime_data.hasUrls():
-        for url in mime_data.urls():
-            file_path = url.toLocalFile()
-            if file_path.endswith(".xlsx"):  # Ensure only Excel files are handled
-                add_layer_file(tree_view, file_path)
-                load_excel(file_path, mdi_area, opened_subwindows)  # Open the Excel file in MDI area
+        paths = [url.toLocalFile() for url in mime_data.urls()]
+        if len(paths) > 1 or any(os.path.isdir(path) for path in paths):
+            bulk_import(tree_view.window(), paths)
+        else:
+            for file_path in paths:
+                if is_supported(file_path):  # Ensure only supported table formats are handled
+                    open_layer_file(tree_view, file_path, mdi_area, opened_subwindows)
         event.acceptProposedAction()
 
 
+def bulk_import(main_window, paths):
+    """Imports many files/folders in a process pool, adding each layer to the tree as it finishes"""
+    from Setup.Importacao import get_import_manager
+    return get_import_manager(main_window).start(paths)
+
+
 def add_layer_file(tree_view, file_path):
-    """Add file to a QStandardItemModel instead of QFileSystemModel"""
+    """Add file to a QStandardItemModel instead of QFileSystemModel (once per file)
+
+    Workbooks with several sheets get one child layer per sheet (names read from the workbook metadata).
+    Returns the list of layers.
+    """
     model = tree_view.model()
 
     # Ensure the model is a QStandardItemModel
     if not isinstance(model, QStandardItemModel):
         print("Error: The model is not a QStandardItemModel")
-        return
+        return []
+
+    # The registry appends the row and notifies the docks (no widget is rebuilt)
+    registry = get_layer_registry(tree_view.window())
+    sheets = workbook_sheets(file_path)
+    if len(sheets) < 2:
+        return [registry.add_layer(file_path)]
 
-    # Create the item with the file name
-    item = QStandardItem(file_path.split("/")[-1])
-    item.setData(file_path, Qt.UserRole)  # Store the full file path in the item data
-    item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+    layers = registry.add_workbook(file_path, [sheet["nome"] for sheet in sheets])
+    for layer, sheet in zip(layers, sheets):
+        if dimension_text(sheet):
+            layer.item.setData(f"{dimension_text(sheet)} (linhas × colunas)", Qt.ToolTipRole)
+    return layers
 
-    # Add the item to the root of the model
-    model.appendRow(item)
 
-    # Optionally refresh the tree view
-    tree_view.update()  # Force the tree view to refresh
+def open_layer_file(tree_view, file_path, mdi_area, opened_subwindows):
+    """Adds the file to the layers and opens its table; sheets of a workbook are only read when used"""
+    layers = add_layer_file(tree_view, file_path)
+    if len(layers) == 1:
+        load_excel(layers[0].path, mdi_area, opened_subwindows)  # Open the Excel file in MDI area
+    elif layers:
+        status_bar_message(tree_view.window().statusbar,
+                           f"{os.path.basename(file_path)}: {len(layers)} planilhas. Abra uma planilha para carregá-la.")
 
 
 
@@ -195,35 +234,127 @@ def add_layer_from_file(tree_view, point, opened_subwindows, mdi_area):
     # Get the file path of the item clicked
     file_path = tree_view.model().filePath(index)
 
-    # Check if it's a valid file and ends with .xlsx
-    if file_path.endswith(".xlsx"):
-        add_layer_file(tree_view, file_path)
-        load_excel(file_path, mdi_area, opened_subwindows)
+    # Check if it's a valid file in one of the supported formats
+    if is_supported(file_path):
+        open_layer_file(tree_view.window().content, file_path, mdi_area, opened_subwindows)  # Layers tree
     else:
-        print("Only .xlsx files are supported!")
+        print(f"Only {', '.join(supported_extensions())} files are supported!")
+
+
+def load_excel(file_path, mdi_area, opened_subwindows, on_loaded=None):
+    """Load table data (Excel, CSV, Parquet, Feather) in a background worker and display it in the MDI area.
+
+    The reader is picked by extension from Setup.Leitores. on_loaded(dataset) is called once the data is registered.
+
+    Large sheets arrive in blocks: the window opens with the first block and is filled progressively.
+    """
+    from Setup.Carregamento import get_load_manager
+
+    load_manager = get_load_manager(mdi_area.window())
+    state = {'window': None, 'model': None, 'worker': None}
+
+    def on_window_destroyed():
+        # Fechar a janela durante a leitura cancela o carregamento (se nenhum dock também espera por ele)
+        state['window'] = state['model'] = None
+        if state['worker']:
+            load_manager.detach(file_path, on_ready)
+
+    def open_window(df):
+        sub_window = open_table_window(file_path, df, mdi_area, opened_subwindows)
+        if sub_window is not None:
+            sub_window.destroyed.connect(on_window_destroyed)
+            state['window'] = sub_window
+            state['model'] = sub_window.findChild(QTableView).model()
+
+    def on_chunk(chunk, stats):
+        if state['window'] is None:
+            open_window(chunk.iloc[:0])  # Abre a janela vazia no primeiro bloco
+        if state['model'] is not None:
+            state['model'].append_chunk(chunk)
+            state['model'].set_column_stats(stats)
+
+    def on_ready(df, stats):
+        state['worker'] = None
+        dataset = register_dataset(file_path, df, stats, mdi_area.window())
+        if state['window'] is None:
+            open_window(df)
+        else:
+            state['model'].set_dataframe(df)  # Troca os blocos pelas colunas finais concatenadas
+        if state['model'] is not None:
+            state['model'].set_column_stats(stats)
+        if on_loaded:
+            on_loaded(dataset)
+
+    def on_abort():
+        state['worker'] = None
+        if state['window'] is not None:
+            state['window'].close()
+
+    state['worker'] = load_manager.load(file_path, on_ready, on_chunk, on_abort)
+    return state['worker']
+
+
+def load_dataset(file_path, main_window, on_loaded=None, on_failed=None):
+    """Maps the layer's dataset (column cache when available) without opening a table window.
+
+    on_loaded(dataset) is called right away if the dataset is already registered; on_failed() if the
+    load fails or is cancelled.
+    """
+    from Setup.Carregamento import get_load_manager
+    from Setup.Datasets import dataset_registry
+
+    dataset = dataset_registry.get(file_path)
+    if dataset is not None:
+        if on_loaded:
+            on_loaded(dataset)
+        return None
 
+    def on_ready(df, stats):
+        loaded = register_dataset(file_path, df, stats, main_window)
+        if on_loaded:
+            on_loaded(loaded)
+
+    return get_load_manager(main_window).load(file_path, on_ready, on_abort=on_failed)
 
-def load_excel(file_path, mdi_area, opened_subwindows):
-    """Load and display Excel data in the MDI area"""
-    try:
-        df = pd.read_excel(file_path)
 
+def register_dataset(file_path, df, stats, main_window):
+    """Registers the typed columns used by plots and fits and profiles them in the background"""
+    from Setup.Datasets import dataset_registry
+    from Setup.Perfil import start_profiling
+
+    dataset = dataset_registry.get(file_path)
+    if dataset is not None and dataset.df is df:
+        return dataset  # Same load delivered to several callers (table window and dock)
+    dataset = dataset_registry.register(file_path, df, stats)
+    start_profiling(dataset, lambda profiled: notify_dataset_profiled(main_window, profiled))
+    return dataset
+
+
+def open_graficos_dock(main_window, tree_view, mdi_area):
+    """Opens the plots dock, importing matplotlib only on first use"""
+    from Setup.GraficosDock import open_graficos_dock as open_dock
+    open_dock(main_window, tree_view, mdi_area)
+
+
+def notify_dataset_profiled(main_window, dataset):
+    """Let the docks use the column profile (ranges, numeric/categorical columns) as soon as it is ready"""
+    graficos_dock = getattr(main_window, 'graficos_dock', None)
+    if graficos_dock is not None:
+        graficos_dock.on_dataset_profiled(dataset)
+
+
+def open_table_window(file_path, df, mdi_area, opened_subwindows):
+    """Display an already loaded DataFrame in a new MDI sub-window"""
+    try:
         # Create the sub-window and set its properties
         sub_window = CustomMdiSubWindow()
-        sub_window.setWindowTitle(f"{file_path.split('/')[-1]}")
+        sub_window.setWindowTitle(source_label(file_path))  # File name (and sheet)
 
         # Ensure sub-window respects MDI constraints (critical fix)
         sub_window.setWindowFlags(Qt.SubWindow)  # Force it to act as a sub-window
 
-        # Create a table widget and populate it with the DataFrame
-        table_widget = QTableWidget()
-        table_widget.setRowCount(df.shape[0])  # Number of rows
-        table_widget.setColumnCount(df.shape[1])  # Number of columns
-        table_widget.setHorizontalHeaderLabels(df.columns)
-
-        for row in range(df.shape[0]):
-            for col in range(df.shape[1]):
-                table_widget.setItem(row, col, QTableWidgetItem(str(df.iat[row, col])))
+        # Create a virtualized table view backed directly by the DataFrame columns
+        table_widget = create_table_view(df)
 
         # Set up the layout and container
         layout = QVBoxLayout()
@@ -239,13 +370,14 @@ def load_excel(file_path, mdi_area, opened_subwindows):
 
         # Store the sub-window in the opened_subwindows dictionary
         opened_subwindows[file_path] = sub_window
+        get_layer_registry(mdi_area.window()).set_table_window(file_path, sub_window)
 
         # Show the sub-window in normal state (no maximizing to avoid escaping MDI area)
         sub_window.show()
         return sub_window
 
     except Exception as e:
-        print(f"Error loading file: {e}")
+        print(f"Error opening table: {e}")
 
 
 def open_existing_project(self):
@@ -253,9 +385,22 @@ def open_existing_project(self):
     project_folder = QFileDialog.getExistingDirectory(self, "Abrir Diretório de Projeto", "")
 
     if project_folder:
+        # The open project is saved (or discarded) while project_folder still points at it
+        from Setup.Projeto import clear_project, confirm_close_project, open_project, project_file
+        if not confirm_close_project(self):
+            return None
+        clear_project(self)
+
         print(f"Abrindo diretório de projeto existente: {project_folder}")
         self.project_folder = project_folder  # Set the project folder
         update_file_browser_root(self.nav_folder, self.project_folder)
+
+        # Saved project: restore layers, plots and docks (tables are mapped only when used)
+        if os.path.exists(project_file(project_folder)):
+            try:
+                open_project(self, project_folder)
+            except (OSError, ValueError) as e:
+                status_bar_message(self.statusbar, f"Erro ao abrir o projeto: {e}", 6000)
         return project_folder
     else:
         print("Nenhum diretório selecionado.")
@@ -284,8 +429,8 @@ def set_default_layout(self):
 
 
 def setup_second_tree(tree_view, opened_subwindows, mdi_area):
-    """Configura a árvore para lidar com o menu de contexto de clique direito,
-    permitindo apenas no primeiro nível da árvore."""
+    """Configura a árvore para lidar com o menu de contexto de clique direito:
+    camadas (arquivos e planilhas), arquivos com várias planilhas e gráficos."""
 
     # Garante que a árvore usa um QStandardItemModel
     model = QStandardItemModel()
@@ -294,16 +439,19 @@ def setup_second_tree(tree_view, opened_subwindows, mdi_area):
     tree_view.setContextMenuPolicy(Qt.CustomContextMenu)
 
     def show_menu_if_top_level(point):
-        """Mostra o menu de contexto apenas se o item for de primeiro nível."""
+        """Mostra o menu de acordo com o tipo do item (o caminho guardado no item identifica camadas)."""
         index = tree_view.indexAt(point)
         if not index.isValid():
             return  # Nenhum item foi clicado
 
-        item = model.itemFromIndex(index)
-        if item and item.parent() is None:  # Apenas itens sem pai (nível 1)
+        registry = get_layer_registry(tree_view.window())
+        path = index.data(Qt.UserRole)
+        if isinstance(path, str) and path in registry.workbooks:  # Arquivo com várias planilhas
+            show_context_menu_workbook(tree_view, point, opened_subwindows, mdi_area)
+        elif isinstance(path, str) and registry.get(path) is not None:  # Camada (arquivo ou planilha)
             show_context_menu_second_tree(tree_view, point, opened_subwindows, mdi_area)
-        elif item and item.parent() is not None:  # Itens com pai (nível 2)
-            show_context_menu_second_tree_subitems(tree_view, point, mdi_area)  # Imprime 'x' quando for um item de segundo nível
+        else:  # Gráficos sob a camada
+            show_context_menu_second_tree_subitems(tree_view, point, opened_subwindows, mdi_area)
 
     tree_view.customContextMenuRequested.connect(show_menu_if_top_level)
 
@@ -324,6 +472,11 @@ def show_context_menu_second_tree(tree_view, point, opened_subwindows, mdi_area)
     abrir_tabela_action.triggered.connect(lambda _, idx=index: open_table(idx, opened_subwindows, mdi_area))
     context_menu.addAction(abrir_tabela_action)
 
+    # 'Remover Camada' action
+    remover_action = QAction("Remover Camada", tree_view)
+    remover_action.triggered.connect(lambda _, idx=index: remove_layer(idx, opened_subwindows, mdi_area))
+    context_menu.addAction(remover_action)
+
     # 'Gráfico' action with a submenu
     grafico_action = QAction("Gráfico", tree_view)
 
@@ -367,102 +520,115 @@ def show_context_menu_second_tree(tree_view, point, opened_subwindows, mdi_area)
     # Execute the context menu
     context_menu.exec_(tree_view.mapToGlobal(point))
 
-def show_context_menu_second_tree_subitems(tree_view, point, mdi_area):
+def show_context_menu_workbook(tree_view, point, opened_subwindows, mdi_area):
+    """Menu do arquivo com várias planilhas: as tabelas são abertas pelas planilhas"""
+    index = tree_view.indexAt(point)
+    context_menu = QMenu(tree_view)
+
+    remover_action = QAction("Remover Camada", tree_view)
+    remover_action.triggered.connect(lambda _, idx=index: remove_layer(idx, opened_subwindows, mdi_area))
+    context_menu.addAction(remover_action)
+
+    context_menu.exec_(tree_view.mapToGlobal(point))
+
+def show_context_menu_second_tree_subitems(tree_view, point, opened_subwindows, mdi_area):
     """Exibe o menu de contexto com as opções 'Abrir Tabela', 'Gráfico' e 'Ajustes'"""
 
     # Get the index of the clicked item
     index = tree_view.indexAt(point)
     print(index.data()) #NOME
-    print(f"Index at point: {index}")  # Debug: Check the index
-    row = index.row()
-    print(f"Row: {row}")  # Debug: Check the row
 
     # Create the main context menu
     context_menu = QMenu(tree_view)
-    print(resource_path(index.data()))
 
-    # 'Abrir Tabela' action
-    abrir_tabela_action = QAction("Abrir Gráfico", tree_view)
-    abrir_tabela_action.triggered.connect(lambda _, idx=index: open_pkl_graph(idx, index.data(),
-                                                                              r'G:\PycharmProjects\HGLLEO\pythonProject\Temp\Gráfico de Dispersão - .pkl',
-                                                                              mdi_area))
-    context_menu.addAction(abrir_tabela_action)
+    # 'Abrir Gráfico' action
+    abrir_grafico_action = QAction("Abrir Gráfico", tree_view)
+    abrir_grafico_action.triggered.connect(lambda _, idx=index: open_plot_spec(idx, opened_subwindows, mdi_area))
+    context_menu.addAction(abrir_grafico_action)
 
     # Execute the context menu
     context_menu.exec_(tree_view.mapToGlobal(point))
 
 def open_table(index, opened_subwindows, mdi_area):
     """Abre a tabela correspondente ao item selecionado"""
-    item_name = index.data()  # Obtém o nome do item selecionado (apenas o nome do arquivo)
-    print(f"Index data: {item_name}")  # Para depuração
-    print(f"Opened subwindows: {opened_subwindows}")  # Verifique o conteúdo de opened_subwindows
-    janelas = [sw.windowTitle() for sw in mdi_area.subWindowList()]
-    print(janelas)
-    # Verifica se já existe uma subjanela aberta com esse nome
-    for sub_window in mdi_area.subWindowList():
-        if sub_window.windowTitle() == item_name:  # Comparação correta
-            sub_window.showNormal()  # Exibe a subjanela no modo normal
-            sub_window.raise_()  # Coloca a subjanela à frente
-            return  # Se já estiver aberta, retorna sem abrir outra
-
-    # Caso o arquivo não tenha sido encontrado entre as janelas abertas
-    print(f"Opening new table for {item_name}.")
-
-    # Encontra o caminho completo do arquivo no dicionário
-    file_path = None
-    for path in opened_subwindows.keys():
-        if os.path.basename(path) == item_name:
-            file_path = path
-            break
-
-    if file_path is None:
+    file_path = index.data(Qt.UserRole)  # Caminho completo guardado no item da camada
+    if not file_path:
         print("Erro: Caminho do arquivo não encontrado.")
         return
 
-    print(f"File path: {file_path}")
+    # Verifica se a tabela da camada já está aberta (busca direta no registro de camadas)
+    sub_window = get_layer_registry(mdi_area.window()).table_window(file_path)
+    if sub_window is not None:
+        sub_window.showNormal()  # Exibe a subjanela no modo normal
+        sub_window.raise_()  # Coloca a subjanela à frente
+        return  # Se já estiver aberta, retorna sem abrir outra
+
     load_excel(file_path, mdi_area, opened_subwindows)  # Abre o arquivo no mdi_area
 
 
-def open_pkl_graph(index, title, file_path, mdi_area):
-    """Opens a .pkl graph and displays it in a new MDI subwindow."""
-    item_name = index.data()  # Obtém o nome do item selecionado (apenas o nome do arquivo)
-    print(f"Index data: {item_name}")  # Para depuração
-    janelas = [sw.windowTitle() for sw in mdi_area.subWindowList()]
-    print(janelas)
-    # Verifica se já existe uma subjanela aberta com esse nome
-    for sub_window in mdi_area.subWindowList():
-        if sub_window.windowTitle() == item_name:  # Comparação correta
-            sub_window.showNormal()  # Exibe a subjanela no modo normal
-            sub_window.raise_()  # Coloca a subjanela à frente
-            return  # Se já estiver aberta, retorna sem abrir outra
+def remove_layer(index, opened_subwindows, mdi_area):
+    """Remove a camada da árvore, fechando a tabela e os gráficos dela (todas as planilhas, no item do arquivo)"""
+    from Setup.Datasets import dataset_registry
 
-    # Caso o arquivo não tenha sido encontrado entre as janelas abertas
-    print(f"Opening new table for {item_name}.")
+    file_path = index.data(Qt.UserRole)
+    registry = get_layer_registry(mdi_area.window())
+    if file_path in registry.workbooks:
+        layers = registry.sheet_layers(file_path)
+    else:
+        layers = [layer for layer in [registry.get(file_path)] if layer is not None]
+
+    for layer in layers:
+        windows = [layer.table_window] + [item.data(Qt.UserRole) for item in layer.plot_items.values()]
+        for window in windows:
+            if isinstance(window, QMdiSubWindow):
+                window.close()  # Os gráficos ainda salvam a spec antes da camada sair do registro
+        opened_subwindows.pop(layer.path, None)
+        registry.remove_layer(layer.path)
+        dataset_registry.remove(layer.path)
+
+
+def open_plot_spec(index, opened_subwindows, mdi_area):
+    """Opens the plot of a tree item: shows its window, its cached image or rebuilds it from the saved spec."""
+    from Setup.Especificacoes import load_spec
+
+    window = index.data(Qt.UserRole)
+    if isinstance(window, QMdiSubWindow):
+        window.showNormal()  # Still open
+        window.raise_()
+        return
+
+    spec_path = index.data(SPEC_PATH_ROLE)
+    if not spec_path:
+        print(f"Erro: Nenhuma spec salva para {index.data()}.")
+        return
 
     try:
-        # Load the figure from the pickle file
-        with open(file_path, 'rb') as f:
-            fig = pickle.load(f)
-
-        # Create a new QMdiSubWindow
-        subwindow = CustomMdiSubWindow()
-        subwindow.setWindowTitle(f"{title}")
-
-        # Create a widget to contain the plot
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        # Embed the figure in the widget using Matplotlib's FigureCanvasQTAgg
-        canvas = FigureCanvas(fig)  # Correct canvas for PyQt5
-        canvas.drwa()
-        layout.addWidget(canvas)
-
-        # Set the widget in the subwindow and add it to mdi_area
-        subwindow.setWidget(widget)
-        mdi_area.addSubWindow(subwindow)
-        subwindow.show()
-    except Exception as e:
-        print(f"Error opening graph from {file_path}: {e}")
+        document = load_spec(spec_path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening graph from {spec_path}: {e}")
+        return
+
+    main_window = mdi_area.window()
+    tree_view = main_window.content
+    open_graficos_dock(main_window, tree_view, mdi_area)
+    graficos_dock = main_window.graficos_dock
+
+    def open_live():
+        # Dataset not loaded yet: map it (cached columns make this fast) and plot when ready
+        def on_failed():
+            status_bar_message(main_window.statusbar,
+                               f"Não foi possível abrir {document['titulo']}: dados de {source_label(document['dataset']['id'])} indisponíveis.", 6000)
+
+        load_dataset(document["dataset"]["id"], main_window,
+                     on_loaded=lambda loaded: graficos_dock.open_saved_plot(document, loaded), on_failed=on_failed)
+
+    # The cached image shows up immediately; the plot is rebuilt only when the user clicks on it
+    image_path = graficos_dock.cached_plot_image(document)
+    if image_path:
+        graficos_dock.show_cached_plot(document, image_path, open_live)
+    else:
+        open_live()
+
 
 def status_bar_message(self, message, timeout=3000):
     """Display a message on the status bar and clear it after a timeout."""
@@ -0,0 +1,82 @@
+"""Benchmark dos leitores de tabelas disponíveis.
+
+Uso:
+    python -m Setup.BenchmarkLeitores arquivo1.xlsx arquivo2.csv [--repetir 3] [--projeto PASTA]
+
+Mede cada leitor disponível para a extensão de cada arquivo e grava o vencedor
+por extensão em <projeto>/Cache/benchmark_leitores.json; a seleção automática
+de leitores (Setup/Leitores.py) passa a usar esses vencedores.
+
+O benchmark mede só o tempo total. Na interface, planilhas acima de
+Leitores.STREAMING_MIN_BYTES continuam com o leitor em blocos (openpyxl) mesmo
+quando o calamine vence: ele é mais lento no total, mas mostra as primeiras
+linhas logo e acumula as estatísticas durante a leitura, com um bloco de
+objetos Python em memória por vez. O lote e a importação em paralelo usam o
+vencedor.
+"""
+import argparse
+import json
+import os
+import time
+
+from Setup.Leitores import available_readers, file_extension, preferences_path
+
+
+def benchmark_file(file_path, repeat=3):
+    """Retorna {leitor: melhor tempo em segundos} para um arquivo."""
+    timings = {}
+    for reader in available_readers(file_path):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                reader.read(file_path)
+            except Exception as e:
+                print(f"  {reader.name}: erro ({e})")
+                best = None
+                break
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if best is not None:
+            timings[reader.name] = best
+            print(f"  {reader.name}: {best:.3f} s")
+    return timings
+
+
+def run_benchmark(file_paths, repeat=3, project_folder=None):
+    """Mede todos os arquivos, grava os resultados e retorna o dicionário gravado."""
+    results, totals = {}, {}
+    for file_path in file_paths:
+        print(f"{file_path} ({os.path.getsize(file_path) / 1024 ** 2:.1f} MB)")
+        timings = benchmark_file(file_path, repeat)
+        results[file_path] = timings
+        extension_totals = totals.setdefault(file_extension(file_path), {})
+        for name, elapsed in timings.items():
+            extension_totals[name] = extension_totals.get(name, 0.0) + elapsed
+
+    # Vencedor por extensão: menor tempo somado sobre os arquivos medidos
+    winners = {extension: min(timings, key=timings.get) for extension, timings in totals.items() if timings}
+    output = {"created": time.time(), "repeat": repeat, "files": results, "winners": winners}
+
+    path = preferences_path(project_folder)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+
+    for extension, name in winners.items():
+        print(f"Vencedor {extension}: {name}")
+    print(f"Resultados gravados em {path}")
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos leitores de tabelas.")
+    parser.add_argument("arquivos", nargs="+")
+    parser.add_argument("--repetir", type=int, default=3)
+    parser.add_argument("--projeto", default=None, help="Pasta do projeto (padrão: diretório atual)")
+    args = parser.parse_args(argv)
+    run_benchmark(args.arquivos, args.repetir, args.projeto)
+
+
+if __name__ == "__main__":
+    main()
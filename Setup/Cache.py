@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Setup.Leitores import split_source
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB por projeto
+DEFAULT_IMAGE_MAX_BYTES = 256 * 1024 ** 2  # 256 MB de imagens de gráficos por projeto
+META_FILE = "meta.json"
+IMAGE_FILE = "grafico.png"
+THUMBNAIL_FILE = "miniatura.png"
+THUMBNAIL_SIZE = (256, 256)
+
+
+def cache_root(project_folder=None):
+    """Pasta do cache de tabelas: dentro do projeto aberto ou no diretório atual."""
+    base_path = project_folder or os.getcwd()
+    return os.path.join(base_path, "Cache", "Tabelas")
+
+
+def image_cache_root(project_folder=None):
+    """Pasta do cache de imagens dos gráficos."""
+    base_path = project_folder or os.getcwd()
+    return os.path.join(base_path, "Cache", "Graficos")
+
+
+def source_key(file_path, sheet=None):
+    """Chave do arquivo de origem: caminho + tamanho + data de modificação (+ planilha).
+
+    Aceita também o identificador de uma camada de planilha ('arquivo::planilha').
+    """
+    if sheet is None:
+        file_path, sheet = split_source(file_path)
+    stat = os.stat(file_path)
+    raw = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{sheet}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def source_fingerprint(file_path, sheet=None):
+    """Versão do arquivo de origem sem o caminho: tamanho + data de modificação (+ planilha).
+
+    Usada nas referências dos gráficos salvos, que continuam válidas quando a pasta do projeto é movida.
+    """
+    if sheet is None:
+        file_path, sheet = split_source(file_path)
+    stat = os.stat(file_path)
+    raw = f"{stat.st_size}|{stat.st_mtime_ns}|{sheet}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def plot_key(spec, dataset_reference):
+    """Chave da imagem de um gráfico: hash da spec + arquivo de origem (ou versão) do dataset."""
+    dataset_id = dataset_reference.get("fonte") or f"{dataset_reference.get('id')}|{dataset_reference.get('versao')}"
+    raw = json.dumps(spec, sort_keys=True, ensure_ascii=False) + "|" + dataset_id
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _json_label(value):
+    """Converte um rótulo categórico para um valor serializável em JSON."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value)
+    return str(value)
+
+
+def _column_name(name):
+    return name if isinstance(name, (str, int, float)) else str(name)
+
+
+class DiskCache:
+    """Base dos caches em disco: uma pasta por entrada com um meta.json.
+
+    As entradas menos usadas recentemente (last_access do meta.json) são
+    removidas quando o cache passa de max_bytes.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key):
+        return os.path.join(self.root, key)
+
+    def read_meta(self, entry):
+        try:
+            with open(os.path.join(entry, META_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, entry, meta):
+        """Atualiza o último acesso da entrada (usado pela remoção LRU)."""
+        meta["last_access"] = time.time()
+        try:
+            with open(os.path.join(entry, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            print(f"Não foi possível atualizar o cache: {e}")
+
+    def commit_entry(self, temp_entry, key):
+        """Troca a entrada pela pasta temporária já completa."""
+        entry = self.entry_path(key)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(temp_entry, entry)
+        return entry
+
+    def entries(self):
+        """Lista (último acesso, tamanho em bytes, caminho) de cada entrada do cache."""
+        if not os.path.isdir(self.root):
+            return []
+
+        entries = []
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            meta = self.read_meta(entry) or {}
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((meta.get("last_access", 0), size, entry))
+        return entries
+
+    def evict(self):
+        """Remove as entradas menos usadas até o cache caber em max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class ColumnCache(DiskCache):
+    """Cache em disco das planilhas já lidas, com um arquivo .npy por coluna.
+
+    Colunas numéricas, booleanas e de datas são gravadas como arrays NumPy e
+    relidas com memory-map. Colunas de texto/mistas são gravadas como códigos
+    inteiros + dicionário de rótulos.
+    """
+
+    def get(self, file_path, sheet=None):
+        """Retorna o DataFrame em cache ou None se não existir/estiver desatualizado."""
+        try:
+            key = source_key(file_path, sheet)
+        except OSError:
+            return None
+        entry = self.entry_path(key)
+        meta = self.read_meta(entry)
+        if meta is None or meta.get("format") != CACHE_FORMAT_VERSION:
+            return None
+
+        try:
+            df = self.read_entry(entry, meta)
+        except (OSError, ValueError) as e:
+            print(f"Cache inválido para {file_path}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        self.touch(entry, meta)
+        return df
+
+    def contains(self, file_path, sheet=None):
+        """True se há uma entrada válida para a tabela (sem ler as colunas)."""
+        try:
+            key = source_key(file_path, sheet)
+        except OSError:
+            return False
+        meta = self.read_meta(self.entry_path(key))
+        return meta is not None and meta.get("format") == CACHE_FORMAT_VERSION
+
+    def put(self, file_path, df, sheet=None):
+        """Grava o DataFrame no cache e aplica o limite de tamanho."""
+        if sheet is None:
+            file_path, sheet = split_source(file_path)
+        key = source_key(file_path, sheet)
+        os.makedirs(self.root, exist_ok=True)
+
+        # Grava em uma pasta temporária e renomeia: leitores nunca veem entradas incompletas
+        temp_entry = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            columns = []
+            for col in range(df.shape[1]):
+                columns.append(self.write_column(temp_entry, col, df.iloc[:, col]))
+
+            now = time.time()
+            meta = {
+                "format": CACHE_FORMAT_VERSION,
+                "source": os.path.abspath(file_path),
+                "sheet": sheet,
+                "rows": int(df.shape[0]),
+                "columns": columns,
+                "created": now,
+                "last_access": now,
+            }
+            with open(os.path.join(temp_entry, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+            self.commit_entry(temp_entry, key)
+        except Exception:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            raise
+
+        self.evict()
+        return key
+
+    def write_column(self, entry, col, series):
+        """Grava uma coluna e retorna a sua descrição para o meta.json."""
+        file_name = f"col_{col:04d}.npy"
+        description = {"name": _column_name(series.name), "file": file_name}
+        values = series.to_numpy()
+
+        if values.dtype.kind in "biufcmM":  # Tipos nativos do NumPy
+            np.save(os.path.join(entry, file_name), values, allow_pickle=False)
+            description["kind"] = "array"
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            np.save(os.path.join(entry, file_name), codes.astype(np.int32), allow_pickle=False)
+            description["kind"] = "codes"
+            description["labels"] = [_json_label(value) for value in uniques]
+        return description
+
+    def read_entry(self, entry, meta):
+        data = {}
+        for col, description in enumerate(meta["columns"]):
+            values = np.load(os.path.join(entry, description["file"]), mmap_mode="r", allow_pickle=False)
+            if description["kind"] == "codes":
+                # Rótulos compartilhados: cada linha guarda só uma referência ao rótulo
+                labels = np.empty(len(description["labels"]) + 1, dtype=object)
+                labels[:-1] = description["labels"]
+                labels[-1] = np.nan  # código -1 (valor ausente) aponta para o último item
+                values = labels[values]
+            data[col] = values
+
+        df = pd.DataFrame(data, copy=False)
+        df.columns = [description["name"] for description in meta["columns"]]
+        return df
+
+
+class PlotImageCache(DiskCache):
+    """Cache das imagens renderizadas dos gráficos (PNG em tamanho real + miniatura).
+
+    A chave (plot_key) combina o hash da spec com o arquivo de origem do dataset:
+    reabrir um gráfico sem mudanças mostra a imagem sem redesenhar.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_IMAGE_MAX_BYTES):
+        super().__init__(root, max_bytes)
+
+    def get(self, key):
+        """Retorna (imagem, miniatura) em cache ou None."""
+        entry = self.entry_path(key)
+        meta = self.read_meta(entry)
+        image_path, thumbnail_path = os.path.join(entry, IMAGE_FILE), os.path.join(entry, THUMBNAIL_FILE)
+        if meta is None or meta.get("format") != CACHE_FORMAT_VERSION or not os.path.exists(image_path):
+            return None
+        self.touch(entry, meta)
+        return image_path, thumbnail_path
+
+    def put(self, key, image):
+        """Grava a imagem (PIL.Image RGBA) e a sua miniatura; retorna (imagem, miniatura)."""
+        os.makedirs(self.root, exist_ok=True)
+        temp_entry = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            image.save(os.path.join(temp_entry, IMAGE_FILE))
+            thumbnail = image.copy()
+            thumbnail.thumbnail(THUMBNAIL_SIZE)
+            thumbnail.save(os.path.join(temp_entry, THUMBNAIL_FILE))
+
+            now = time.time()
+            meta = {"format": CACHE_FORMAT_VERSION, "size": list(image.size), "created": now, "last_access": now}
+            with open(os.path.join(temp_entry, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            entry = self.commit_entry(temp_entry, key)
+        except Exception:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            raise
+
+        self.evict()
+        return os.path.join(entry, IMAGE_FILE), os.path.join(entry, THUMBNAIL_FILE)
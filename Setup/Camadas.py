@@ -0,0 +1,247 @@
+import os
+
+from PyQt5.QtCore import QObject, Qt, QUrl, pyqtSignal
+from PyQt5.QtGui import QStandardItem
+
+from Setup.Leitores import sheet_source, source_label, split_source
+
+SPEC_PATH_ROLE = Qt.UserRole + 1  # Tree item role with the path of the saved plot spec
+THUMBNAIL_ROLE = Qt.UserRole + 2  # Tree item role with the path of the plot thumbnail (shown as the tooltip)
+
+
+def set_plot_thumbnail(item, thumbnail_path):
+    """Guarda o caminho da miniatura no item e a mostra como tooltip."""
+    item.setData(thumbnail_path, THUMBNAIL_ROLE)
+    item.setData(f'<img src="{QUrl.fromLocalFile(thumbnail_path).toString()}">', Qt.ToolTipRole)
+
+
+class Layer:
+    """Camada da árvore: arquivo (ou planilha) de origem, item na árvore e janelas abertas."""
+
+    def __init__(self, path, item):
+        self.path = path  # Caminho do arquivo ou 'arquivo::planilha'
+        self.item = item
+        self.name = source_label(path)  # Nome exibido nos docks (único por camada)
+        self.table_window = None
+        self.plot_items = {}  # título do gráfico -> item filho na árvore
+        self.info = {}  # Linhas e colunas gravadas no projeto (antes de o dataset ser carregado)
+
+    @property
+    def dataset(self):
+        from Setup.Datasets import dataset_registry
+        return dataset_registry.get(self.path)
+
+
+class LayerRegistry(QObject):
+    """Índice das camadas e das janelas da árvore de camadas.
+
+    Camadas por caminho e por nome exibido, janelas de gráfico por título e o
+    item da árvore de cada janela: as buscas são O(1), sem percorrer a árvore ou
+    mdi_area.subWindowList(). A árvore recebe só a linha inserida ou removida e
+    os docks acompanham os sinais para atualizar seus combos item a item.
+    """
+
+    layer_added = pyqtSignal(str)  # nome exibido
+    layer_removed = pyqtSignal(str)
+
+    def __init__(self, tree_view, parent=None):
+        super().__init__(parent)
+        self.tree_view = tree_view
+        self.layers = {}  # caminho -> Layer
+        self.names = {}  # nome exibido -> Layer (arquivos de mesmo nome: o último adicionado)
+        self.plot_windows = {}  # título -> janela de gráfico aberta
+        self.window_items = {}  # janela de gráfico -> (Layer, item da árvore)
+        self.workbooks = {}  # caminho da pasta de trabalho -> item do arquivo (pai das camadas das planilhas)
+
+    def model(self):
+        return self.tree_view.model()
+
+    def get(self, path):
+        return self.layers.get(path)
+
+    def by_name(self, name):
+        return self.names.get(name)
+
+    def layer_names(self):
+        return [layer.name for layer in self.layers.values()]
+
+    def add_layer(self, path):
+        """Adiciona a camada no fim da árvore; retorna a existente se o arquivo já for uma camada.
+
+        Camadas de planilhas ('arquivo::planilha') ficam sob o item do arquivo.
+        """
+        layer = self.layers.get(path)
+        if layer is not None:
+            return layer
+
+        file_path, sheet = split_source(path)
+        item = QStandardItem(sheet or os.path.basename(path))
+        item.setData(path, Qt.UserRole)  # Store the full file path in the item data
+        item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+        parent = self.workbook_item(file_path) if sheet else self.model().invisibleRootItem()
+        parent.appendRow(item)
+
+        layer = Layer(path, item)
+        self.layers[path] = layer
+        self.names[layer.name] = layer
+        self.layer_added.emit(layer.name)
+        return layer
+
+    def workbook_item(self, file_path):
+        """Item do arquivo com várias planilhas (criado no fim da árvore na primeira planilha)."""
+        item = self.workbooks.get(file_path)
+        if item is None:
+            item = QStandardItem(os.path.basename(file_path))
+            item.setData(file_path, Qt.UserRole)
+            item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            self.model().appendRow(item)
+            self.workbooks[file_path] = item
+        return item
+
+    def add_workbook(self, file_path, sheets):
+        """Uma camada por planilha sob o item do arquivo (nenhuma planilha é lida); retorna as camadas."""
+        layers = [self.add_layer(sheet_source(file_path, sheet)) for sheet in sheets]
+        if file_path in self.workbooks:
+            self.tree_view.expand(self.workbooks[file_path].index())
+        return layers
+
+    def sheet_layers(self, file_path):
+        item = self.workbooks.get(file_path)
+        if item is None:
+            return []
+        return [self.layers[item.child(row).data(Qt.UserRole)] for row in range(item.rowCount())]
+
+    def remove_layer(self, path):
+        layer = self.layers.pop(path, None)
+        if layer is None:
+            return
+        for window in [window for window, (owner, _) in self.window_items.items() if owner is layer]:
+            self.detach_plot(window)
+        if self.names.get(layer.name) is layer:
+            del self.names[layer.name]
+        parent = layer.item.parent() or self.model().invisibleRootItem()
+        parent.removeRow(layer.item.row())
+
+        file_path, sheet = split_source(path)
+        if sheet and parent.rowCount() == 0 and self.workbooks.get(file_path) is parent:
+            del self.workbooks[file_path]  # Última planilha: o item do arquivo sai junto
+            self.model().removeRow(parent.row())
+        self.layer_removed.emit(layer.name)
+
+    def remove_workbook(self, file_path):
+        for layer in self.sheet_layers(file_path):
+            self.remove_layer(layer.path)
+
+    def clear(self):
+        """Remove todas as camadas (as janelas devem ser fechadas antes; ver Projeto.clear_project)."""
+        for path in list(self.layers):
+            self.remove_layer(path)
+        for item in list(self.workbooks.values()):
+            self.model().removeRow(item.row())  # Arquivos que ficaram sem planilhas
+        self.workbooks = {}
+        self.plot_windows = {}
+        self.window_items = {}
+
+    def set_table_window(self, path, window):
+        layer = self.layers.get(path)
+        if layer is None:
+            return
+        layer.table_window = window
+        window.destroyed.connect(lambda *_: self.clear_table_window(layer, window))
+
+    def clear_table_window(self, layer, window):
+        if layer.table_window is window:
+            layer.table_window = None
+
+    def table_window(self, path):
+        layer = self.layers.get(path)
+        return layer.table_window if layer else None
+
+    def add_plot(self, layer_name, window):
+        """Coloca a janela sob a camada (reaproveita o item de um gráfico reaberto); retorna o item."""
+        layer = self.names.get(layer_name)
+        if layer is None:
+            print(f"Error: layer {layer_name} not found in the tree")
+            return None
+
+        title = window.windowTitle()
+        item = layer.plot_items.get(title)
+        if item is None:
+            item = QStandardItem(title)
+            item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            layer.item.appendRow(item)  # Só a linha nova é inserida nas views
+            layer.plot_items[title] = item
+            self.tree_view.expand(layer.item.index())
+        item.setData(window, Qt.UserRole)  # Reference to the open window
+
+        self.window_items[window] = (layer, item)
+        self.plot_windows[title] = window
+        return item
+
+    def add_saved_plot(self, path, title, spec_path, thumbnail_path=None):
+        """Item de um gráfico salvo (sem janela aberta), reaberto pela spec ao ser acionado."""
+        layer = self.layers.get(path)
+        if layer is None:
+            return None
+        item = layer.plot_items.get(title)
+        if item is None:
+            item = QStandardItem(title)
+            item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+            layer.item.appendRow(item)
+            layer.plot_items[title] = item
+        item.setData(spec_path, SPEC_PATH_ROLE)
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            set_plot_thumbnail(item, thumbnail_path)
+        return item
+
+    def plot_item(self, window):
+        entry = self.window_items.get(window)
+        return entry[1] if entry else None
+
+    def plot_window(self, title):
+        return self.plot_windows.get(title)
+
+    def open_plots(self):
+        return list(self.window_items)
+
+    def plot_title_taken(self, title, layer_name, window=None):
+        """True se o título é de outra janela aberta ou de um gráfico salvo de outra camada (a spec seria sobrescrita)."""
+        owner = self.plot_windows.get(title)
+        if owner is not None and owner is not window:
+            return True
+        return any(title in layer.plot_items for layer in self.layers.values() if layer.name != layer_name)
+
+    def rename_plot(self, window):
+        """Atualiza o item e os índices depois que o título da janela mudou."""
+        entry = self.window_items.get(window)
+        if entry is None:
+            return
+        layer, item = entry
+        old_title, title = item.text(), window.windowTitle()
+        if old_title == title:
+            return
+        if self.plot_windows.get(old_title) is window:
+            del self.plot_windows[old_title]
+        if layer.plot_items.get(old_title) is item:
+            del layer.plot_items[old_title]
+        layer.plot_items[title] = item
+        self.plot_windows[title] = window
+        item.setText(title)
+
+    def detach_plot(self, window):
+        """A janela fechou: o item fica na árvore (para reabrir o gráfico salvo) sem a referência."""
+        entry = self.window_items.pop(window, None)
+        if entry is None:
+            return
+        _, item = entry
+        if self.plot_windows.get(item.text()) is window:
+            del self.plot_windows[item.text()]
+        if item.data(Qt.UserRole) is window:
+            item.setData(None, Qt.UserRole)  # O item pode já apontar para a janela que substituiu esta
+
+
+def get_layer_registry(main_window):
+    """Retorna (criando se necessário) o registro de camadas da janela principal"""
+    if not hasattr(main_window, 'layer_registry') or main_window.layer_registry is None:
+        main_window.layer_registry = LayerRegistry(main_window.content, main_window)
+    return main_window.layer_registry
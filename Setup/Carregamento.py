@@ -0,0 +1,394 @@
+import copy
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QProgressBar, QToolButton
+
+from Setup.Cache import ColumnCache, cache_root
+from Setup.Leitores import load_preferences, select_reader, split_source
+from Setup.LeitorXlsx import DEFAULT_CHUNK_SIZE, iter_xlsx_chunks
+from Setup.Perfil import StreamingStats
+
+
+class LoadCancelled(Exception):
+    """Carregamento interrompido pelo usuário."""
+
+
+class LoaderSignals(QObject):
+    """Sinais emitidos pelo worker (entregues na thread da interface)."""
+    progress = pyqtSignal(str, int)  # file_path, porcentagem (-1 = indeterminado)
+    chunk = pyqtSignal(str, object, object)  # file_path, bloco (DataFrame), StreamingStats parcial
+    finished = pyqtSignal(str, object, object)  # file_path, DataFrame, StreamingStats
+    failed = pyqtSignal(str, str)  # file_path, mensagem de erro
+    cancelled = pyqtSignal(str)  # file_path
+
+
+class LoadWorker(QRunnable):
+    """Lê uma tabela fora da thread principal com o leitor selecionado para o formato.
+
+    file_path é o identificador da camada: o arquivo ou 'arquivo::planilha' (só essa planilha é lida).
+    """
+
+    def __init__(self, file_path, cache=None, reader=None):
+        super().__init__()
+        self.file_path = file_path
+        self.path, self.sheet = split_source(file_path)
+        self.cache = cache
+        self.reader = reader
+        self.stats = None
+        self.signals = LoaderSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Solicita o cancelamento; o resultado é descartado na próxima verificação."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise LoadCancelled(self.file_path)
+
+    def read(self):
+        """Executa a leitura, usando o cache em disco quando o arquivo não mudou."""
+        self.signals.progress.emit(self.file_path, -1)
+        df = self.read_cached()
+        if df is not None:
+            return df
+
+        df = self.reader.read(self.path, self.sheet) if self.reader else pd.read_excel(self.path, self.sheet or 0)
+        self.check_cancelled()
+        self.stats = self.compute_stats(df)
+        self.store(df)
+        return df
+
+    def read_cached(self):
+        if self.cache is None:
+            return None
+        df = self.cache.get(self.file_path)
+        if df is not None:
+            self.stats = self.compute_stats(df)
+        return df
+
+    def compute_stats(self, df):
+        stats = StreamingStats(df.columns)
+        stats.update(df)
+        return stats
+
+    def store(self, df):
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(self.file_path, df)
+        except Exception as e:
+            print(f"Não foi possível gravar o cache de {self.file_path}: {e}")
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.check_cancelled()
+            df = self.read()
+            self.check_cancelled()
+        except LoadCancelled:
+            self.signals.cancelled.emit(self.file_path)
+        except Exception as e:
+            self.signals.failed.emit(self.file_path, str(e))
+        else:
+            self.signals.finished.emit(self.file_path, df, self.stats)
+
+
+class StreamingLoadWorker(LoadWorker):
+    """Lê planilhas .xlsx em blocos, publicando cada bloco assim que é convertido.
+
+    A janela da tabela é preenchida progressivamente e as estatísticas das
+    colunas são acumuladas bloco a bloco. Cada bloco é copiado para as colunas
+    finais (ColumnBuffers) e descartado: o pico de memória é um bloco mais as
+    colunas tipadas. O cancelamento é verificado entre blocos.
+    """
+
+    def __init__(self, file_path, cache=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(file_path, cache)
+        self.chunk_size = chunk_size
+
+    def read(self):
+        self.signals.progress.emit(self.file_path, -1)
+        df = self.read_cached()
+        if df is not None:
+            return df
+
+        state = {"buffers": ColumnBuffers([]), "total": None}
+
+        def on_start(columns, total_rows):
+            # <dimension> da planilha: as colunas já nascem com o tamanho final
+            state["buffers"], state["total"] = ColumnBuffers(columns, total_rows), total_rows
+            self.stats = StreamingStats(columns)
+
+        for chunk in iter_xlsx_chunks(self.path, self.chunk_size, sheet=self.sheet, on_start=on_start):
+            self.check_cancelled()
+            state["buffers"].append(chunk)
+            self.stats.update(chunk)
+            self.signals.chunk.emit(self.file_path, chunk, copy.deepcopy(self.stats))
+            if state["total"]:
+                self.signals.progress.emit(self.file_path, min(99, state["buffers"].length * 100 // state["total"]))
+            del chunk
+
+        self.check_cancelled()
+        df = state["buffers"].frame()
+        if self.stats is None:
+            self.stats = self.compute_stats(df)
+        self.store(df)
+        return df
+
+
+def common_dtype(current, incoming):
+    """Tipo que comporta as duas colunas, como no pd.concat (números se ampliam, o resto vira object)."""
+    if current == incoming:
+        return current
+    if (current.kind in "iuf" and incoming.kind in "iuf") or (current.kind == "M" and incoming.kind == "M"):
+        return np.result_type(current, incoming)
+    return np.dtype(object)
+
+
+def missing_value(dtype):
+    """Valor vazio de um tipo de coluna (None se o tipo não tiver um)."""
+    if dtype.kind in "fc":
+        return np.nan
+    if dtype.kind == "M":
+        return np.datetime64("NaT")
+    return None
+
+
+class ColumnBuffers:
+    """Colunas finais de uma leitura em blocos, preenchidas bloco a bloco (os blocos não são guardados).
+
+    Com o total de linhas (<dimension> da planilha) os arrays são alocados uma
+    vez; sem ele, ou se a planilha tiver mais linhas, crescem geometricamente.
+    """
+
+    MIN_CAPACITY = 1024
+
+    def __init__(self, columns, capacity=None):
+        self.columns = columns
+        self.capacity = max(capacity or 0, 0)
+        self.length = 0
+        self.arrays = [None] * len(columns)
+
+    def reserve(self, rows):
+        if rows <= self.capacity:
+            return
+        self.capacity = max(rows, self.capacity * 2, self.MIN_CAPACITY)
+        for col, values in enumerate(self.arrays):
+            if values is not None:
+                grown = np.empty(self.capacity, dtype=values.dtype)
+                grown[:self.length] = values[:self.length]
+                self.arrays[col] = grown
+
+    def append(self, chunk):
+        start, end = self.length, self.length + chunk.shape[0]
+        self.reserve(end)
+        for col in range(len(self.columns)):
+            series = chunk.iloc[:, col]
+            values = self.arrays[col]
+            empty = series.dtype == object and series.isna().all()  # Bloco sem valores na coluna
+            if values is None:
+                values = np.empty(self.capacity, dtype=object if empty else series.to_numpy().dtype)
+                if start:
+                    values[:start] = missing_value(values.dtype)
+            elif empty:
+                if missing_value(values.dtype) is None and values.dtype != object:
+                    dtype = np.float64 if values.dtype.kind in "iu" else object  # Inteiros com vazios viram float
+                    values = values.astype(dtype)
+            else:
+                dtype = common_dtype(values.dtype, series.to_numpy().dtype)
+                if dtype != values.dtype:
+                    values = values.astype(dtype)
+
+            if empty:
+                values[start:end] = missing_value(values.dtype)
+            else:
+                values[start:end] = series.to_numpy()
+            self.arrays[col] = values
+        self.length = end
+
+    def frame(self):
+        """DataFrame com as colunas no tamanho lido (a sobra da alocação é liberada coluna a coluna)."""
+        if not self.length:
+            return pd.DataFrame(columns=self.columns)
+        data = {}
+        for col, values in enumerate(self.arrays):
+            data[col] = values if len(values) == self.length else values[:self.length].copy()
+            self.arrays[col] = None
+        df = pd.DataFrame(data, copy=False)
+        df.columns = self.columns
+        # Colunas que começaram vazias (object) recuperam o tipo dos valores
+        return df.infer_objects()
+
+
+class LoadManager(QObject):
+    """Gerencia os carregamentos em segundo plano e o progresso na barra de status."""
+
+    def __init__(self, status_bar, parent=None):
+        super().__init__(parent)
+        self.status_bar = status_bar
+        self.thread_pool = QThreadPool.globalInstance()
+        self.workers = {}  # file_path -> LoadWorker
+        self.callbacks = {}  # file_path -> [(on_ready, on_chunk, on_abort), ...]
+
+        # Widgets permanentes da barra de status (ocultos quando não há carregamentos)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.cancel_button = QToolButton()
+        self.cancel_button.setText("Cancelar")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel_all)
+        status_bar.addPermanentWidget(self.progress_bar)
+        status_bar.addPermanentWidget(self.cancel_button)
+
+    def is_loading(self, file_path):
+        return file_path in self.workers
+
+    def load(self, file_path, on_ready, on_chunk=None, on_abort=None, worker=None):
+        """Inicia o carregamento de file_path em segundo plano.
+
+        Todas as funções são chamadas na thread da interface: on_ready(df, stats) ao
+        final, on_chunk(bloco, stats) a cada bloco lido e on_abort() em caso de erro
+        ou cancelamento. Se o arquivo já estiver sendo carregado, as funções são
+        somadas às do carregamento em andamento (sem ler o arquivo de novo).
+        """
+        if self.is_loading(file_path):
+            self.callbacks[file_path].append((on_ready, on_chunk, on_abort))
+            return self.workers[file_path]
+
+        try:
+            worker = worker or self.create_worker(file_path)
+        except ValueError as e:
+            self.show_message(str(e), timeout=6000)
+            return None
+        worker.signals.progress.connect(self.on_progress)
+        worker.signals.chunk.connect(self.on_chunk)
+        worker.signals.finished.connect(self.on_finished)
+        worker.signals.failed.connect(self.on_failed)
+        worker.signals.cancelled.connect(self.on_cancelled)
+
+        self.workers[file_path] = worker
+        self.callbacks[file_path] = [(on_ready, on_chunk, on_abort)]
+        self.update_widgets()
+        self.show_message(f"Carregando {os.path.basename(file_path)}...")
+        self.thread_pool.start(worker)
+        return worker
+
+    def create_worker(self, file_path):
+        """Cria o worker adequado ao leitor escolhido para o arquivo."""
+        project_folder = self.project_folder()
+        reader = select_reader(file_path, load_preferences(project_folder), streaming=True)
+        cache = ColumnCache(cache_root(project_folder)) if reader.cacheable else None
+        if reader.streaming:
+            return StreamingLoadWorker(file_path, cache)
+        return LoadWorker(file_path, cache, reader)
+
+    def project_folder(self):
+        """Pasta do projeto aberto (None usa o diretório atual)."""
+        return getattr(self.parent(), 'project_folder', None)
+
+    def cancel(self, file_path):
+        worker = self.workers.get(file_path)
+        if worker:
+            worker.cancel()
+
+    def detach(self, file_path, on_ready):
+        """Remove as funções de um chamador (ex.: a janela da tabela fechou).
+
+        O carregamento só é cancelado quando nenhum outro chamador espera por ele.
+        """
+        callbacks = self.callbacks.get(file_path)
+        if callbacks is None:
+            return
+        callbacks[:] = [entry for entry in callbacks if entry[0] is not on_ready]
+        if not callbacks:
+            self.cancel(file_path)
+
+    def cancel_all(self):
+        for worker in self.workers.values():
+            worker.cancel()
+        self.show_message("Cancelando carregamentos...")
+
+    def on_progress(self, file_path, percent):
+        if file_path not in self.workers:
+            return
+        if percent < 0:
+            self.progress_bar.setRange(0, 0)  # Indicador ocupado
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(percent)
+
+    def on_chunk(self, file_path, chunk, stats):
+        callbacks = self.callbacks.get(file_path)
+        if callbacks is None or self.is_discarded(file_path):
+            return
+        for _, on_chunk, _ in callbacks:
+            if on_chunk:
+                on_chunk(chunk, stats)
+
+    def on_finished(self, file_path, df, stats):
+        discarded = self.is_discarded(file_path)
+        callbacks = self.finish(file_path)
+        if callbacks is None:
+            return
+        if discarded:
+            self.abort(file_path, callbacks)
+            return
+        self.show_message(f"{os.path.basename(file_path)} carregado ({df.shape[0]} linhas).")
+        for on_ready, _, _ in callbacks:
+            on_ready(df, stats)
+
+    def on_failed(self, file_path, message):
+        callbacks = self.finish(file_path)
+        print(f"Error loading file: {message}")
+        self.show_message(f"Erro ao carregar {os.path.basename(file_path)}: {message}", timeout=6000)
+        for _, _, on_abort in callbacks or []:
+            if on_abort:
+                on_abort()
+
+    def on_cancelled(self, file_path):
+        self.abort(file_path, self.finish(file_path))
+
+    def abort(self, file_path, callbacks):
+        self.show_message(f"Carregamento de {os.path.basename(file_path)} cancelado.")
+        for _, _, on_abort in callbacks or []:
+            if on_abort:
+                on_abort()
+
+    def is_discarded(self, file_path):
+        """Resultados que chegaram depois de um pedido de cancelamento são descartados."""
+        worker = self.workers.get(file_path)
+        return worker is not None and worker.is_cancelled()
+
+    def finish(self, file_path):
+        self.workers.pop(file_path, None)
+        callbacks = self.callbacks.pop(file_path, None)
+        self.update_widgets()
+        return callbacks
+
+    def update_widgets(self):
+        loading = bool(self.workers)
+        self.progress_bar.setVisible(loading)
+        self.cancel_button.setVisible(loading)
+        if not loading:
+            self.progress_bar.reset()
+
+    def show_message(self, message, timeout=3000):
+        # Import local para evitar import circular com Auxiliares
+        from Setup.Auxiliares import status_bar_message
+        status_bar_message(self.status_bar, message, timeout)
+
+
+def get_load_manager(main_window):
+    """Retorna (criando se necessário) o gerenciador de carregamentos da janela principal"""
+    if not hasattr(main_window, 'load_manager') or main_window.load_manager is None:
+        main_window.load_manager = LoadManager(main_window.statusbar, main_window)
+    return main_window.load_manager
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+
+class Dataset:
+    """Dados tipados de uma camada (DataFrame original + arrays NumPy por coluna).
+
+    version é incrementada sempre que os dados mudam, permitindo que caches
+    derivados (codificações, perfis, gráficos) saibam quando se invalidar.
+    """
+
+    def __init__(self, key, df, stats=None):
+        self.key = key
+        self.version = 0
+        self.replace(df, stats)
+
+    def replace(self, df, stats=None):
+        """Troca os dados da camada e invalida os caches derivados."""
+        self.df = df
+        self.stats = stats
+        self.profile = None  # {coluna: perfil}, preenchido em segundo plano (Setup/Perfil.py)
+        self.version += 1
+        self._arrays = {}
+        self._numeric = {}
+        self._encoded = {}
+        self._masks = {}
+        self._positions = None
+
+    @property
+    def row_count(self):
+        return self.df.shape[0]
+
+    def columns(self):
+        return [str(name) for name in self.df.columns]
+
+    def has_column(self, name):
+        return name in self._column_positions()
+
+    def _column_positions(self):
+        if self._positions is None:
+            # Nome (texto) -> posição; a primeira ocorrência vence em nomes repetidos
+            self._positions = {}
+            for col, name in enumerate(self.df.columns):
+                self._positions.setdefault(str(name), col)
+        return self._positions
+
+    def column(self, name):
+        """Array NumPy da coluna, sem cópia e calculado uma única vez por versão."""
+        values = self._arrays.get(name)
+        if values is None:
+            values = self.df.iloc[:, self._column_positions()[name]].to_numpy()
+            self._arrays[name] = values
+        return values
+
+    def numeric(self, name):
+        """Coluna numérica como float64 (nulos viram NaN), calculada uma única vez por versão."""
+        values = self._numeric.get(name)
+        if values is None:
+            values = self.series(name).to_numpy(dtype=np.float64, na_value=np.nan)
+            self._numeric[name] = values
+        return values
+
+    def series(self, name):
+        return self.df.iloc[:, self._column_positions()[name]]
+
+    def is_numeric(self, name):
+        series = self.series(name)
+        return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+    def valid_mask(self, name):
+        """Máscara (somente leitura) das linhas com valor não nulo na coluna."""
+        mask = self._masks.get(name)
+        if mask is None:
+            mask = self.series(name).notna().to_numpy()
+            self._masks[name] = mask
+        return mask
+
+    def encoded(self, name):
+        """Códigos inteiros e dicionário {código: rótulo} da coluna categórica.
+
+        O dicionário é calculado uma vez por versão do dataset; replotar as mesmas
+        colunas com outro estilo reaproveita os códigos em cache.
+        """
+        result = self._encoded.get(name)
+        if result is None:
+            result = encode_categorical(self.series(name))
+            self._encoded[name] = result
+        return result
+
+
+def encode_categorical(series):
+    """Codifica uma coluna em inteiros com operações vetorizadas.
+
+    Equivale ao LabelEncoder aplicado aos valores convertidos em texto (rótulos em
+    ordem alfabética), mas só os valores distintos são convertidos e ordenados.
+    Valores nulos recebem o código -1.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    labels, inverse = np.unique(np.asarray(uniques, dtype=object).astype(str), return_inverse=True)
+    # Remapeia para a ordem alfabética; o item extra mantém o -1 dos nulos
+    remap = np.append(inverse.astype(np.int32), np.int32(-1))
+    return remap[codes], {i: str(label) for i, label in enumerate(labels)}
+
+
+class DatasetRegistry:
+    """Registro dos datasets carregados, indexado pela camada (caminho do arquivo)."""
+
+    def __init__(self):
+        self._datasets = {}
+
+    def register(self, key, df, stats=None):
+        """Registra (ou atualiza, incrementando a versão) o dataset da camada."""
+        dataset = self._datasets.get(key)
+        if dataset is None:
+            dataset = Dataset(key, df, stats)
+            self._datasets[key] = dataset
+        elif dataset.df is not df:
+            dataset.replace(df, stats)
+        return dataset
+
+    def get(self, key):
+        return self._datasets.get(key)
+
+    def remove(self, key):
+        self._datasets.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._datasets
+
+    def keys(self):
+        return list(self._datasets)
+
+
+# Registro único da aplicação
+dataset_registry = DatasetRegistry()
+
@@ -0,0 +1,97 @@
+import numpy as np
+from matplotlib import colors
+
+DEFAULT_POINT_THRESHOLD = 200000  # Acima disso a dispersão é desenhada como raster de densidade
+DEFAULT_BINS = 512  # Células por eixo do raster
+
+
+def data_extent(x, y):
+    """(xmin, xmax, ymin, ymax) dos dados, com margem para eixos degenerados."""
+    xmin, xmax = float(np.nanmin(x)), float(np.nanmax(x))
+    ymin, ymax = float(np.nanmin(y)), float(np.nanmax(y))
+    if xmin == xmax:
+        xmin, xmax = xmin - 0.5, xmax + 0.5
+    if ymin == ymax:
+        ymin, ymax = ymin - 0.5, ymax + 0.5
+    return xmin, xmax, ymin, ymax
+
+
+def density_raster(x, y, values=None, extent=None, bins=DEFAULT_BINS):
+    """Agrupa os pontos em uma grade bins x bins.
+
+    Sem values retorna a contagem de pontos por célula; com values retorna a média
+    de values em cada célula. Células vazias ficam como NaN (transparentes).
+    O custo é uma única passagem vetorizada (np.bincount) sobre os pontos.
+    """
+    if extent is None:
+        extent = data_extent(x, y)
+    xmin, xmax, ymin, ymax = extent
+    nx, ny = (bins, bins) if np.isscalar(bins) else bins
+
+    # Índice da célula de cada ponto; pontos fora da área são descartados
+    ix = np.floor((x - xmin) / (xmax - xmin) * nx).astype(np.int64)
+    iy = np.floor((y - ymin) / (ymax - ymin) * ny).astype(np.int64)
+    ix[x == xmax] = nx - 1  # Ponto no limite superior entra na última célula
+    iy[y == ymax] = ny - 1
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    cells = iy[inside] * nx + ix[inside]
+
+    counts = np.bincount(cells, minlength=nx * ny).astype(float)
+    if values is None:
+        raster = counts
+    else:
+        sums = np.bincount(cells, weights=np.asarray(values, dtype=float)[inside], minlength=nx * ny)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raster = sums / counts
+    raster[counts == 0] = np.nan
+    return raster.reshape(ny, nx), extent
+
+
+def single_color_map(color):
+    """Colormap que vai de transparente até a cor escolhida (modo contagem sem estratificação)."""
+    rgb = colors.to_rgb(color)
+    return colors.LinearSegmentedColormap.from_list("densidade", [(*rgb, 0.15), (*rgb, 1.0)])
+
+
+def draw_density(ax, x, y, values=None, cmap=None, norm=None, color="black", alpha=1.0, extent=None,
+                 bins=DEFAULT_BINS):
+    """Desenha os pontos agregados em raster com imshow e retorna a imagem (para a colorbar).
+
+    Com values (estratificação) cada célula mostra a média de values com cmap/norm;
+    sem values mostra a contagem de pontos em escala logarítmica.
+    """
+    raster, extent = density_raster(x, y, values, extent, bins)
+    if values is None:
+        cmap = single_color_map(color)
+        maximum = np.nanmax(raster) if np.isfinite(raster).any() else 1
+        norm = colors.LogNorm(vmin=1, vmax=max(maximum, 1))
+
+    image = ax.imshow(raster, origin="lower", extent=extent, aspect="auto", cmap=cmap, norm=norm,
+                      alpha=alpha, interpolation="nearest")
+    return image
+
+
+class SpatialIndex:
+    """Índice espacial simples: pontos ordenados por x.
+
+    Uma consulta de retângulo custa duas buscas binárias em x mais um filtro
+    vetorizado em y apenas sobre a faixa selecionada.
+    """
+
+    def __init__(self, x, y, values=None):
+        order = np.argsort(x, kind="stable")
+        self.x = np.asarray(x)[order]
+        self.y = np.asarray(y)[order]
+        self.values = None if values is None else np.asarray(values)[order]
+
+    def __len__(self):
+        return self.x.shape[0]
+
+    def query(self, xmin, xmax, ymin, ymax):
+        """Retorna (x, y, values) dos pontos dentro do retângulo."""
+        lo = np.searchsorted(self.x, xmin, side="left")
+        hi = np.searchsorted(self.x, xmax, side="right")
+        y = self.y[lo:hi]
+        inside = (y >= ymin) & (y <= ymax)
+        values = None if self.values is None else self.values[lo:hi][inside]
+        return self.x[lo:hi][inside], y[inside], values
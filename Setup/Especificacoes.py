@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import tempfile
+
+from Setup.Cache import source_fingerprint
+
+SPEC_FORMAT = "arandu-grafico"
+SPEC_VERSION = 1
+
+
+def specs_folder(project_folder=None):
+    """Pasta das specs de gráficos: dentro do projeto aberto ou no diretório atual."""
+    base_path = project_folder or os.getcwd()
+    return os.path.join(base_path, "Graficos")
+
+
+def safe_file_name(title):
+    """Nome de arquivo seguro (sem extensão) a partir do título do gráfico."""
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", title).strip(" .") or "grafico"
+
+
+def spec_file_name(title):
+    return f"{safe_file_name(title)}.json"
+
+
+def dataset_reference(dataset, project_folder=None):
+    """Referência ao dataset usado: camada (caminho), versão e versão do arquivo de origem (sem o caminho).
+
+    Com project_folder o caminho é gravado relativo ao projeto (ver load_spec).
+    """
+    from Setup.Projeto import stored_path
+
+    try:
+        source = source_fingerprint(dataset.key)
+    except (OSError, TypeError):
+        source = None  # Arquivo removido ou camada sem arquivo
+    dataset_id = stored_path(dataset.key, project_folder) if project_folder else dataset.key
+    return {"id": dataset_id, "versao": dataset.version, "fonte": source, "linhas": dataset.row_count}
+
+
+def save_spec(spec, dataset, title, project_folder=None):
+    """Grava a spec do gráfico (sem os dados) em <projeto>/Graficos/<título>.json; retorna o caminho.
+
+    Os dados não são gravados: ao reabrir, o gráfico é redesenhado a partir do dataset
+    referenciado (que usa o cache de colunas), então o arquivo tem poucos kilobytes.
+    """
+    folder = specs_folder(project_folder)
+    os.makedirs(folder, exist_ok=True)
+    file_path = os.path.join(folder, spec_file_name(title))
+
+    document = {"formato": SPEC_FORMAT, "versao": SPEC_VERSION, "titulo": title, "spec": spec,
+                "dataset": dataset_reference(dataset, project_folder or os.getcwd())}
+
+    # Escrita atômica: um arquivo incompleto nunca substitui uma spec válida
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return file_path
+
+
+def spec_project_folder(file_path):
+    """Pasta do projeto de uma spec gravada em <projeto>/Graficos."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(file_path)))
+
+
+def load_spec(file_path):
+    """Lê uma spec gravada; retorna o documento ({'titulo', 'spec', 'dataset', ...}).
+
+    O caminho do dataset é resolvido a partir da pasta do projeto da spec (o projeto pode ter sido movido).
+    Levanta ValueError se o arquivo não for uma spec de gráfico ou for de uma versão mais nova.
+    """
+    from Setup.Projeto import resolve_path
+
+    with open(file_path, encoding="utf-8") as f:
+        document = json.load(f)
+
+    if not isinstance(document, dict) or document.get("formato") != SPEC_FORMAT:
+        raise ValueError(f"{file_path} não é uma spec de gráfico.")
+    if document.get("versao", 0) > SPEC_VERSION:
+        raise ValueError(f"Spec de versão {document['versao']} não suportada (máx. {SPEC_VERSION}).")
+    reference = document.get("dataset") or {}
+    if reference.get("id"):
+        reference["id"] = resolve_path(reference["id"], spec_project_folder(file_path))
+    return document
+
+
+def source_changed(document):
+    """True se o arquivo de origem mudou desde que a spec foi gravada."""
+    reference = document["dataset"]
+    if reference.get("fonte") is None:
+        return False
+    try:
+        return source_fingerprint(reference["id"]) != reference["fonte"]
+    except OSError:
+        return True
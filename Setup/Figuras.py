@@ -0,0 +1,65 @@
+import gc
+import os
+
+from matplotlib.figure import Figure
+
+
+class FigureManager:
+    """Cria as figuras dos gráficos sem o pyplot e acompanha os canvases vivos.
+
+    Figuras criadas com plt.figure()/plt.subplots() ficam registradas no
+    gerenciador global do pyplot e nunca são liberadas quando a janela do Qt
+    fecha. Aqui a figura pertence apenas ao canvas da janela; ao fechar, a
+    janela chama release() e a figura e os dados do gráfico são descartados.
+    """
+
+    def __init__(self):
+        self._windows = {}  # janela -> canvas
+
+    def new_figure(self, **kwargs):
+        return Figure(**kwargs)
+
+    def track(self, window, canvas):
+        self._windows[window] = canvas
+
+    def release(self, window):
+        """Libera a figura da janela (chamado no fechamento)."""
+        canvas = self._windows.pop(window, None)
+        if canvas is None:
+            return
+        canvas.figure.clear()  # Remove artistas e seus arrays
+        gc.collect()  # Figuras têm referências cíclicas; libera a memória já no fechamento
+
+    def live_count(self):
+        return len(self._windows)
+
+    def data_bytes(self):
+        """Bytes dos dados preparados pelos gráficos abertos."""
+        return sum(getattr(window, "data_bytes", 0) for window in self._windows)
+
+    def report(self):
+        """Texto com o número de figuras abertas e a memória usada."""
+        text = f"Gráficos abertos: {self.live_count()} | Dados: {self.data_bytes() / 2 ** 20:.1f} MB"
+        rss = process_memory()
+        if rss is not None:
+            text += f" | Processo: {rss / 2 ** 20:.0f} MB"
+        return text
+
+
+def process_memory():
+    """Memória residente do processo em bytes (None se não for possível medir)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:  # Linux, sem psutil
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# Gerenciador único da aplicação
+figure_manager = FigureManager()
@@ -0,0 +1,121 @@
+"""Formulários do Qt Designer (Ui/*.ui) compilados para módulos Python.
+
+uic.loadUi interpreta o XML a cada abertura; o módulo gerado pelo compilador
+do uic só cria os widgets. Os módulos ficam em Ui/Compilados/<nome>_ui.py com o
+hash do .ui de origem no cabeçalho, e são regenerados quando o .ui muda.
+
+Para gerar antes do empacotamento (PyInstaller):
+
+    python -m Setup.Formularios
+
+Em um build só com os módulos compilados (sem os .ui), eles são usados como
+estão. Se não for possível compilar ou gravar, o formulário é carregado com
+uic.loadUi.
+"""
+import glob
+import hashlib
+import importlib.util
+import io
+import os
+
+from Setup.Auxiliares import resource_path
+
+UI_FOLDER = "Ui"
+COMPILED_FOLDER = os.path.join(UI_FOLDER, "Compilados")
+HASH_PREFIX = "# ui-sha1: "
+
+
+def ui_hash(source_path):
+    with open(source_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def ui_path(name):
+    return resource_path(os.path.join(UI_FOLDER, f"{name}.ui"))
+
+
+def compiled_path(name):
+    return resource_path(os.path.join(COMPILED_FOLDER, f"{name}_ui.py"))
+
+
+def compiled_hash(py_path):
+    """Hash do .ui gravado no cabeçalho do módulo compilado (None se não existir)"""
+    try:
+        with open(py_path, encoding='utf-8') as f:
+            first_line = f.readline()
+    except OSError:
+        return None
+    return first_line[len(HASH_PREFIX):].strip() if first_line.startswith(HASH_PREFIX) else None
+
+
+def compile_form(source_path, py_path):
+    """Compila o .ui para py_path (escrita atômica); retorna o caminho"""
+    from PyQt5 import uic
+
+    source = io.StringIO()
+    uic.compileUi(source_path, source)
+    os.makedirs(os.path.dirname(py_path), exist_ok=True)
+    tmp_path = f"{py_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f"{HASH_PREFIX}{ui_hash(source_path)}\n")
+        f.write(source.getvalue())
+    os.replace(tmp_path, py_path)
+    return py_path
+
+
+def up_to_date_module(name):
+    """Caminho do módulo compilado do formulário, (re)compilando se o .ui mudou; None se indisponível"""
+    source_path, py_path = ui_path(name), compiled_path(name)
+    if not os.path.exists(source_path):
+        return py_path if os.path.exists(py_path) else None  # Build distribuído só com os módulos
+
+    if compiled_hash(py_path) == ui_hash(source_path):
+        return py_path
+    try:
+        return compile_form(source_path, py_path)
+    except Exception as e:  # Pasta sem permissão de escrita, uic indisponível...
+        print(f"Não foi possível compilar {source_path}: {e}")
+        return None
+
+
+def import_form_module(name, py_path):
+    spec = importlib.util.spec_from_file_location(f"Ui.Compilados.{name}_ui", py_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_form(name, widget):
+    """Monta o formulário Ui/<name>.ui no widget, como uic.loadUi (os widgets viram atributos dele)"""
+    py_path = up_to_date_module(name)
+    if py_path is not None:
+        try:
+            module = import_form_module(name, py_path)
+            form_class = next(value for key, value in vars(module).items() if key.startswith("Ui_"))
+            form = form_class()
+            form.setupUi(widget)
+            for attribute, value in vars(form).items():
+                setattr(widget, attribute, value)
+            return widget
+        except Exception as e:
+            print(f"Formulário compilado {py_path} inválido ({e}); usando loadUi.")
+
+    from PyQt5 import uic
+    return uic.loadUi(ui_path(name), widget)
+
+
+def compile_all():
+    """Compila todos os Ui/*.ui desatualizados; retorna a lista de módulos gerados"""
+    generated = []
+    for source_path in sorted(glob.glob(resource_path(os.path.join(UI_FOLDER, "*.ui")))):
+        name = os.path.splitext(os.path.basename(source_path))[0]
+        py_path = compiled_path(name)
+        if compiled_hash(py_path) != ui_hash(source_path):
+            generated.append(compile_form(source_path, py_path))
+    return generated
+
+
+if __name__ == "__main__":
+    for path in compile_all():
+        print(f"Gerado: {path}")
+    print("Formulários atualizados.")
@@ -1,21 +1,35 @@
+import math
 import os
-import pickle
-import tempfile
 
 import numpy as np
-from PyQt5.QtGui import QStandardItem, QStandardItemModel
-from PyQt5.QtWidgets import QDockWidget, QToolBox, QWidget, QVBoxLayout, QLabel, QMainWindow, QCheckBox, QSpinBox, \
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QDockWidget, QToolBox, QWidget, QVBoxLayout, QLabel, QCheckBox, QSpinBox, \
     QFormLayout, QDoubleSpinBox, QComboBox, QPushButton, QLineEdit, QTableView, \
     QMdiSubWindow, QGridLayout
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+import matplotlib
 import matplotlib.markers as mmarkers
-from matplotlib import pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from sklearn.preprocessing import LabelEncoder
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from PIL import Image
 
-from matplotlib import colors
 import matplotlib.colors as mcolors
 
+from Setup.Agregacao import AGGREGATIONS
+from Setup.Cache import PlotImageCache, image_cache_root, plot_key
+from Setup.Camadas import SPEC_PATH_ROLE, get_layer_registry, set_plot_thumbnail
+from Setup.Datasets import dataset_registry
+from Setup.Densidade import DEFAULT_POINT_THRESHOLD
+from Setup.Especificacoes import dataset_reference, save_spec, source_changed
+from Setup.Figuras import figure_manager
+from Setup.Plotagem import color_norm, data_signature, draw_plot, plot_title, prepare_data, update_style
+from Setup.Renderizacao import RENDER_OFFLOAD_POINTS, get_render_manager
+from Setup.Viewport import ViewportDecimator
+from Setup.Perfil import describe_profile
+
+LABEL_DEBOUNCE_MS = 400  # Pause in the typing before a title/label edit updates the active plot
+
+
 class CustomMdiSubWindow(QMdiSubWindow):
     def closeEvent(self, event):
         """Ao fechar a janela, garante que o objeto seja removido da memória"""
@@ -24,15 +38,184 @@ class CustomMdiSubWindow(QMdiSubWindow):
         event.accept()  # Aceita o fechamento da janela
 
 
+class PlotWindow(CustomMdiSubWindow):
+    """Plot subwindow that keeps its live spec, prepared data and artists.
+
+    Style-only changes are applied to the existing artists; other changes redraw from the cached data
+    and only a change of columns (or of the dataset version) goes back to the dataset.
+    """
+
+    closed = pyqtSignal(object)
+
+    def __init__(self, fig, spec, data, parent=None):
+        super().__init__(parent)
+        self.spec = spec
+        self.data = data
+        self.decimator = None
+        self.spec_path = None  # Saved spec file (Setup/Especificacoes.py)
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        # Attach FigureCanvas
+        self.canvas = FigureCanvas(fig)
+        figure_manager.track(self, self.canvas)
+        self.artists = draw_plot(fig, spec, data)
+        self.setup_decimator()
+        self.canvas.draw()  # Ensure all UI elements (labels, title, etc.) are applied
+        layout.addWidget(NavigationToolbar(self.canvas, widget))
+        layout.addWidget(self.canvas)
+
+        self.setWidget(widget)
+        self.setWindowTitle(plot_title(spec))
+
+    @property
+    def figure(self):
+        return self.canvas.figure
+
+    @property
+    def data_bytes(self):
+        return self.data.nbytes if self.data is not None else 0
+
+    def closeEvent(self, event):
+        """Frees the figure, the prepared data and the pan/zoom callbacks together with the window."""
+        self.closed.emit(self)  # Listeners still see the figure (spec and image are saved)
+        if self.decimator is not None:
+            self.decimator.detach()
+            self.decimator = None
+        figure_manager.release(self)
+        self.artists = None
+        self.data = None
+        super().closeEvent(event)
+
+    def render_image(self):
+        """Current figure as an RGBA image (for the plot image cache)."""
+        self.canvas.draw()
+        return Image.fromarray(np.asarray(self.canvas.buffer_rgba()))
+
+    def setup_decimator(self):
+        """Large scatter plots in density mode re-render the visible points on pan/zoom."""
+        if self.decimator is not None:
+            self.decimator.detach()
+            self.decimator = None
+        if self.artists.mode != "densidade":
+            return
+
+        style = self.spec["estilo"]
+        estratificacao = self.data.estrat is not None
+        decimator_style = dict(s=style["tamanho"], marker=style["marcador"], color=style["cor"],
+                               alpha=style["alpha"], cmap=style["colormap"] if estratificacao else None,
+                               norm=color_norm(style) if estratificacao else None)
+        self.decimator = ViewportDecimator(self.artists, self.data.x, self.data.y, self.data.estrat,
+                                           self.spec["limite_pontos"], decimator_style)
+        self.decimator.attach(self.canvas)
+
+    def update_plot(self, spec, dataset):
+        """Applies a new spec: in place when only the style changed, otherwise redraws."""
+        if data_signature(spec) != data_signature(self.spec) or dataset.version != self.data.version:
+            data = prepare_data(dataset, spec)
+            if data is None:
+                return
+            self.data = data
+            self.redraw(spec)
+        elif update_style(self.artists, self.spec, spec, self.data):
+            self.spec = spec
+            if self.decimator is not None:
+                self.setup_decimator_style()
+            self.canvas.draw_idle()
+        else:
+            self.redraw(spec)  # Same data, different layout: no new pass over the dataset
+
+    def setup_decimator_style(self):
+        style = self.spec["estilo"]
+        self.decimator.style.update(s=style["tamanho"], marker=style["marcador"], color=style["cor"],
+                                    alpha=style["alpha"])
+        if self.data.estrat is not None:
+            self.decimator.style.update(cmap=style["colormap"], norm=color_norm(style))
+
+    def redraw(self, spec):
+        self.spec = spec
+        self.artists = draw_plot(self.figure, spec, self.data)
+        self.setup_decimator()
+        self.canvas.draw_idle()
+
+
+class CachedPlotWindow(CustomMdiSubWindow):
+    """Shows a plot as an image (cached, or rendered off the GUI thread); the live plot replaces it on the first
+    click, wheel turn or resize, so pan/zoom and the viewport re-decimation work as in any plot window.
+
+    Plots rendered in the background also keep their spec and prepared data, so style edits re-render them.
+    """
+
+    closed = pyqtSignal(object)
+    activated = pyqtSignal(object)
+
+    def __init__(self, title, image_path=None, parent=None):
+        super().__init__(parent)
+        self.spec = None
+        self.data = None
+        self.rendered = None  # PIL image of the last background render
+        self.request_id = None  # Pending render (Setup/Renderizacao.py)
+        self.spec_path = None
+        self.interactive = False  # Resizes only count once the image is on screen (not the initial layout)
+        self.live_requested = False
+
+        self.image = QLabel()
+        self.image.setAlignment(Qt.AlignCenter)
+        self.image.setToolTip("Clique para interagir com o gráfico")
+        self.image.mousePressEvent = self.request_live
+        self.image.wheelEvent = self.request_live
+        if image_path:
+            self.image.setPixmap(QPixmap(image_path))
+        else:
+            self.image.setText("Renderizando...")  # Placeholder until the render arrives
+
+        self.setWidget(self.image)
+        self.setWindowTitle(title)
+
+    def set_rgba(self, width, height, rgba):
+        self.rendered = Image.frombuffer("RGBA", (width, height), rgba, "raw", "RGBA", 0, 1)
+        self.image.setPixmap(QPixmap.fromImage(QImage(rgba, width, height, QImage.Format_RGBA8888)))
+        QTimer.singleShot(0, self.enable_interaction)
+
+    def enable_interaction(self):
+        self.interactive = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.image.pixmap() is not None and not self.image.pixmap().isNull():
+            QTimer.singleShot(0, self.enable_interaction)  # Cached image: after the MDI area placed the window
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.interactive and event.oldSize().isValid():
+            self.request_live()
+
+    def request_live(self, event=None):
+        """Asks (once) for the live plot in place of the image."""
+        if not self.live_requested:
+            self.live_requested = True
+            self.activated.emit(self)
+
+    def render_image(self):
+        return self.rendered
+
+    def closeEvent(self, event):
+        self.closed.emit(self)
+        super().closeEvent(event)
+
+
 class GraficosDock(QDockWidget):
     """Janela flutuante com um QToolBox para ajustes"""
     def __init__(self, treeview, mdi_area, parent=None):
         super().__init__("Análise de Dados", parent)
+        self.setObjectName("graficos_dock")  # Needed by QMainWindow.saveState (project file)
 
         self.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
         #self.setFloating(True)  # Permite que o Dock fique independente
         self.tree_view = treeview
         self.mdi_area = mdi_area
+        self.layers = get_layer_registry(treeview.window())  # Layers and plot windows indexed by name/title
         # Initialize the set to track open subwindows
         self.open_subwindows = set()
 
@@ -72,9 +255,13 @@ class GraficosDock(QDockWidget):
 
         # Connect combo_box selection change to column update
         self.combo_box.currentIndexChanged.connect(self.populate_table_columns)
+        # Prefill ranges from the column profile
+        self.estrat.currentTextChanged.connect(self.prefill_color_range)
+        self.var_hist_x.currentTextChanged.connect(self.prefill_bin_range)
         self.plotar_botao.clicked.connect(lambda: self.plot_graph('dispersao', self.checkbox_estratificacao.isChecked()))
         self.plotar_botao_b.clicked.connect(lambda: self.plot_graph('barras', self.checkbox_estratificacao.isChecked()))
         self.plotar_botao_h.clicked.connect(lambda: self.plot_graph('histograma', self.checkbox_estratificacao.isChecked()))
+        self.connect_live_updates()
 
     def toolbox_dispersao(self):
         # Seção Gráfico de Dispersão
@@ -91,6 +278,8 @@ class GraficosDock(QDockWidget):
         self.alpha.setRange(0, 1)
         self.alpha.setSingleStep(0.01)
         self.alpha.setValue(0.8)
+        self.min_color_val.setRange(-999999999, 999999999)
+        self.max_color_val.setRange(-999999999, 999999999)
 
         layout1 = QFormLayout()  # Form Layout para alinhamento correto
         # Adiciona os widgets ao layout
@@ -138,11 +327,14 @@ class GraficosDock(QDockWidget):
         self.cor_b = QComboBox()
         self.edge_color = QComboBox()
         self.hatch = QComboBox()
+        self.agregacao = QComboBox()  # Alturas agrupadas por X antes de desenhar
+        self.agregacao.addItems(AGGREGATIONS)
         self.plotar_botao_b = QPushButton("Plotar Barras")
         layout2 = QFormLayout()  # Form Layout para alinhamento correto
         # Adiciona os widgets ao layout
         layout2.addRow(QLabel("Variável X:"), self.var_b_x)
         layout2.addRow(QLabel("Altura:"), self.var_b_height)
+        layout2.addRow(QLabel("Agregação:"), self.agregacao)
         layout2.addRow(QLabel("Largura:"), self.var_b_width)
         layout2.addRow(QLabel("Alinhamento:"), self.align)
         layout2.addRow(QLabel("Cor:"), self.cor_b)
@@ -188,6 +380,8 @@ class GraficosDock(QDockWidget):
         self.function.addItem("fd")
         self.function.addItem("doane")
         self.function.addItem("scott")
+        self.range_min.setRange(-999999999, 999999999)
+        self.range_max.setRange(-999999999, 999999999)
 
         layout3 = QFormLayout()  # Form Layout para alinhamento correto
         # Adiciona os widgets ao layout
@@ -213,6 +407,9 @@ class GraficosDock(QDockWidget):
         layout_bin.addWidget(self.range_min, 0, 1)  # Widget in the second column
         layout_bin.addWidget(QLabel("Range Max.:"), 0, 2)  # Second label in the third column
         layout_bin.addWidget(self.range_max, 0, 3)  # Widget in the fourth column
+        # Second row with the bin width rule
+        layout_bin.addWidget(QLabel("Função:"), 1, 0)
+        layout_bin.addWidget(self.function, 1, 1, 1, 3)
 
         self.bins_widget.setLayout(layout_bin)
         self.bins_widget.setVisible(False)  # Inicialmente oculto
@@ -227,6 +424,12 @@ class GraficosDock(QDockWidget):
         self.ylabel = QLineEdit()
         self.grid = QCheckBox()
         self.legend = QCheckBox()
+        self.limite_pontos = QSpinBox()  # Acima desse número de pontos a dispersão vira raster de densidade
+        self.limite_pontos.setRange(1000, 999999999)
+        self.limite_pontos.setSingleStep(10000)
+        self.limite_pontos.setValue(DEFAULT_POINT_THRESHOLD)
+        self.atualizar_ativo = QCheckBox()  # Edições de estilo atualizam o gráfico ativo na hora
+        self.atualizar_ativo.setChecked(True)
         layout4 = QFormLayout()  # Form Layout para alinhamento correto
         # Widgets de configuração
         # Adiciona os widgets ao layout
@@ -235,6 +438,8 @@ class GraficosDock(QDockWidget):
         layout4.addRow(QLabel("Eixo Y:"), self.ylabel)  # Linha para titulo
         layout4.addRow(QLabel("Mostrar Grade:"), self.grid)  # Linha para titulo
         layout4.addRow(QLabel("Mostrar Legenda:"), self.legend)  # Linha para titulo
+        layout4.addRow(QLabel("Limite de Pontos (Densidade):"), self.limite_pontos)
+        layout4.addRow(QLabel("Atualizar Gráfico Ativo:"), self.atualizar_ativo)
         config_widget.setLayout(layout4)
         self.toolbox.addItem(config_widget, "Configurações")
 
@@ -246,35 +451,35 @@ class GraficosDock(QDockWidget):
         self.bins_widget.setVisible(state == 2)
 
     def connect_tree_signals(self):
-        """Connect model signals to update the combo box dynamically."""
-        model = self.tree_view.model()
-
-        if model:
-            model.rowsInserted.connect(self.populate_combo)
-            model.rowsRemoved.connect(self.populate_combo)
-            model.dataChanged.connect(self.populate_combo)
-
-        # Populate initially
-        self.populate_combo()
-
-    def populate_combo(self):
-        """Populate the combo box with file names from the tree view."""
-        self.combo_box.clear()
-        model = self.tree_view.model()
-        if not model:
-            return
-
-        root_index = model.invisibleRootItem()  # Get the root item
+        """Keeps the file combo in sync with the layers: one item is added or removed per change."""
+        self.layers.layer_added.connect(self.on_layer_added)
+        self.layers.layer_removed.connect(self.on_layer_removed)
 
-        # Recursively fetch filenames
-        def get_all_items(parent_item):
-            for row in range(parent_item.rowCount()):
-                item = parent_item.child(row)
-                if item:
-                    self.combo_box.addItem(item.text())  # Add the item name
-                    get_all_items(item)  # Check for nested items
+        # Populate initially (layers only; plots under them are not files)
+        self.combo_box.blockSignals(True)
+        self.combo_box.addItems(self.layers.layer_names())
+        self.combo_box.blockSignals(False)
 
-        get_all_items(root_index)
+    def on_layer_added(self, name):
+        if self.combo_box.findText(name) >= 0:
+            return
+        first = self.combo_box.count() == 0
+        self.combo_box.blockSignals(True)  # Adding a file must not reset the column selections
+        self.combo_box.addItem(name)
+        self.combo_box.blockSignals(False)
+        if first:
+            self.populate_table_columns()
+
+    def on_layer_removed(self, name):
+        index = self.combo_box.findText(name)
+        if index < 0:
+            return
+        current = index == self.combo_box.currentIndex()
+        self.combo_box.blockSignals(True)
+        self.combo_box.removeItem(index)
+        self.combo_box.blockSignals(False)
+        if current:
+            self.populate_table_columns()  # Selected file removed
 
     def populate_markers(self):
         """Preenche o QComboBox com os nomes dos marcadores do Matplotlib"""
@@ -285,7 +490,7 @@ class GraficosDock(QDockWidget):
 
     def populate_colormaps(self):
         """Preenche o QComboBox com os nomes dos colormaps do Matplotlib"""
-        colormaps = plt.colormaps()  # Obtém todos os colormaps disponíveis
+        colormaps = list(matplotlib.colormaps)  # Obtém todos os colormaps disponíveis
         for cmap in colormaps:
             self.color_map.addItem(cmap)
 
@@ -306,385 +511,426 @@ class GraficosDock(QDockWidget):
             self.hatch.addItem(pattern)
 
     def get_table_model_by_filename(self, filename):
-        """Finds the table model based on the selected filename from combo_box."""
-        if not self.mdi_area:
+        """Finds the table model of the layer selected in combo_box."""
+        layer = self.layers.by_name(filename)
+        if layer is None or layer.table_window is None:
             return None
+        table_view = layer.table_window.findChild(QTableView)
+        return table_view.model() if table_view else None
 
-        for subwindow in self.mdi_area.subWindowList():
-            table_view = subwindow.findChild(QTableView)
-            if table_view and table_view.model():
-                # Assume the window title corresponds to the filename
-                if subwindow.windowTitle() == filename:
-                    return table_view.model()
-
-        return None
+    def get_dataset_by_filename(self, filename):
+        """Finds the typed dataset registered for the layer selected in combo_box."""
+        layer = self.layers.by_name(filename)
+        return dataset_registry.get(layer.path) if layer else None
 
     def populate_table_columns(self):
-        """Populate var_x and var_y with column names from the table corresponding to the selected file."""
+        """Populate var_x and var_y with column names from the dataset corresponding to the selected file."""
         selected_filename = self.combo_box.currentText()
-        model = self.get_table_model_by_filename(selected_filename)
-
-        if not model:
-            self.var_x.clear()
-            self.var_y.clear()
-            self.estrat.clear()
-            self.var_b_x.clear()
-            self.var_b_height.clear()
-            self.var_hist_x.clear()
-            self.peso.clear()
+        dataset = self.get_dataset_by_filename(selected_filename)
+        layer = self.layers.by_name(selected_filename)
+        if dataset is None and layer is not None:
+            self.map_layer_dataset(layer)
+
+        # Combo boxes that accept any column and those that only make sense with numeric columns
+        any_column_combos = [self.var_x, self.var_y, self.estrat, self.var_b_x]
+        numeric_combos = [self.var_b_height, self.var_hist_x, self.peso]
+
+        # Keep the current selections when the columns are only being refreshed (e.g. profile ready)
+        selections = {combo_box: combo_box.currentText() for combo_box in any_column_combos + numeric_combos}
+        for combo_box in selections:
+            combo_box.blockSignals(True)
+            combo_box.clear()
+
+        if dataset:
+            # Columns without any value are left out
+            column_names = [name for name in dataset.columns()
+                            if name and (self.column_profile(dataset, name) or {}).get("count", 1) > 0]
+            numeric_names = [name for name in column_names if self.is_numeric_column(dataset, name)]
+
+            # Populate each combo box with "None" and the column names
+            for combo_boxes, names in ((any_column_combos, column_names), (numeric_combos, numeric_names)):
+                for combo_box in combo_boxes:
+                    combo_box.addItem(None)  # Add "None" as the first item
+                    for name in names:
+                        combo_box.addItem(name)  # Add each column name
+                        profile = self.column_profile(dataset, name)
+                        if profile:
+                            combo_box.setItemData(combo_box.count() - 1, describe_profile(profile), Qt.ToolTipRole)
+
+        for combo_box, text in selections.items():
+            combo_box.setCurrentText(text)
+            combo_box.blockSignals(False)
+
+    def map_layer_dataset(self, layer):
+        """Layers restored from a project are mapped only when first selected; the columns fill in when ready."""
+        from Setup.Auxiliares import load_dataset
+
+        def on_loaded(dataset):
+            if self.combo_box.currentText() == layer.name:
+                self.populate_table_columns()
+
+        def on_failed():
+            status_bar = getattr(self.parent(), "statusbar", None)
+            if status_bar is not None:
+                status_bar.showMessage(f"Não foi possível carregar {layer.name}.", 6000)
+
+        load_dataset(layer.path, self.parent(), on_loaded, on_failed)
+
+    def column_profile(self, dataset, name):
+        """Returns the cached column profile (None while profiling still runs)."""
+        return dataset.profile.get(name) if dataset.profile else None
+
+    def is_numeric_column(self, dataset, name):
+        profile = self.column_profile(dataset, name)
+        if profile:
+            return profile["kind"] == "numeric"
+        return dataset.is_numeric(name)
+
+    def on_dataset_profiled(self, dataset):
+        """Refreshes columns and ranges once the background profile of the selected dataset is ready."""
+        if self.get_dataset_by_filename(self.combo_box.currentText()) is not dataset:
             return
+        self.populate_table_columns()
+        self.prefill_color_range()
+        self.prefill_bin_range()
+
+    def profile_range(self, column_name):
+        """(min, max) of the column in the selected dataset, from the profile; None if unknown."""
+        dataset = self.get_dataset_by_filename(self.combo_box.currentText())
+        if not dataset or not dataset.has_column(column_name):
+            return None
+        profile = self.column_profile(dataset, column_name)
+        if not profile:
+            return None
+        if profile["kind"] == "numeric" and profile["min"] is not None:
+            return profile["min"], profile["max"]
+        if profile["kind"] != "numeric" and profile["distinct"]:
+            return 0, profile["distinct"] - 1  # Categorical columns are plotted as codes
+        return None
 
-        self.var_x.clear()
-        self.var_y.clear()
-        self.estrat.clear()
-        self.var_b_x.clear()
-        self.var_b_height.clear()
-        self.var_hist_x.clear()
-        self.peso.clear()
-
-        # List of combo boxes to be populated
-        combo_boxes = [self.var_x, self.var_y, self.estrat, self.var_b_x,
-                       self.var_b_height, self.var_hist_x, self.peso]
-
-        # Populate each combo box with "None" and the column names
-        for combo_box in combo_boxes:
-            combo_box.addItem(None)  # Add "None" as the first item
-            for col in range(model.columnCount()):
-                column_name = model.headerData(col, Qt.Horizontal)
-                if column_name:
-                    combo_box.addItem(column_name)  # Add each column name
+    def prefill_color_range(self):
+        value_range = self.profile_range(self.estrat.currentText())
+        if value_range:
+            self.min_color_val.setValue(math.floor(value_range[0]))
+            self.max_color_val.setValue(math.ceil(value_range[1]))
 
-    def plot_graph(self, grafico_checker, checkbox=False):
-        """Creates a new MDI subwindow with the selected graph and adds it under the corresponding file in the tree view."""
-        model, var_x_name, var_y_name, estrat_name = self.get_selected_data(grafico_checker)
+    def prefill_bin_range(self):
+        value_range = self.profile_range(self.var_hist_x.currentText())
+        if value_range:
+            self.range_min.setValue(math.floor(value_range[0]))
+            self.range_max.setValue(math.ceil(value_range[1]))
 
-        if not model:
-            return
+    def plot_graph(self, grafico_checker, checkbox=False):
+        """Creates a new MDI subwindow with the selected graph and adds it under the corresponding file in the tree view.
 
-        x_data, y_data, estrat_data, x_labels, y_labels = self.process_data(model, var_x_name, var_y_name, estrat_name,
-                                                                            checkbox, grafico_checker)
+        If a plot window of the same data (file, type and columns) is already open it is restyled in place instead.
+        """
+        spec = self.build_spec(grafico_checker, checkbox)
+        dataset = self.get_dataset_by_filename(spec["arquivo"])
 
-        if x_data is None or y_data is None:
+        if not dataset:
+            print("No dataset found for selected file.")
             return
 
-        if grafico_checker == 'dispersao':
-            self.create_scatter_plot(x_data, y_data, estrat_data, x_labels, y_labels, estrat_name, checkbox)
-        if grafico_checker == 'barras':
-            self.create_bar_plot( x_data, y_data, x_labels, y_labels)
-        if grafico_checker == 'histograma':
-            self.create_hist_plot( x_data, y_data, x_labels, y_labels)
-
-    def get_selected_data(self, grafico_checker):
-        """Retrieves the selected model and column names."""
-        selected_filename = self.combo_box.currentText()
-        model = self.get_table_model_by_filename(selected_filename)
-
-        if not model:
-            print("No table model found for selected file.")
-            return None, None, None, None
-
-
-
+        window = self.find_plot_window(spec)
+        if isinstance(window, PlotWindow):
+            window.update_plot(spec, dataset)
+            self.assign_title(window, spec)
+            self.layers.rename_plot(window)
+            self.save_plot_spec(window, dataset)
+            return window
+        if window is not None:
+            window.close()  # Image of the same plot: replaced by the new one
+
+        data = prepare_data(dataset, spec)
+        if data is None:
+            return
 
+        if data.point_count > RENDER_OFFLOAD_POINTS:
+            return self.display_rendered(spec, data, dataset)  # Heavy plot: render in a worker process
 
-        # if not var_x_name or not var_y_name:
-        #     print("Please select both X and Y variables.")
-        #     return None, None, None, None
+        fig = figure_manager.new_figure()  # Not registered in pyplot: freed when the window closes
+        return self.display_plot(fig, spec, data, dataset)
 
+    def get_selected_columns(self, grafico_checker):
+        """Retrieves the selected column names (X, Y/height/weight) for the plot type."""
         if grafico_checker == 'dispersao':
-            var_x_name = self.var_x.currentText()
-            var_y_name = self.var_y.currentText()
-            estrat_name = self.estrat.currentText()
-            return model, var_x_name, var_y_name, estrat_name
+            return self.var_x.currentText(), self.var_y.currentText()
         if grafico_checker == 'barras':
-            var_x_b = self.var_b_x.currentText()
-            var_b_height = self.var_b_height.currentText()
-            estrat_name = self.estrat.currentText()
-            return model, var_x_b, var_b_height, estrat_name
+            return self.var_b_x.currentText(), self.var_b_height.currentText()
         if grafico_checker == 'histograma':
-            var_hist_x = self.var_hist_x.currentText()
-            peso = self.peso.currentText()
-            estrat_name = self.estrat.currentText()
-            return model, var_hist_x, peso, estrat_name
-
-    def process_data(self, model, var_x_name, var_y_name, estrat_name, checkbox, grafico_checker):
-        """Extracts and processes data from the model."""
-        col_x, col_y, col_estrat = self.get_column_indices(model, var_x_name, var_y_name, estrat_name, checkbox)
-
-        if grafico_checker != 'histograma':
-            if col_x is None or col_y is None:
-                print("Selected columns not found.")
-                return None, None, None, None, None
-
-        raw_x_data, raw_y_data, raw_estrat_data = self.extract_raw_data(model, col_x, col_y, col_estrat, checkbox)
-
-        # Process X and Y
-        x_data, x_labels = self.encode_data(raw_x_data)
-        y_data, y_labels = self.encode_data(raw_y_data)
-
-        # Process stratification variable (if enabled)
-        if checkbox and raw_estrat_data:
-            estrat_data, estrat_labels = self.encode_data(raw_estrat_data)
-        else:
-            estrat_data, estrat_labels = None, None
-
-        return x_data, y_data, estrat_data, x_labels, y_labels
-
-    def get_column_indices(self, model, var_x_name, var_y_name, estrat_name, checkbox):
-        """Finds the column indices for the selected variables."""
-        col_x, col_y, col_estrat = None, None, None
-
-        for col in range(model.columnCount()):
-            header = model.headerData(col, Qt.Horizontal)
-            if header == var_x_name:
-                col_x = col
-            if header == var_y_name:
-                col_y = col
-            if checkbox and header == estrat_name:
-                col_estrat = col
-
-        return col_x, col_y, col_estrat
-
-    def extract_raw_data(self, model, col_x, col_y, col_estrat, checkbox, checker='hist'):
-        """Extracts raw data from the model."""
-        raw_x_data, raw_y_data, estrat_data = [], [], []
-
-        for row in range(model.rowCount()):
-            x_value = model.index(row, col_x).data()
-            y_value = model.index(row, col_y).data()
-            estrat_value = model.index(row, col_estrat).data() if checkbox and col_estrat is not None else None
-
-            if x_value is not None and y_value is not None:
-                raw_x_data.append(x_value)
-                raw_y_data.append(y_value)
-                if checkbox and estrat_value is not None:
-                    estrat_data.append(estrat_value)
-
-        return raw_x_data, raw_y_data, estrat_data
-
-    def encode_data(self, data):
-        """Encodes categorical data into numeric values if necessary."""
-        if all(isinstance(val, (int, float)) for val in data):
-            return list(map(float, data)), None  # Keep numbers as they are
-
-        # Convert everything to strings first (handles mixed cases)
-        data = [str(val) for val in data]
-
-        encoder = LabelEncoder()
-        numeric_data = encoder.fit_transform(data)
-        labels = {i: label for i, label in enumerate(encoder.classes_)}
-
-        return numeric_data, labels
-
-    def create_scatter_plot(self, x_data, y_data, estrat_data, x_labels, y_labels, estrat_name,
-                            checkbox):
-        """Creates and displays the scatter plot."""
-        fig, ax = plt.subplots()
-        s = self.tamanho.value()  # Marker size
-        marker = self.marcadores.currentText()  # Marker style
-        alpha = self.alpha.value()  # Transparency
-
-        if checkbox:
-            cmap = self.color_map.currentText()
-            norm = colors.Normalize(vmin=self.min_color_val.value(), vmax=self.max_color_val.value())
-            scatter = ax.scatter(x_data, y_data, s=s, marker=marker, c=estrat_data, cmap=cmap, norm=norm, alpha=alpha)
-            fig.colorbar(scatter, ax=ax, label=estrat_name)
-        else:
-            c = self.cor.currentText()
-            ax.scatter(x_data, y_data, s=s, marker=marker, c=c, alpha=alpha)
-
-        # Set axis labels
-        if self.xlabel.text() != "":
-            ax.set_xlabel(self.xlabel.text())
-        else:
-            ax.set_xticks(range(len(x_labels)))
-            ax.set_xticklabels([x_labels[i] for i in range(len(x_labels))], rotation=45)
-
-        if self.ylabel.text() != "":
-            ax.set_ylabel(self.ylabel.text())
-        else:
-            ax.set_yticks(range(len(y_labels)))
-            ax.set_yticklabels([y_labels[i] for i in range(len(y_labels))])
-
-        ax.set_title(self.title.text())
-
-        if self.grid.isChecked():
-            # Enable the grid
-            ax.grid(True)
-
-        self.display_plot(fig, self.title.text(), "Dispersão")
-
-    def create_bar_plot(self, x_data, y_data, x_labels, y_labels):
-        """Creates and displays the bar plot."""
-        fig, ax = plt.subplots()
-
-        width = self.var_b_width.value()
-        align = self.align.currentText()
-        cor_b = self.cor_b.currentText()
-        edge_color = self.edge_color.currentText()
-        hatch = self.hatch.currentText()
-
-        ax.bar(x_data, y_data, width=width, align=align, color=cor_b, edgecolor=edge_color, hatch=hatch)
-
-        # Set axis labels
-        if self.xlabel.text() != "":
-            ax.set_xlabel(self.xlabel.text())
-        else:
-            ax.set_xticks(range(len(x_labels)))
-            ax.set_xticklabels([x_labels[i] for i in range(len(x_labels))], rotation=45)
-
-        if self.ylabel.text() != "":
-            ax.set_ylabel(self.ylabel.text())
-        else:
-            ax.set_yticks(range(len(y_labels)))
-            ax.set_yticklabels([y_labels[i] for i in range(len(y_labels))])
-
-        ax.set_title(self.title.text())
-
-        if self.grid.isChecked():
-            # Enable the grid
-            ax.grid(True)
-
-        self.display_plot(fig, self.title.text(), "Barras")
-
-    def create_hist_plot(self, x_data, y_data, x_labels, y_labels):
-        """Creates and displays the histogram plot."""
-        fig, ax = plt.subplots()
+            return self.var_hist_x.currentText(), self.peso.currentText()
+        return None, None
+
+    def build_spec(self, grafico_checker, checkbox=False):
+        """Collects plot type, columns, style and labels from the dock widgets into a plot spec."""
+        var_x_name, var_y_name = self.get_selected_columns(grafico_checker)
+        return {
+            "tipo": grafico_checker,
+            "arquivo": self.combo_box.currentText(),
+            "x": var_x_name,
+            "y": var_y_name,
+            "estrat": self.estrat.currentText(),
+            "estratificacao": bool(checkbox),
+            "limite_pontos": self.limite_pontos.value(),
+            "estilo": self.collect_style(grafico_checker),
+            "rotulos": {
+                "titulo": self.title.text(),
+                "eixo_x": self.xlabel.text(),
+                "eixo_y": self.ylabel.text(),
+                "grade": self.grid.isChecked(),
+                "legenda": self.legend.isChecked(),
+            },
+        }
+
+    def collect_style(self, grafico_checker):
+        """Style fields of the plot type."""
+        if grafico_checker == 'dispersao':
+            return {
+                "tamanho": self.tamanho.value(),
+                "cor": self.cor.currentText(),
+                "marcador": self.marcadores.currentText(),
+                "alpha": self.alpha.value(),
+                "colormap": self.color_map.currentText(),
+                "cor_min": self.min_color_val.value(),
+                "cor_max": self.max_color_val.value(),
+            }
+        if grafico_checker == 'barras':
+            return {
+                "largura": self.var_b_width.value(),
+                "alinhamento": self.align.currentText(),
+                "cor": self.cor_b.currentText(),
+                "borda": self.edge_color.currentText(),
+                "hachura": self.hatch.currentText(),
+                "agregacao": self.agregacao.currentText(),
+            }
+        return {
+            "cor": self.color_h.currentText(),
+            "borda": self.edge_h.currentText(),
+            "orientacao": self.orientacao.currentText(),
+            "alinhamento": self.align_h.currentText(),
+            "tipo": self.histtipe.currentText(),
+            "preenchimento": self.fill.isChecked(),
+            "densidade": self.density.isChecked(),
+            "log": self.log.isChecked(),
+            "bins_personalizados": self.bins.isChecked(),
+            "range_min": self.range_min.value(),
+            "range_max": self.range_max.value(),
+            "funcao": self.function.currentText(),
+        }
+
+    def find_plot_window(self, spec):
+        """Open plot window of the same data as the spec (plotting it again restyles it instead of opening a copy)."""
+        signature = data_signature(spec)
+        for window in self.layers.open_plots():
+            if window.spec is not None and data_signature(window.spec) == signature:
+                return window
+        return None
 
-        align = self.align_h.currentText()
-        cor_b = self.color_h.currentText()
-        edge_color = self.edge_h.currentText()
-        orientation = self.orientacao.currentText()
-        type = self.histtipe.currentText()
-        fill = self.fill.isChecked()
-        density = self.density.isChecked()
-        log = self.log.isChecked()
+    def assign_title(self, window, spec, title=None):
+        """Sets the plot title on the window; a title already used by another plot gets a number ("... (2)")."""
+        if title is None:
+            base = title = plot_title(spec)
+            count = 1
+            while self.layers.plot_title_taken(title, spec["arquivo"], window):
+                count += 1
+                title = f"{base} ({count})"
+        window.setWindowTitle(title)
+
+    def connect_live_updates(self):
+        """Style edits are applied right away to the current plot window (when "Atualizar Gráfico Ativo" is on).
+
+        Typed labels wait for a pause in the typing: one update (and one background render) per edit, not per key.
+        """
+        self.label_timer = QTimer(self)
+        self.label_timer.setSingleShot(True)
+        self.label_timer.setInterval(LABEL_DEBOUNCE_MS)
+        self.label_timer.timeout.connect(self.on_style_changed)
+
+        style_widgets = [self.tamanho, self.cor, self.marcadores, self.alpha, self.color_map, self.min_color_val,
+                         self.max_color_val, self.cor_b, self.edge_color, self.hatch, self.color_h, self.edge_h,
+                         self.title, self.xlabel, self.ylabel, self.grid, self.legend]
+        for widget in style_widgets:
+            if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+                widget.valueChanged.connect(self.on_style_changed)
+            elif isinstance(widget, QComboBox):
+                widget.currentIndexChanged.connect(self.on_style_changed)
+            elif isinstance(widget, QLineEdit):
+                widget.textChanged.connect(self.label_timer.start)  # Restarts the wait on every key
+                widget.editingFinished.connect(self.flush_label_edit)
+            elif isinstance(widget, QCheckBox):
+                widget.stateChanged.connect(self.on_style_changed)
+
+    def flush_label_edit(self):
+        if self.label_timer.isActive():
+            self.label_timer.stop()
+            self.on_style_changed()
+
+    def on_style_changed(self, *args):
+        if not self.atualizar_ativo.isChecked():
+            return
+        window = self.mdi_area.currentSubWindow()
+        if not isinstance(window, (PlotWindow, CachedPlotWindow)) or window.data is None:
+            return
 
-        print(y_data)
-        # Assuming x_data and weights are already defined
-        weights = np.ones_like(y_data)  # Example, replace with actual weights if needed
+        spec = self.build_spec(window.spec["tipo"], self.checkbox_estratificacao.isChecked())
+        if data_signature(spec) != data_signature(window.spec) or spec == window.spec:
+            return  # The dock points at other data: only an explicit "Plotar" replaces it
 
-        if self.bins.isChecked():
-            pass
+        dataset = self.get_dataset_by_filename(spec["arquivo"])
+        if not dataset:
+            return
+        if isinstance(window, PlotWindow):
+            window.update_plot(spec, dataset)
         else:
-            ax.hist(x_data, color=cor_b, edgecolor=edge_color, orientation=orientation, align=align, histtype=type, weights=weights, fill=fill,
-                    density=density, log=log)
+            window.spec = spec  # Rendered in the background: render again with the new style
+            self.render_in_background(window, dataset)
+        self.assign_title(window, spec)
+        self.layers.rename_plot(window)
+
+    def display_plot(self, fig, spec, data, dataset, title=None):
+        """Displays the plot in a new MDI subwindow (with the navigation toolbar) and saves its spec."""
+        subwindow = PlotWindow(fig, spec, data)
+        self.assign_title(subwindow, spec, title)
+        subwindow.closed.connect(self.on_plot_closed)
+        self.mdi_area.addSubWindow(subwindow)
+        subwindow.show()
+        self.show_figure_report()
 
-        # Set axis labels
-        if self.xlabel.text() != "":
-            ax.set_xlabel(self.xlabel.text())
-        else:
-            ax.set_xticks(range(len(x_labels)))
-            ax.set_xticklabels([x_labels[i] for i in range(len(x_labels))], rotation=45)
+        # Add the subwindow to the tree
+        self.layers.add_plot(spec["arquivo"], subwindow)
+        self.save_plot_spec(subwindow, dataset)
 
-        if self.ylabel.text() != "":
-            ax.set_ylabel(self.ylabel.text())
-        else:
-            ax.set_yticks(range(len(y_labels)))
-            ax.set_yticklabels([y_labels[i] for i in range(len(y_labels))])
+        return subwindow
 
-        ax.set_title(self.title.text())
+    def display_rendered(self, spec, data, dataset):
+        """Shows a placeholder window and renders the plot in a worker process (the GUI stays responsive)."""
+        subwindow = CachedPlotWindow(plot_title(spec))
+        subwindow.spec, subwindow.data = spec, data
+        self.assign_title(subwindow, spec)
+        subwindow.closed.connect(self.on_plot_closed)
+        subwindow.activated.connect(lambda window: self.open_live_plot(window, dataset))
+        self.mdi_area.addSubWindow(subwindow)
+        subwindow.show()
 
-        if self.grid.isChecked():
-            # Enable the grid
-            ax.grid(True)
+        self.layers.add_plot(spec["arquivo"], subwindow)
+        self.render_in_background(subwindow, dataset)
+        return subwindow
 
-        self.display_plot(fig, self.title.text(), "Histograma")
+    def render_in_background(self, subwindow, dataset):
+        render_manager = get_render_manager(self.parent())
+        if subwindow.request_id is not None:
+            render_manager.cancel(subwindow.request_id)  # Only the latest spec matters
+
+        def on_ready(width, height, rgba, error):
+            subwindow.request_id = None
+            if error is not None:
+                print(f"Error rendering plot: {error}")
+                subwindow.image.setText(f"Erro ao renderizar: {error}")
+                return
+            subwindow.set_rgba(width, height, rgba)
+            self.save_plot_spec(subwindow, dataset)
+
+        subwindow.request_id = render_manager.submit(subwindow.spec, subwindow.data, on_ready, dataset.key,
+                                                     getattr(self.parent(), 'project_folder', None))
+
+    def open_live_plot(self, subwindow, dataset):
+        """Replaces a rendered image by the interactive plot (drawn on the GUI thread)."""
+        spec, data, title = subwindow.spec, subwindow.data, subwindow.windowTitle()
+        subwindow.close()
+        return self.display_plot(figure_manager.new_figure(), spec, data, dataset, title)
+
+    def save_plot_spec(self, subwindow, dataset):
+        """Saves the plot spec (columns, style and a dataset reference, no data) next to the project."""
+        project_folder = getattr(self.parent(), 'project_folder', None)
+        try:
+            spec_path = save_spec(subwindow.spec, dataset, subwindow.windowTitle(), project_folder)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving plot spec: {e}")
+            return
 
-    def display_plot(self, fig, titulo, grafico):
-        """Displays the plot in a new MDI subwindow and saves it correctly."""
-        subwindow_title = f"Gráfico de {grafico} - {titulo}"
+        if subwindow.spec_path and subwindow.spec_path != spec_path and os.path.exists(subwindow.spec_path):
+            os.remove(subwindow.spec_path)  # The plot was renamed
+        subwindow.spec_path = spec_path
+
+        item = self.layers.plot_item(subwindow)
+        if item is not None:
+            item.setData(spec_path, SPEC_PATH_ROLE)
+
+        # Rendered image for instant reopening, thumbnail as the tree tooltip
+        image = subwindow.render_image()
+        if image is None:
+            return  # Still rendering
+        key = plot_key(subwindow.spec, dataset_reference(dataset))
+        try:
+            _, thumbnail_path = self.image_cache().put(key, image)
+        except (OSError, ValueError) as e:
+            print(f"Error caching plot image: {e}")
+            return
+        if item is not None:
+            set_plot_thumbnail(item, thumbnail_path)
 
-        # Check if a subwindow with the same title already exists
-        for subwindow in self.mdi_area.subWindowList():
-            if subwindow.windowTitle() == subwindow_title:
-                print(f"Subwindow '{subwindow_title}' already exists. Skipping.")
-                return  # Avoid duplicate subwindows
+    def image_cache(self):
+        return PlotImageCache(image_cache_root(getattr(self.parent(), 'project_folder', None)))
 
-        # Create new subwindow
-        subwindow = CustomMdiSubWindow()
-        subwindow.setWindowTitle(subwindow_title)
+    def cached_plot_image(self, document):
+        """Path of the cached image of a saved plot (None if missing or the source file changed)."""
+        if source_changed(document):
+            return None
+        images = self.image_cache().get(plot_key(document["spec"], document["dataset"]))
+        return images[0] if images else None
 
-        # Create QWidget and layout
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
+    def show_cached_plot(self, document, image_path, open_live):
+        """Shows the cached image right away; open_live() rebuilds the real plot on the first click."""
+        subwindow = CachedPlotWindow(document.get("titulo") or plot_title(document["spec"]), image_path)
+        subwindow.closed.connect(self.on_plot_closed)
 
-        # Attach FigureCanvas
-        canvas = FigureCanvas(fig)
-        canvas.draw()  # Ensure all UI elements (labels, title, etc.) are applied
-        layout.addWidget(canvas)
+        def activate(window):
+            window.close()
+            open_live()
 
-        subwindow.setWidget(widget)
+        subwindow.activated.connect(activate)
         self.mdi_area.addSubWindow(subwindow)
         subwindow.show()
-
-        # Add the subwindow to the tree
-        selected_filename = self.combo_box.currentText()
-        self.add_subwindow_to_tree(self.tree_view, selected_filename, subwindow)
-
-        # Ensure "Temp" subfolder exists
-        temp_folder = os.path.join(os.getcwd(), "Temp")
-        os.makedirs(temp_folder, exist_ok=True)
-
-        # Save the entire FigureCanvas instead of just fig
-        file_path = os.path.join(temp_folder, f"{subwindow_title}.pkl")
-        with open(file_path, "wb") as f:
-            pickle.dump(fig, f)  # Saving full figure ensures all settings persist
-
-        print(f"Figure saved: {file_path}")
-
+        self.layers.add_plot(document["spec"]["arquivo"], subwindow)
         return subwindow
 
-
-    def add_subwindow_to_tree(self, tree_view, filename, subwindow):
-        """Finds the file in the tree view and adds the subwindow under it as a child item, avoiding duplicates."""
-        model = tree_view.model()
-
-        # Ensure the model is a QStandardItemModel
-        if not isinstance(model, QStandardItemModel):
-            print("Error: The model is not a QStandardItemModel")
-            return
-
-        # Check if the subwindow is valid
-        if subwindow is None:
-            print("Error: subwindow is None")
-            return
-
-        # Locate the file item in the tree
-        def find_file_item(model, target_filename):
-            for row in range(model.rowCount()):
-                item = model.item(row)  # Get item from the top level
-                if item and item.text() == target_filename:
-                    return item
+    def open_saved_plot(self, document, dataset):
+        """Rebuilds a saved plot (see Setup/Especificacoes.py) from the loaded dataset."""
+        spec = document["spec"]
+        title = document.get("titulo") or plot_title(spec)
+        subwindow = self.layers.plot_window(title)
+        if isinstance(subwindow, PlotWindow):
+            subwindow.showNormal()
+            subwindow.raise_()
+            return subwindow
+
+        if source_changed(document):
+            print(f"Warning: {document['dataset']['id']} changed since the plot was saved.")
+
+        data = prepare_data(dataset, spec)
+        if data is None:
             return None
-
-        file_item = find_file_item(model, filename)
-
-        if file_item:
-            subwindow_title = subwindow.windowTitle()
-
-            # Check if the subwindow already exists under this file node
-            for row in range(file_item.rowCount()):
-                child_item = file_item.child(row)
-                if child_item and child_item.text() == subwindow_title:
-                    print(f"Subwindow '{subwindow_title}' already exists in the tree. Skipping.")
-                    return  # Skip adding duplicate
-
-            # Create a new tree item for the subwindow
-            try:
-                subwindow_item = QStandardItem(subwindow_title)
-                subwindow_item.setData(subwindow, Qt.UserRole)  # Store reference to subwindow
-                subwindow_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-
-                # Add it as a child of the file
-                file_item.appendRow(subwindow_item)
-
-                # Force the UI to refresh
-                model.layoutChanged.emit()  # Notify views of structural change
-                tree_view.expand(model.indexFromItem(file_item))  # Expand to show new items
-                tree_view.update()  # Refresh the tree view explicitly
-            except Exception as e:
-                print(f"Error while adding subwindow to tree: {e}")
+        return self.display_plot(figure_manager.new_figure(), spec, data, dataset, title)
+
+    def on_plot_closed(self, subwindow):
+        """Drops the tree reference to the closed window (the item stays to reopen the saved plot)."""
+        if getattr(subwindow, "request_id", None) is not None:
+            get_render_manager(self.parent()).cancel(subwindow.request_id)
+            subwindow.request_id = None
+        if subwindow.data is not None:
+            dataset = self.get_dataset_by_filename(subwindow.spec["arquivo"])
+            if dataset is not None:
+                self.save_plot_spec(subwindow, dataset)  # Keeps the live style edits
+        self.layers.detach_plot(subwindow)
+        self.show_figure_report()
+
+    def show_figure_report(self):
+        """Shows the number of live plots and the memory in use on the status bar."""
+        report = figure_manager.report()
+        status_bar = getattr(self.parent(), "statusbar", None)
+        if status_bar is not None:
+            status_bar.showMessage(report, 5000)
 
 
 
@@ -1,7 +1,8 @@
 import os
 
-from PyQt5 import uic
-from Setup.Auxiliares  import setup_file_browser, resource_path, setup_layers_tree, open_existing_project, set_default_layout, setup_second_tree, status_bar_message
+from Setup.Auxiliares  import setup_file_browser, setup_layers_tree, open_existing_project, set_default_layout, setup_second_tree, status_bar_message
+from Setup.Formularios import load_form
+from Setup.Projeto import save_project
 
 
 class UiSetup:
@@ -13,7 +14,7 @@ class UiSetup:
         """
 
         self.main_window = main_window
-        uic.loadUi(resource_path('./Ui/MainUI.ui'), main_window)
+        load_form('MainUI', main_window)  # Módulo compilado de Ui/MainUI.ui (loadUi se indisponível)
 
         # Configuração do File Browser
         setup_file_browser(self.main_window.nav_folder, self.main_window.opened_subwindows, self.main_window.mdiArea)
@@ -23,6 +24,7 @@ class UiSetup:
 
         # Configuração de botões
         self.main_window.actionAbrir.triggered.connect(lambda: open_existing_project(self.main_window))
+        self.main_window.actionSalvar.triggered.connect(lambda: save_project(self.main_window))
         self.main_window.actionResetar_Layout.triggered.connect(lambda: set_default_layout(self.main_window))
 
         # Mensagens iniciais
@@ -0,0 +1,134 @@
+import numpy as np
+
+DEFAULT_BINS = 10  # Mesmo padrão do ax.hist quando não há bins personalizados
+CHUNK_ROWS = 1000000  # Linhas por bloco na contagem
+MAX_GROUPS = 50  # Acima disso a estratificação é ignorada
+
+
+class HistogramResult:
+    """Histograma já contado: bordas dos bins e contagens (ponderadas) por grupo."""
+
+    def __init__(self, edges, counts, labels=None):
+        self.edges = edges
+        self.counts = counts  # Array (grupos, bins)
+        self.labels = labels  # Rótulo de cada grupo (None sem estratificação)
+
+    @property
+    def nbytes(self):
+        return self.edges.nbytes + self.counts.nbytes
+
+
+class HistogramAccumulator:
+    """Soma as contagens bloco a bloco sobre bordas fixas.
+
+    Cada bloco custa uma busca binária por valor (np.searchsorted) e um
+    np.bincount; só as contagens ficam em memória, então tabelas maiores que a
+    RAM (colunas em memory-map do cache) podem ser contadas.
+    """
+
+    def __init__(self, edges, groups=1):
+        self.edges = np.asarray(edges, dtype=float)
+        self.bins = self.edges.size - 1
+        self.groups = groups
+        self.counts = np.zeros((groups, self.bins))
+
+    def update(self, values, weights=None, groups=None):
+        """Acumula um bloco; valores fora das bordas são ignorados (como em np.histogram com range)."""
+        index = np.searchsorted(self.edges, values, side="right") - 1
+        index[values == self.edges[-1]] = self.bins - 1  # O último bin inclui a borda superior
+        inside = (index >= 0) & (index < self.bins)
+
+        cells = index[inside]
+        if groups is not None:
+            cells = groups[inside].astype(np.int64) * self.bins + cells
+        if weights is not None:
+            weights = weights[inside]
+        self.counts += np.bincount(cells, weights=weights, minlength=self.groups * self.bins).reshape(
+            self.groups, self.bins)
+
+    def result(self, labels=None):
+        return HistogramResult(self.edges, self.counts, labels)
+
+
+def row_chunks(rows, chunk_rows=CHUNK_ROWS):
+    for start in range(0, rows, chunk_rows):
+        yield start, min(start + chunk_rows, rows)
+
+
+def column_chunk(dataset, name, start, stop):
+    """Bloco da coluna como float (nulos viram NaN) sem converter a coluna inteira."""
+    return dataset.series(name).iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+
+
+def column_range(dataset, name, chunk_rows=CHUNK_ROWS):
+    """(mín., máx.) da coluna: do perfil quando pronto, senão uma passagem por blocos."""
+    profile = (dataset.profile or {}).get(name)
+    if profile and profile.get("kind") == "numeric" and profile.get("min") is not None:
+        return profile["min"], profile["max"]
+
+    minimum, maximum = np.inf, -np.inf
+    for start, stop in row_chunks(dataset.row_count, chunk_rows):
+        values = column_chunk(dataset, name, start, stop)
+        if np.isfinite(values).any():
+            minimum = min(minimum, np.nanmin(values))
+            maximum = max(maximum, np.nanmax(values))
+    return (float(minimum), float(maximum)) if minimum <= maximum else None
+
+
+def bin_edges(dataset, name, strategy=DEFAULT_BINS, value_range=None, chunk_rows=CHUNK_ROWS):
+    """Bordas dos bins pela estratégia do NumPy ('auto', 'sturges', 'fd', 'doane', 'scott' ou número de bins).
+
+    A largura das estratégias automáticas é estimada com a coluna inteira quando
+    ela cabe em um bloco, ou com uma amostra regular de até chunk_rows valores.
+    """
+    if value_range is None:
+        value_range = column_range(dataset, name, chunk_rows)
+        if value_range is None:
+            return None
+    if value_range[0] == value_range[1]:
+        value_range = (value_range[0] - 0.5, value_range[1] + 0.5)
+
+    step = max(1, -(-dataset.row_count // chunk_rows))
+    sample = dataset.series(name).iloc[::step].to_numpy(dtype=float, na_value=np.nan)
+    sample = sample[(sample >= value_range[0]) & (sample <= value_range[1])]
+    if sample.size == 0 and not np.isscalar(strategy):
+        strategy = DEFAULT_BINS
+    return np.histogram_bin_edges(sample, bins=strategy, range=value_range)
+
+
+def dataset_histogram(dataset, name, weight_name=None, group_name=None, strategy=DEFAULT_BINS, value_range=None,
+                      chunk_rows=CHUNK_ROWS):
+    """Histograma (ponderado e/ou estratificado) de uma coluna numérica do dataset em uma passagem por blocos.
+
+    Linhas com valor, peso ou grupo nulos são ignoradas. Retorna None se a coluna não tiver valores.
+    """
+    edges = bin_edges(dataset, name, strategy, value_range, chunk_rows)
+    if edges is None:
+        return None
+
+    codes, labels = None, None
+    if group_name:
+        codes, code_labels = dataset.encoded(group_name)
+        if len(code_labels) > MAX_GROUPS:
+            print(f"Estratificação ignorada: {group_name} tem mais de {MAX_GROUPS} categorias.")
+            codes = None
+        elif code_labels:
+            labels = [code_labels[code] for code in range(len(code_labels))]
+        else:
+            codes = None  # Coluna sem valores
+
+    accumulator = HistogramAccumulator(edges, len(labels) if labels else 1)
+    for start, stop in row_chunks(dataset.row_count, chunk_rows):
+        values = column_chunk(dataset, name, start, stop)
+        valid = ~np.isnan(values)
+        weights = groups = None
+        if weight_name:
+            weights = column_chunk(dataset, weight_name, start, stop)
+            valid &= ~np.isnan(weights)
+        if codes is not None:
+            groups = codes[start:stop]
+            valid &= groups >= 0
+
+        accumulator.update(values[valid], None if weights is None else weights[valid],
+                           None if groups is None else groups[valid])
+    return accumulator.result(labels)
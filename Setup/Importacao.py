@@ -0,0 +1,214 @@
+"""Importação em lote: muitos arquivos (ou pastas inteiras) lidos em paralelo em um pool de processos.
+
+Cada processo lê uma tabela (ou uma planilha) com o leitor do formato e grava
+as colunas no cache do projeto; para a interface volta só o resumo (linhas,
+colunas e tempo), sem copiar os dados entre processos. A camada entra na
+árvore assim que o arquivo termina e o dataset é mapeado do cache
+(memory-map) quando for usado, como nas camadas de um projeto aberto.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PyQt5.QtCore import QCoreApplication, QObject, Qt, pyqtSignal
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+
+from Setup.Camadas import get_layer_registry
+from Setup.IndiceArquivos import workbook_sheets
+from Setup.Leitores import is_supported, sheet_source, source_label, split_source
+
+CANCELLED = "cancelado"  # Erro registrado para os arquivos descartados pelo cancelamento
+
+
+def import_sources(paths):
+    """Camadas a importar: os arquivos suportados (pastas percorridas), uma por planilha nas pastas de trabalho."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, subfolders, names in os.walk(path):
+                subfolders[:] = sorted(name for name in subfolders if not name.startswith("."))
+                files.extend(os.path.join(folder, name).replace("\\", "/") for name in sorted(names))
+        else:
+            files.append(path)
+
+    sources = []
+    for file_path in files:
+        if not is_supported(file_path):
+            continue
+        sheets = workbook_sheets(file_path)
+        if len(sheets) < 2:
+            sources.append(file_path)
+        else:
+            sources.extend(sheet_source(file_path, sheet["nome"]) for sheet in sheets)
+    return list(dict.fromkeys(sources))  # Sem repetir arquivos de pastas sobrepostas
+
+
+def ingest_table(source, project_folder=None):
+    """Lê a tabela e grava o cache de colunas (roda nos processos do pool); retorna o resumo."""
+    from Setup.Cache import ColumnCache, cache_root
+    from Setup.Leitores import load_preferences, select_reader
+
+    start = time.perf_counter()
+    reader = select_reader(source, load_preferences(project_folder))
+    cache = ColumnCache(cache_root(project_folder)) if reader.cacheable else None
+    df = cache.get(source) if cache else None
+    cached = df is not None
+    if df is None:
+        df = reader.read(*split_source(source))
+        if cache:
+            cache.put(source, df)
+    return {"linhas": int(df.shape[0]), "colunas": [str(name) for name in df.columns],
+            "tempo": time.perf_counter() - start, "cache": cached}
+
+
+def report_lines(results):
+    """Relatório por arquivo: linhas, colunas e tempo de leitura (ou o erro)."""
+    lines = [f"{'Tabela':<50} {'linhas':>9} {'colunas':>8} {'tempo':>7}"]
+    for source, (summary, error) in results.items():
+        name = source_label(source)[:50]
+        if error is not None:
+            lines.append(f"{name:<50} ERRO: {error}")
+        else:
+            origin = " (cache)" if summary["cache"] else ""
+            lines.append(f"{name:<50} {summary['linhas']:9d} {len(summary['colunas']):8d} "
+                         f"{summary['tempo']:7.2f}{origin}")
+    return lines
+
+
+class ImportManager(QObject):
+    """Importa vários arquivos em paralelo, com uma barra de progresso única e um relatório no final."""
+
+    imported = pyqtSignal(str, object, object)  # camada, resumo, erro
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.executor = None
+        self.workers = 0
+        self.results = {}  # camada -> (resumo, erro); None enquanto o arquivo não terminou
+        self.progress = None
+        self.report = None
+        self.start_time = 0.0
+        # Os futures terminam em threads do executor; o sinal leva o resultado à thread da interface
+        self.imported.connect(self.deliver)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def create_executor(self):
+        self.workers = os.cpu_count() or 1  # Todos os núcleos: a interface só recebe os resumos
+        try:
+            # spawn: um fork copiaria os locks das threads Qt (carregamento, perfis) e poderia travar o processo
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            print(f"Pool de processos indisponível ({e}); importando em threads.")
+            return ThreadPoolExecutor(max_workers=self.workers)
+
+    def is_running(self):
+        return self.executor is not None
+
+    def start(self, paths):
+        """Importa os arquivos e pastas; retorna o número de tabelas agendadas."""
+        from Setup.Auxiliares import status_bar_message
+
+        if self.is_running():
+            status_bar_message(self.main_window.statusbar, "Já existe uma importação em andamento.")
+            return 0
+        sources = import_sources(paths)
+        if not sources:
+            status_bar_message(self.main_window.statusbar, "Nenhuma tabela suportada para importar.")
+            return 0
+
+        self.start_time = time.perf_counter()
+        self.executor = self.create_executor()
+        self.results = dict.fromkeys(sources)
+        self.show_progress(len(sources))
+
+        project_folder = getattr(self.main_window, 'project_folder', None)
+        for source in sources:
+            future = self.executor.submit(ingest_table, source, project_folder)
+            future.add_done_callback(lambda done, source=source: self.on_done(source, done))
+        return len(sources)
+
+    def show_progress(self, total):
+        self.progress = QProgressDialog("Importando tabelas...", "Cancelar", 0, total, self.main_window)
+        self.progress.setWindowTitle("Importação")
+        self.progress.setWindowModality(Qt.NonModal)  # A interface continua usável durante a importação
+        self.progress.setMinimumDuration(0)
+        self.progress.setAutoClose(False)
+        self.progress.setAutoReset(False)
+        self.progress.canceled.connect(self.cancel)
+        self.progress.setValue(0)
+
+    def on_done(self, source, future):
+        if future.cancelled():
+            self.imported.emit(source, None, CANCELLED)
+            return
+        error = future.exception()
+        self.imported.emit(source, None if error else future.result(), error)
+
+    def deliver(self, source, summary, error):
+        if source not in self.results or self.results[source] is not None:
+            return  # Resultado de uma importação anterior
+        self.results[source] = (summary, error)
+        if error is None:
+            self.add_layer(source, summary)
+
+        done = sum(result is not None for result in self.results.values())
+        if self.progress is not None:
+            self.progress.setValue(done)
+            self.progress.setLabelText(f"Importando tabelas... {done} de {len(self.results)}\n{source_label(source)}")
+        if done == len(self.results):
+            self.finish()
+
+    def add_layer(self, source, summary):
+        from Setup.Projeto import describe_layer
+
+        layer = get_layer_registry(self.main_window).add_layer(source)
+        layer.info = {"linhas": summary["linhas"], "colunas": summary["colunas"]}
+        layer.item.setData(describe_layer(layer.info), Qt.ToolTipRole)
+
+    def cancel(self):
+        """Os arquivos que ainda não começaram são descartados; os que estão sendo lidos terminam."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def finish(self):
+        from Setup.Auxiliares import status_bar_message
+
+        elapsed = time.perf_counter() - self.start_time
+        self.shutdown()
+        if self.progress is not None:
+            self.progress.canceled.disconnect(self.cancel)  # Fechar o diálogo emite canceled
+            self.progress.close()
+            self.progress = None
+
+        lines = report_lines(self.results)
+        errors = [error for _, error in self.results.values() if error is not None]
+        cancelled = sum(error == CANCELLED for error in errors)
+        failures = len(errors) - cancelled
+        summary = f"{len(self.results) - len(errors)} tabela(s) importada(s), {failures} com erro"
+        summary += f", {cancelled} cancelada(s)" if cancelled else ""
+        summary += f", em {elapsed:.1f} s ({self.workers} processo(s))."
+        print("\n".join(lines + ["", summary]))
+        status_bar_message(self.main_window.statusbar, summary, 6000)
+
+        self.report = QMessageBox(QMessageBox.Warning if failures else QMessageBox.Information,
+                                  "Importação concluída", summary, QMessageBox.Ok, self.main_window)
+        self.report.setDetailedText("\n".join(lines))
+        self.report.setWindowModality(Qt.NonModal)
+        self.report.show()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def get_import_manager(main_window):
+    """Retorna (criando se necessário) o gerenciador de importações da janela principal"""
+    if not hasattr(main_window, 'import_manager') or main_window.import_manager is None:
+        main_window.import_manager = ImportManager(main_window)
+    return main_window.import_manager
@@ -0,0 +1,351 @@
+"""Índice de metadados dos arquivos de dados do projeto (navegador de arquivos).
+
+Para cada tabela são guardados o tamanho, as planilhas e o número de linhas e
+colunas, lidos sem carregar os dados: o XML do .xlsx (nomes e <dimension> de
+cada planilha), o rodapé do Parquet, os lotes do Arrow/Feather e uma contagem
+de quebras de linha do CSV (estimada em arquivos grandes). O índice fica em
+<projeto>/Cache/indice_arquivos.json e só é refeito quando o arquivo muda.
+"""
+import json
+import os
+import re
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QFileSystemModel
+
+from Setup.Leitores import WORKBOOK_EXTENSIONS, file_extension, supported_extensions
+
+INDEX_FORMAT_VERSION = 1
+INDEX_FILE = "indice_arquivos.json"
+CSV_SCAN_BYTES = 64 * 1024 ** 2  # CSVs maiores têm as linhas estimadas por uma amostra
+CSV_SAMPLE_BYTES = 1024 ** 2
+XLSX_HEAD_BYTES = 4096  # <dimension> fica no início do XML da planilha
+
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+DIMENSION_RE = re.compile(rb'<(?:\w+:)?dimension ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+
+
+def index_path(project_folder=None):
+    base_path = project_folder or os.getcwd()
+    return os.path.join(base_path, "Cache", INDEX_FILE)
+
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Metadados por formato -------------------------------------------------------
+
+def column_number(letters):
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def xlsx_sheets(file_path):
+    """Planilhas do .xlsx com linhas (sem o cabeçalho) e colunas da tag <dimension>."""
+    import zipfile
+    import xml.etree.ElementTree as ElementTree
+
+    with zipfile.ZipFile(file_path) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {relation.get("Id"): relation.get("Target") for relation in relations.iter(f"{PACKAGE_REL_NS}Relationship")}
+
+        sheets = []
+        for sheet in workbook.iter(f"{SHEET_NS}sheet"):
+            target = targets.get(sheet.get(f"{REL_NS}id"), "")
+            member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            rows = columns = None
+            try:
+                with archive.open(member) as f:
+                    match = DIMENSION_RE.search(f.read(XLSX_HEAD_BYTES))
+            except KeyError:
+                match = None
+            if match and match.group(3):
+                first_column, first_row, last_column, last_row = (group.decode() for group in match.groups())
+                columns = column_number(last_column) - column_number(first_column) + 1
+                rows = max(int(last_row) - int(first_row), 0)
+            sheets.append({"nome": sheet.get("name"), "linhas": rows, "colunas": columns})
+        return sheets
+
+
+def calamine_sheets(file_path):
+    """Nomes das planilhas de .xls/.xlsb/.ods (sem dimensões: exigiriam ler as células)."""
+    from python_calamine import CalamineWorkbook
+    return [{"nome": name, "linhas": None, "colunas": None}
+            for name in CalamineWorkbook.from_path(file_path).sheet_names]
+
+
+def csv_table(file_path):
+    """Colunas pelo cabeçalho e linhas contando quebras de linha (estimadas acima de CSV_SCAN_BYTES)."""
+    import csv
+
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+        header = sample.split(b"\n", 1)[0].decode("utf-8", errors="replace")
+        delimiter = "\t" if file_extension(file_path) == ".tsv" else ","
+        columns = len(next(csv.reader([header], delimiter=delimiter), []))
+
+        if size > CSV_SCAN_BYTES:
+            lines = sample.count(b"\n")
+            rows = int(size / (len(sample) / lines)) - 1 if lines else 0
+            return {"nome": None, "linhas": rows, "colunas": columns, "estimado": True}
+
+        lines, last = sample.count(b"\n"), sample[-1:]
+        for block in iter(lambda: f.read(CSV_SAMPLE_BYTES), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last and last != b"\n":
+        lines += 1  # Última linha sem quebra
+    return {"nome": None, "linhas": max(lines - 1, 0), "colunas": columns}
+
+
+def parquet_table(file_path):
+    from pyarrow import parquet
+    metadata = parquet.read_metadata(file_path)
+    return {"nome": None, "linhas": metadata.num_rows, "colunas": metadata.num_columns}
+
+
+def arrow_table(file_path):
+    import pyarrow as pa
+    with pa.memory_map(file_path) as source:
+        reader = pa.ipc.open_file(source)
+        rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        return {"nome": None, "linhas": rows, "colunas": len(reader.schema.names)}
+
+
+def file_metadata(file_path):
+    """Metadados de um arquivo de dados: {'tamanho', 'mtime', 'tabelas': [{'nome', 'linhas', 'colunas'}]}.
+
+    Formatos sem leitor de metadados (ou com erro) ficam só com o tamanho.
+    """
+    size, mtime = file_signature(file_path)
+    metadata = {"tamanho": size, "mtime": mtime, "tabelas": []}
+    extension = file_extension(file_path)
+    try:
+        if extension in (".xlsx", ".xlsm"):
+            metadata["tabelas"] = xlsx_sheets(file_path)
+        elif extension in (".xls", ".xlsb", ".ods"):
+            metadata["tabelas"] = calamine_sheets(file_path)
+        elif extension in (".csv", ".tsv"):
+            metadata["tabelas"] = [csv_table(file_path)]
+        elif extension == ".parquet":
+            metadata["tabelas"] = [parquet_table(file_path)]
+        elif extension in (".feather", ".arrow"):
+            metadata["tabelas"] = [arrow_table(file_path)]
+    except Exception as e:  # Arquivo corrompido, biblioteca ausente...
+        metadata["erro"] = str(e)
+    return metadata
+
+
+def workbook_sheets(file_path):
+    """Planilhas de uma pasta de trabalho ([{'nome', 'linhas', 'colunas'}]; vazia para outros formatos)."""
+    if file_extension(file_path) not in WORKBOOK_EXTENSIONS:
+        return []
+    try:
+        metadata = file_metadata(file_path)
+    except OSError:
+        return []
+    return [table for table in metadata["tabelas"] if table.get("nome")]
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def dimension_text(table):
+    if table.get("linhas") is None:
+        return ""
+    prefix = "~" if table.get("estimado") else ""
+    return f"{prefix}{table['linhas']} × {table['colunas']}"
+
+
+def summary_text(metadata):
+    """Texto curto da coluna de dimensões: 'linhas × colunas' ou o número de planilhas."""
+    tables = metadata.get("tabelas") or []
+    if len(tables) == 1:
+        return dimension_text(tables[0])
+    return f"{len(tables)} planilhas" if tables else ""
+
+
+def describe_metadata(metadata):
+    """Tooltip com o tamanho e as dimensões de cada planilha."""
+    lines = [f"Tamanho: {format_size(metadata['tamanho'])}"]
+    for table in metadata.get("tabelas") or []:
+        dimensions = dimension_text(table) or "dimensões desconhecidas"
+        lines.append(f"{table['nome']}: {dimensions}" if table.get("nome") else f"Linhas × colunas: {dimensions}")
+    if metadata.get("erro"):
+        lines.append(f"Erro ao ler metadados: {metadata['erro']}")
+    return "\n".join(lines)
+
+
+# Índice em disco e indexação em segundo plano -------------------------------
+
+class MetadataIndex:
+    """Metadados por caminho, gravados em JSON; entradas de arquivos alterados são ignoradas."""
+
+    def __init__(self, project_folder=None):
+        self.path = index_path(project_folder)
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return
+        if document.get("versao") == INDEX_FORMAT_VERSION:
+            self.entries = document.get("arquivos", {})
+
+    def get(self, file_path, signature=None):
+        """Metadados de file_path se ainda valem para o arquivo (tamanho e mtime iguais)."""
+        metadata = self.entries.get(file_path)
+        if metadata is None:
+            return None
+        if signature is not None and (metadata["tamanho"], metadata["mtime"]) != tuple(signature):
+            return None
+        return metadata
+
+    def put(self, file_path, metadata):
+        self.entries[file_path] = metadata
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        import tempfile
+
+        folder = os.path.dirname(self.path)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"versao": INDEX_FORMAT_VERSION, "arquivos": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Não foi possível gravar o índice de arquivos: {e}")
+
+
+class IndexerSignals(QObject):
+    indexed = pyqtSignal(str, object)  # file_path, metadados
+    finished = pyqtSignal()
+
+
+class IndexWorker(QRunnable):
+    """Lê os metadados dos arquivos de dados de uma pasta que ainda não estão no índice."""
+
+    def __init__(self, folder, index, extensions):
+        super().__init__()
+        self.folder = folder
+        self.index = index
+        self.extensions = extensions
+        self.signals = IndexerSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            with os.scandir(self.folder) as entries:
+                files = [entry.path.replace("\\", "/") for entry in entries
+                         if entry.is_file() and file_extension(entry.name) in self.extensions]
+        except OSError:
+            files = []
+
+        for file_path in files:
+            if self._cancel_event.is_set():
+                break
+            try:
+                if self.index.get(file_path, file_signature(file_path)) is not None:
+                    continue  # Já indexado e sem mudanças
+                self.signals.indexed.emit(file_path, file_metadata(file_path))
+            except OSError:
+                continue  # Removido durante a indexação
+        self.signals.finished.emit()
+
+
+class DataFileSystemModel(QFileSystemModel):
+    """Navegador restrito à pasta do projeto e aos formatos de tabela suportados.
+
+    A coluna 2 ("Dimensões") e os tooltips mostram os metadados do índice; as
+    pastas abertas na árvore são indexadas em uma thread separada.
+    """
+
+    DIMENSIONS_COLUMN = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.extensions = supported_extensions()
+        self.setNameFilters([f"*{extension}" for extension in self.extensions])
+        self.setNameFilterDisables(False)  # Oculta (em vez de desabilitar) os outros arquivos
+        self.setOption(QFileSystemModel.DontUseCustomDirectoryIcons)  # Evita ler desktop.ini em shares de rede
+        self.index_data = MetadataIndex()
+        self.workers = {}  # pasta -> IndexWorker
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)  # Uma pasta por vez: não disputa o disco com os carregamentos
+        self.directoryLoaded.connect(self.index_folder)
+
+    def set_project(self, project_folder):
+        """Troca a raiz e o índice para a pasta do projeto; retorna o índice da raiz."""
+        for worker in self.workers.values():
+            worker.cancel()
+        self.workers = {}
+        self.index_data.save()
+        self.index_data = MetadataIndex(project_folder)
+        self.setRootPath(project_folder)
+        return self.index(project_folder)
+
+    def metadata(self, file_path):
+        return self.index_data.get(file_path)
+
+    def index_folder(self, folder):
+        if folder in self.workers:
+            return
+        worker = IndexWorker(folder, self.index_data, self.extensions)
+        worker.signals.indexed.connect(self.on_indexed)
+        worker.signals.finished.connect(lambda: self.on_folder_indexed(folder, worker))
+        self.workers[folder] = worker
+        self.thread_pool.start(worker)
+
+    def on_indexed(self, file_path, metadata):
+        self.index_data.put(file_path, metadata)
+        first = self.index(file_path, 0)
+        if first.isValid():
+            self.dataChanged.emit(first, self.index(file_path, self.DIMENSIONS_COLUMN), [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def on_folder_indexed(self, folder, worker):
+        if self.workers.get(folder) is worker:
+            del self.workers[folder]
+        if not self.workers:
+            self.index_data.save()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if section == self.DIMENSIONS_COLUMN and orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return "Dimensões"
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        column = index.column()
+        if role == Qt.ToolTipRole or (role == Qt.DisplayRole and column == self.DIMENSIONS_COLUMN):
+            if self.isDir(index):
+                return "" if role == Qt.DisplayRole else super().data(index, role)
+            metadata = self.metadata(self.filePath(index))
+            if metadata is None:
+                return "" if role == Qt.DisplayRole else super().data(index, role)
+            return summary_text(metadata) if role == Qt.DisplayRole else describe_metadata(metadata)
+        return super().data(index, role)
@@ -0,0 +1,158 @@
+"""Abertura rápida do programa: splash, pré-carga em segundo plano e orçamento de inicialização.
+
+A janela principal só importa PyQt: pandas, openpyxl e matplotlib são
+importados quando a primeira tabela ou gráfico é aberto (ou antes, pela
+pré-carga em segundo plano). Para conferir o orçamento de inicialização:
+
+    python -m Setup.Inicializacao [--orcamento 0.5] [--janela]
+
+O comando importa main.py em um processo novo com "python -X importtime",
+mostra os módulos mais caros e termina com código 1 se o tempo passar do
+orçamento ou se algum módulo pesado for importado na abertura.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+STARTUP_BUDGET = 0.5  # Segundos para importar main.py (orçamento padrão do comando)
+WINDOW_BUDGET = 1.0  # Segundos até a janela principal aparecer (com --janela)
+
+# Não podem ser importados na abertura: carregam só ao abrir a primeira tabela ou gráfico
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "openpyxl", "pyarrow", "python_calamine", "PIL", "psutil")
+
+# Importados em uma thread logo depois que a janela aparece
+PRELOAD_MODULES = ("Setup.Carregamento", "Setup.Datasets", "Setup.Perfil", "Setup.Especificacoes",
+                   "Setup.Plotagem")
+
+# Mede a abertura da janela em um processo novo (usado por --janela)
+WINDOW_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+import main
+app = QApplication(sys.argv)
+window = main.MainWindow()
+window.show()
+app.processEvents()
+print(f"{time.perf_counter() - start:.6f}")
+"""
+
+
+def show_splash(app, version=""):
+    """Mostra um splash simples enquanto a janela principal é montada; retorna o QSplashScreen"""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QColor, QFont, QPainter, QPixmap
+    from PyQt5.QtWidgets import QSplashScreen
+
+    pixmap = QPixmap(360, 160)
+    pixmap.fill(QColor("#2f4f2f"))
+    painter = QPainter(pixmap)
+    painter.setPen(QColor("white"))
+    painter.setFont(QFont("Sans", 28, QFont.Bold))
+    painter.drawText(pixmap.rect(), Qt.AlignCenter, "Arandu")
+    painter.end()
+
+    splash = QSplashScreen(pixmap)
+    splash.showMessage(f"Carregando... {version}".strip(), Qt.AlignBottom | Qt.AlignHCenter, QColor("white"))
+    splash.show()
+    app.processEvents()
+    return splash
+
+
+def preload_modules(modules=PRELOAD_MODULES):
+    """Importa os módulos pesados em uma thread para que a primeira tabela/gráfico abra sem espera.
+
+    Se o usuário abrir uma tabela antes do fim, o import na thread da interface
+    espera o mesmo módulo (o lock de import do Python evita carregar duas vezes).
+    """
+    def run():
+        import importlib
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Pré-carga de {name} falhou: {e}")
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def parse_importtime(stderr):
+    """Lista de (módulo, próprio em s, acumulado em s) da saída de -X importtime"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not self_us.isdigit():
+            continue  # Cabeçalho
+        modules.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return modules
+
+
+def measure_imports(project_folder=None):
+    """Importa main.py em um processo novo com -X importtime; retorna (total em s, módulos)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=project_folder,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "falha ao importar")
+    modules = parse_importtime(result.stderr)
+    total = sum(self_time for _, self_time, _ in modules)
+    return total, modules
+
+
+def measure_window(project_folder=None):
+    """Tempo (s) até a janela principal aparecer, em um processo novo"""
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=project_folder, capture_output=True,
+                            text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "falha ao abrir")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def check_budget(budget=STARTUP_BUDGET, window=False, top=10, project_folder=None):
+    """Imprime o relatório de inicialização; retorna True se estiver dentro do orçamento"""
+    total, modules = measure_imports(project_folder)
+    print(f"Importação de main.py: {total:.3f} s (orçamento {budget:.3f} s)")
+    print(f"\n{'Módulo':<50} {'próprio':>8} {'acumulado':>10}")
+    for name, self_time, cumulative in sorted(modules, key=lambda module: -module[2])[:top]:
+        print(f"{name:<50} {self_time:8.3f} {cumulative:10.3f}")
+
+    ok = total <= budget
+    heavy = sorted({name for name, _, _ in modules if name.split(".")[0] in HEAVY_MODULES})
+    if heavy:
+        ok = False
+        print(f"\nMódulos pesados importados na abertura: {', '.join(heavy)}")
+    if window:
+        try:
+            elapsed = measure_window(project_folder)
+            print(f"\nJanela principal aberta em {elapsed:.3f} s (orçamento {WINDOW_BUDGET:.3f} s)")
+            ok = ok and elapsed <= WINDOW_BUDGET
+        except RuntimeError as e:
+            print(f"\nNão foi possível abrir a janela principal: {e}")
+            ok = False
+    print("\nDentro do orçamento." if ok else "\nFora do orçamento.")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a inicialização do Arandu (python -X importtime).")
+    parser.add_argument("--orcamento", type=float, default=STARTUP_BUDGET, help="Segundos permitidos para importar main.py")
+    parser.add_argument("--janela", action="store_true", help="Também mede o tempo até a janela principal aparecer")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de módulos no relatório")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    ok = check_budget(args.orcamento, args.janela, args.top)
+    print(f"(medição em {time.perf_counter() - start:.1f} s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
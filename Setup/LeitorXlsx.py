@@ -0,0 +1,69 @@
+from itertools import islice
+
+import pandas as pd
+from openpyxl import load_workbook
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def header_names(row):
+    """Nomes das colunas no mesmo padrão do pd.read_excel ('Unnamed: n', 'nome.1')."""
+    names, seen = [], {}
+    for col, value in enumerate(row):
+        name = f"Unnamed: {col}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_xlsx_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE, sheet=None, on_start=None):
+    """Lê uma planilha .xlsx em blocos de chunk_size linhas.
+
+    Usa o modo read-only do openpyxl: as linhas chegam como tuplas e cada bloco
+    é convertido em um DataFrame tipado antes do próximo ser lido, de modo que só
+    um bloco de objetos Python existe em memória por vez.
+    on_start(colunas, total_linhas) é chamado antes do primeiro bloco
+    (total_linhas é None quando a planilha não informa suas dimensões).
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+        columns = header_names(first_row)
+        width = len(columns)
+        total_rows = worksheet.max_row - 1 if worksheet.max_row else None
+        if on_start:
+            on_start(columns, total_rows)
+
+        pending_empty = 0  # Linhas vazias só entram se houver dados depois delas (igual ao read_excel)
+        while True:
+            block, consumed = [], 0
+            for row in islice(rows, chunk_size):
+                consumed += 1
+                if all(value is None for value in row):
+                    pending_empty += 1
+                    continue
+                if pending_empty:
+                    block.extend([(None,) * width] * pending_empty)
+                    pending_empty = 0
+                row = row[:width]
+                if len(row) < width:
+                    row = row + (None,) * (width - len(row))
+                block.append(row)
+
+            if consumed == 0:
+                break
+            if block:
+                chunk = pd.DataFrame.from_records(block, columns=range(width))
+                chunk.columns = columns
+                yield chunk
+    finally:
+        workbook.close()
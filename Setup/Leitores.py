@@ -0,0 +1,177 @@
+import importlib.util
+import json
+import os
+
+# extensão -> lista de leitores em ordem de preferência
+READERS = {}
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".xlsb", ".ods")
+# Planilhas a partir deste tamanho são lidas em blocos na interface (ver select_reader)
+STREAMING_MIN_BYTES = 8 * 1024 ** 2
+SHEET_SEPARATOR = "::"  # Camada de uma planilha: "<arquivo>::<planilha>" (o Excel não aceita ':' no nome)
+
+
+class Reader:
+    """Leitor de tabelas registrado para um conjunto de extensões."""
+
+    def __init__(self, name, extensions, read, modules=(), cacheable=True, streaming=False):
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.read = read  # read(file_path, sheet=None) -> DataFrame (sheet só nos formatos com planilhas)
+        self.modules = tuple(modules)  # Dependências opcionais
+        self.cacheable = cacheable  # Formatos já colunares não precisam do cache em disco
+        self.streaming = streaming  # Pode ser lido em blocos (StreamingLoadWorker)
+
+    def available(self):
+        return all(importlib.util.find_spec(module) is not None for module in self.modules)
+
+    def __repr__(self):
+        return f"Reader({self.name!r})"
+
+
+def register_reader(reader):
+    for extension in reader.extensions:
+        READERS.setdefault(extension, []).append(reader)
+    return reader
+
+
+def sheet_source(file_path, sheet):
+    """Identificador da camada de uma planilha (usado no registro de camadas, datasets e cache)."""
+    return f"{file_path}{SHEET_SEPARATOR}{sheet}"
+
+
+def split_source(source):
+    """(caminho do arquivo, planilha) de uma camada; planilha é None para o arquivo inteiro."""
+    file_path, separator, sheet = source.rpartition(SHEET_SEPARATOR)
+    if separator and sheet and os.path.splitext(file_path)[1].lower() in WORKBOOK_EXTENSIONS:
+        return file_path, sheet
+    return source, None
+
+
+def source_label(source):
+    """Nome exibido da camada: 'arquivo.xlsx' ou 'arquivo.xlsx [planilha]'."""
+    file_path, sheet = split_source(source)
+    name = os.path.basename(file_path)
+    return f"{name} [{sheet}]" if sheet else name
+
+
+def file_extension(file_path):
+    return os.path.splitext(split_source(file_path)[0])[1].lower()
+
+
+def supported_extensions():
+    return tuple(extension for extension, readers in READERS.items()
+                 if any(reader.available() for reader in readers))
+
+
+def is_supported(file_path):
+    return file_extension(file_path) in supported_extensions()
+
+
+def available_readers(file_path):
+    return [reader for reader in READERS.get(file_extension(file_path), []) if reader.available()]
+
+
+def select_reader(file_path, preferences=None, streaming=False):
+    """Escolhe o leitor do arquivo: o vencedor do benchmark, se houver, senão o primeiro disponível.
+
+    Com streaming=True (tabelas abertas na interface), planilhas acima de STREAMING_MIN_BYTES usam
+    um leitor em blocos quando houver: a tabela aparece aos poucos e as estatísticas são acumuladas
+    durante a leitura, mesmo que o leitor mais rápido (calamine) leia tudo de uma vez.
+    """
+    readers = available_readers(file_path)
+    if not readers:
+        raise ValueError(f"Formato não suportado: {os.path.basename(file_path)}")
+
+    if streaming and large_file(file_path):
+        for reader in readers:
+            if reader.streaming:
+                return reader
+
+    preferred = (preferences or {}).get(file_extension(file_path))
+    for reader in readers:
+        if reader.name == preferred:
+            return reader
+    return readers[0]
+
+
+def large_file(file_path):
+    try:
+        return os.path.getsize(split_source(file_path)[0]) >= STREAMING_MIN_BYTES
+    except OSError:
+        return False
+
+
+def read_table(source, preferences=None):
+    """Lê o arquivo (ou a planilha da camada) com o leitor selecionado para a extensão."""
+    file_path, sheet = split_source(source)
+    return select_reader(file_path, preferences).read(file_path, sheet)
+
+
+def preferences_path(project_folder=None):
+    """Arquivo com os vencedores do benchmark (ver Setup/BenchmarkLeitores.py)."""
+    return os.path.join(project_folder or os.getcwd(), "Cache", "benchmark_leitores.json")
+
+
+def load_preferences(project_folder=None):
+    """Retorna {extensão: nome do leitor} gravado pelo último benchmark."""
+    try:
+        with open(preferences_path(project_folder), encoding="utf-8") as f:
+            return json.load(f).get("winners", {})
+    except (OSError, ValueError):
+        return {}
+
+
+# Leitores -----------------------------------------------------------------
+# pandas/pyarrow são importados dentro dos leitores: a lista de formatos fica disponível
+# na abertura do programa sem pagar a importação das bibliotecas de tabelas
+
+# Planilhas: só a planilha pedida é interpretada (a primeira quando sheet é None)
+
+def read_excel_calamine(file_path, sheet=None):
+    import pandas as pd
+    return pd.read_excel(file_path, sheet_name=sheet or 0, engine="calamine")
+
+
+def read_excel_openpyxl(file_path, sheet=None):
+    import pandas as pd
+    return pd.read_excel(file_path, sheet_name=sheet or 0, engine="openpyxl")
+
+
+def read_excel_default(file_path, sheet=None):
+    import pandas as pd
+    return pd.read_excel(file_path, sheet_name=sheet or 0)
+
+
+def read_csv_pyarrow(file_path, sheet=None):
+    from pyarrow import csv
+    parse_options = csv.ParseOptions(delimiter="\t" if file_extension(file_path) == ".tsv" else ",")
+    table = csv.read_csv(file_path, read_options=csv.ReadOptions(use_threads=True), parse_options=parse_options)
+    return table.to_pandas()
+
+
+def read_csv_pandas(file_path, sheet=None):
+    import pandas as pd
+    return pd.read_csv(file_path, sep="\t" if file_extension(file_path) == ".tsv" else ",", engine="c")
+
+
+def read_parquet_mmap(file_path, sheet=None):
+    from pyarrow import parquet
+    return parquet.read_table(file_path, memory_map=True, use_threads=True).to_pandas()
+
+
+def read_feather_mmap(file_path, sheet=None):
+    from pyarrow import feather
+    return feather.read_feather(file_path, memory_map=True, use_threads=True)
+
+
+# A ordem de registro define a preferência quando não há benchmark
+register_reader(Reader("calamine", (".xlsx", ".xlsm", ".xls", ".xlsb", ".ods"), read_excel_calamine,
+                       modules=("python_calamine",)))
+register_reader(Reader("openpyxl", (".xlsx", ".xlsm"), read_excel_openpyxl, modules=("openpyxl",), streaming=True))
+register_reader(Reader("xlrd", (".xls",), read_excel_default, modules=("xlrd",)))
+register_reader(Reader("pyarrow-csv", (".csv", ".tsv"), read_csv_pyarrow, modules=("pyarrow",)))
+register_reader(Reader("pandas-csv", (".csv", ".tsv"), read_csv_pandas))
+register_reader(Reader("pyarrow-parquet", (".parquet",), read_parquet_mmap, modules=("pyarrow",), cacheable=False))
+register_reader(Reader("pyarrow-feather", (".feather", ".arrow"), read_feather_mmap, modules=("pyarrow",),
+                       cacheable=False))
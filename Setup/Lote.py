@@ -0,0 +1,215 @@
+"""Geração de gráficos em lote, sem interface.
+
+Uso:
+    python main.py batch lote.yaml [--processos N] [--projeto PASTA]
+    python -m Setup.Lote lote.json
+
+O arquivo do lote (YAML, se o PyYAML estiver instalado, ou JSON) descreve os gráficos:
+
+    saida: Relatorios            # Pasta dos arquivos gerados
+    formatos: [png, pdf]         # png, pdf e/ou svg
+    dpi: 150
+    padrao:                      # Campos usados por todos os gráficos (opcional)
+      estilo: {cor: darkgreen}
+    graficos:
+      - arquivo: Dados/*.xlsx    # Um gráfico por arquivo encontrado
+        tipo: histograma
+        x: dap
+        y: ht                    # Peso (histograma) ou altura (barras)
+        estrat: talhao
+        estratificacao: true
+        rotulos: {titulo: Distribuição de DAP}
+    specs: [Graficos/*.json]     # Gráficos salvos pela interface (Setup/Especificacoes.py)
+
+Cada gráfico usa o mesmo pipeline da interface (Setup/Plotagem.py) e é
+desenhado com Agg em um pool de processos. As tabelas são lidas uma única vez
+(em paralelo) e guardadas no cache de colunas do projeto antes dos gráficos.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from Setup.Cache import ColumnCache, cache_root
+from Setup.Datasets import Dataset
+from Setup.Especificacoes import load_spec, safe_file_name
+from Setup.Leitores import load_preferences, select_reader, split_source
+from Setup.Plotagem import complete_spec, draw_plot, plot_title, prepare_data
+
+FORMATS = ("png", "pdf", "svg")
+
+# Datasets já carregados neste processo (cada processo do pool reaproveita os seus)
+_datasets = {}
+
+
+def read_batch_file(file_path):
+    """Lê o arquivo do lote (YAML ou JSON) e retorna o dicionário."""
+    with open(file_path, encoding="utf-8") as f:
+        text = f.read()
+    if os.path.splitext(file_path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Arquivos YAML precisam do PyYAML (pip install pyyaml); use JSON.")
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def expand_jobs(batch, base_folder):
+    """Lista de specs completas: uma por gráfico e por arquivo encontrado."""
+    defaults = batch.get("padrao") or {}
+    jobs = []
+    for entry in batch.get("graficos") or []:
+        spec = {**defaults, **entry}
+        spec["estilo"] = {**(defaults.get("estilo") or {}), **(entry.get("estilo") or {})}
+        spec["rotulos"] = {**(defaults.get("rotulos") or {}), **(entry.get("rotulos") or {})}
+        pattern = os.path.join(base_folder, spec.get("arquivo", ""))
+        paths = sorted(glob.glob(pattern)) or [pattern]
+        for path in paths:
+            jobs.append(complete_spec({**spec, "arquivo": os.path.abspath(path)}))
+
+    for pattern in batch.get("specs") or []:
+        for path in sorted(glob.glob(os.path.join(base_folder, pattern))):
+            document = load_spec(path)
+            jobs.append(complete_spec({**document["spec"], "arquivo": document["dataset"]["id"]}))
+    return jobs
+
+
+def output_name(spec, names):
+    """Nome do arquivo de saída: '<tabela> - <título do gráfico>', sem repetir nomes."""
+    file_path, sheet = split_source(spec["arquivo"])
+    stem = os.path.splitext(os.path.basename(file_path))[0] + (f" [{sheet}]" if sheet else "")
+    name = safe_file_name(f"{stem} - {plot_title(spec)}")
+    unique, count = name, 1
+    while unique in names:
+        count += 1
+        unique = f"{name} ({count})"
+    names.add(unique)
+    return unique
+
+
+def load_dataset(file_path, project_folder=None):
+    """Dataset da tabela, lido pelo cache de colunas quando possível (sem Qt)."""
+    dataset = _datasets.get(file_path)
+    if dataset is not None:
+        return dataset, True
+
+    reader = select_reader(file_path, load_preferences(project_folder))
+    cache = ColumnCache(cache_root(project_folder)) if reader.cacheable else None
+    df = cache.get(file_path) if cache else None
+    if df is None:
+        df = reader.read(*split_source(file_path))
+        if cache:
+            cache.put(file_path, df)
+            cached = cache.get(file_path)  # Colunas em memory-map: o processo não guarda outra cópia
+            if cached is not None:
+                df = cached
+    dataset = Dataset(file_path, df)
+    _datasets[file_path] = dataset
+    return dataset, False
+
+
+def warm_cache(file_path, project_folder=None):
+    """Lê a tabela e grava o cache de colunas (primeira fase do lote)."""
+    start = time.perf_counter()
+    dataset, _ = load_dataset(file_path, project_folder)
+    return dataset.row_count, time.perf_counter() - start
+
+
+def render_job(spec, output_base, formats, dpi, project_folder=None):
+    """Gera os arquivos de um gráfico; retorna o resumo de tempos do trabalho."""
+    timings = {"gráfico": os.path.basename(output_base)}
+    start = time.perf_counter()
+    try:
+        dataset, _ = load_dataset(spec["arquivo"], project_folder)
+        timings["carga"] = time.perf_counter() - start
+
+        step = time.perf_counter()
+        data = prepare_data(dataset, spec)
+        if data is None:
+            raise ValueError("colunas não encontradas ou sem valores")
+        timings["preparo"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        draw_plot(fig, spec, data)
+        for extension in formats:
+            fig.savefig(f"{output_base}.{extension}", format=extension, dpi=dpi)
+        timings["desenho"] = time.perf_counter() - step
+    except Exception as e:
+        timings["erro"] = str(e)
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def print_summary(results, elapsed):
+    print()
+    print(f"{'Gráfico':<60} {'carga':>7} {'preparo':>8} {'desenho':>8} {'total':>7}")
+    for timings in results:
+        if "erro" in timings:
+            print(f"{timings['gráfico'][:60]:<60} ERRO: {timings['erro']}")
+            continue
+        print(f"{timings['gráfico'][:60]:<60} {timings['carga']:7.2f} {timings['preparo']:8.2f} "
+              f"{timings['desenho']:8.2f} {timings['total']:7.2f}")
+
+    failures = sum("erro" in timings for timings in results)
+    print(f"\n{len(results) - failures} gráfico(s) gerado(s), {failures} com erro, em {elapsed:.1f} s.")
+
+
+def run_batch(batch_file, processes=None, project_folder=None):
+    """Executa o lote; retorna a lista de resumos por gráfico."""
+    start = time.perf_counter()
+    batch = read_batch_file(batch_file)
+    base_folder = os.path.dirname(os.path.abspath(batch_file))
+    output_folder = os.path.join(base_folder, batch.get("saida", "Saida"))
+    formats = [extension.lower() for extension in batch.get("formatos", ["png"])]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Formatos não suportados: {', '.join(sorted(unknown))}")
+    dpi = batch.get("dpi", 100)
+    processes = processes or batch.get("processos") or os.cpu_count()
+    os.makedirs(output_folder, exist_ok=True)
+
+    jobs = expand_jobs(batch, base_folder)
+    names = set()
+    outputs = [os.path.join(output_folder, output_name(spec, names)) for spec in jobs]
+    print(f"{len(jobs)} gráfico(s), {processes} processo(s), saída em {output_folder}")
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # 1. Cada tabela é lida uma única vez, em paralelo, e vai para o cache de colunas
+        files = sorted({spec["arquivo"] for spec in jobs})
+        futures = {executor.submit(warm_cache, file_path, project_folder): file_path for file_path in files}
+        for future in as_completed(futures):
+            try:
+                rows, elapsed = future.result()
+                print(f"Tabela {os.path.basename(futures[future])}: {rows} linhas em {elapsed:.2f} s")
+            except Exception as e:
+                print(f"Tabela {os.path.basename(futures[future])}: erro ({e})")
+
+        # 2. Gráficos em paralelo; as tabelas são relidas do cache (memory-map)
+        futures = [executor.submit(render_job, spec, output, formats, dpi, project_folder)
+                   for spec, output in zip(jobs, outputs)]
+        results = [future.result() for future in futures]
+
+    print_summary(results, time.perf_counter() - start)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera gráficos em lote a partir de um arquivo YAML/JSON.")
+    parser.add_argument("lote")
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo (padrão: núcleos)")
+    parser.add_argument("--projeto", default=None, help="Pasta do projeto para o cache (padrão: diretório atual)")
+    args = parser.parse_args(argv)
+    results = run_batch(args.lote, args.processos, args.projeto)
+    return 1 if any("erro" in timings for timings in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class StreamingStats:
+    """Estatísticas de uma tabela acumuladas bloco a bloco durante a leitura.
+
+    Cada bloco é resumido com operações vetorizadas; apenas contadores, mínimos,
+    máximos, médias e somas dos quadrados dos desvios ficam em memória. Os blocos
+    são combinados pela fórmula de Chan (contagem, média, M2), que não perde a
+    precisão em colunas de valores grandes como a soma dos quadrados perderia.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        size = len(self.columns)
+        self.rows = 0
+        self.nulls = np.zeros(size, dtype=np.int64)
+        self.numeric_count = np.zeros(size, dtype=np.int64)
+        self.minimum = np.full(size, np.nan)
+        self.maximum = np.full(size, np.nan)
+        self.means = np.zeros(size)
+        self.m2 = np.zeros(size)  # Soma dos quadrados dos desvios em relação à média
+
+    def update(self, chunk):
+        """Acumula as estatísticas de um bloco (DataFrame)."""
+        self.rows += chunk.shape[0]
+        for col in range(chunk.shape[1]):
+            series = chunk.iloc[:, col]
+            self.nulls[col] += int(series.isna().sum())
+            if not (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)):
+                continue
+
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if values.size == 0:
+                continue
+            self.minimum[col] = np.fmin(self.minimum[col], values.min())
+            self.maximum[col] = np.fmax(self.maximum[col], values.max())
+            self.merge(col, values.size, values.mean(), np.square(values - values.mean()).sum())
+
+    def merge(self, col, count, mean, m2):
+        """Combina (contagem, média, M2) de um bloco com o acumulado da coluna."""
+        total = self.numeric_count[col] + count
+        delta = mean - self.means[col]
+        self.means[col] += delta * count / total
+        self.m2[col] += m2 + delta ** 2 * self.numeric_count[col] * count / total
+        self.numeric_count[col] = total
+
+    def mean(self, col):
+        return self.means[col] if self.numeric_count[col] else np.nan
+
+    def std(self, col):
+        count = self.numeric_count[col]
+        if count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2[col] / (count - 1)))
+
+    def describe(self, col):
+        """Texto curto com as estatísticas da coluna (usado no tooltip do cabeçalho)."""
+        lines = [f"Linhas: {self.rows}", f"Nulos: {self.nulls[col]}"]
+        if self.numeric_count[col]:
+            lines += [f"Mín.: {self.minimum[col]:.6g}", f"Máx.: {self.maximum[col]:.6g}",
+                      f"Média: {self.mean(col):.6g}", f"Desvio: {self.std(col):.6g}"]
+        return "\n".join(lines)
+
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_running_workers = set()
+
+
+def column_kind(series):
+    """Classifica a coluna em 'numeric', 'bool', 'datetime' ou 'categorical'."""
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    return "categorical"
+
+
+def profile_column(series):
+    """Perfil de uma coluna calculado com passagens vetorizadas."""
+    kind = column_kind(series)
+    nulls = int(series.isna().sum())
+    profile = {
+        "dtype": str(series.dtype),
+        "kind": kind,
+        "count": int(series.shape[0] - nulls),
+        "nulls": nulls,
+        "distinct": int(series.nunique(dropna=True)),
+        "min": None,
+        "max": None,
+        "quantiles": {},
+    }
+
+    if kind == "numeric":
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if values.size:
+            profile["min"] = float(values.min())
+            profile["max"] = float(values.max())
+            profile["quantiles"] = dict(zip(QUANTILES, np.quantile(values, QUANTILES).tolist()))
+    elif kind == "datetime" and profile["count"]:
+        profile["min"] = str(series.min())
+        profile["max"] = str(series.max())
+    return profile
+
+
+def profile_dataframe(df):
+    """Retorna {nome da coluna: perfil} para todas as colunas do DataFrame."""
+    profiles = {}
+    for col in range(df.shape[1]):
+        profiles.setdefault(str(df.columns[col]), profile_column(df.iloc[:, col]))
+    return profiles
+
+
+def describe_profile(profile):
+    """Texto curto do perfil (usado nos tooltips das colunas)."""
+    lines = [f"Tipo: {profile['dtype']}", f"Valores: {profile['count']}", f"Nulos: {profile['nulls']}",
+             f"Distintos: {profile['distinct']}"]
+    if profile["kind"] == "numeric" and profile["min"] is not None:
+        lines += [f"Mín.: {profile['min']:.6g}", f"Máx.: {profile['max']:.6g}",
+                  f"Mediana: {profile['quantiles'][0.5]:.6g}"]
+    elif profile["min"] is not None:
+        lines += [f"Mín.: {profile['min']}", f"Máx.: {profile['max']}"]
+    return "\n".join(lines)
+
+
+class ProfileSignals(QObject):
+    finished = pyqtSignal(object, int, object)  # Dataset, versão perfilada, perfis
+
+
+class ProfileWorker(QRunnable):
+    """Calcula o perfil das colunas de um dataset fora da thread principal."""
+
+    def __init__(self, dataset):
+        super().__init__()
+        self.dataset = dataset
+        self.version = dataset.version
+        self.df = dataset.df
+        self.signals = ProfileSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            profiles = profile_dataframe(self.df)
+        except Exception as e:
+            print(f"Erro ao perfilar {self.dataset.key}: {e}")
+            profiles = None
+        self.signals.finished.emit(self.dataset, self.version, profiles)
+
+
+def start_profiling(dataset, on_ready=None):
+    """Perfila o dataset em segundo plano; on_ready(dataset) é chamado na thread da interface.
+
+    O perfil só é gravado se o dataset não mudou durante o cálculo.
+    """
+    if dataset.profile is not None:
+        if on_ready:
+            on_ready(dataset)
+        return None
+
+    worker = ProfileWorker(dataset)
+
+    def on_finished(profiled_dataset, version, profiles):
+        _running_workers.discard(worker)
+        if profiles is None or profiled_dataset.version != version:
+            return  # Erro ou dados alterados durante o cálculo
+        profiled_dataset.profile = profiles
+        if on_ready:
+            on_ready(profiled_dataset)
+
+    worker.signals.finished.connect(on_finished)
+    _running_workers.add(worker)  # Mantém o worker (e seus sinais) vivo até a conclusão
+    QThreadPool.globalInstance().start(worker)
+    return worker
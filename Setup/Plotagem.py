@@ -0,0 +1,386 @@
+"""Desenho dos gráficos a partir de uma especificação (spec) e de um Dataset.
+
+A spec é um dicionário simples (serializável em JSON) com o tipo do gráfico, as
+colunas usadas, o estilo e os rótulos. Este módulo não depende de widgets Qt:
+o GraficosDock monta a spec a partir dos campos da interface e as janelas de
+gráfico guardam a spec, os dados preparados e os artistas desenhados para
+poder aplicar mudanças de estilo diretamente nos artistas existentes.
+"""
+import matplotlib.markers as mmarkers
+from matplotlib import colors
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import Collection
+from matplotlib.figure import Figure
+from matplotlib.image import AxesImage
+
+from Setup.Agregacao import aggregate_bars
+from Setup.Densidade import DEFAULT_POINT_THRESHOLD, draw_density, single_color_map
+from Setup.Histograma import DEFAULT_BINS, dataset_histogram
+
+# Campos da spec que exigem uma nova passagem pelos dados
+DATA_FIELDS = ("tipo", "arquivo", "x", "y", "estrat", "estratificacao")
+# Campos de estilo que mudam os dados agregados (bins do histograma, agregação das barras)
+STYLE_DATA_FIELDS = {
+    "histograma": ("bins_personalizados", "range_min", "range_max", "funcao"),
+    "barras": ("agregacao",),
+}
+
+# Campos de estilo que podem ser aplicados nos artistas existentes, por modo de desenho
+IN_PLACE_STYLE = {
+    "dispersao": {"tamanho", "cor", "marcador", "alpha", "colormap", "cor_min", "cor_max"},
+    "densidade": {"alpha", "colormap", "cor_min", "cor_max", "cor", "tamanho", "marcador"},
+    "barras": {"cor", "borda", "hachura"},
+    "histograma": {"cor", "borda"},
+}
+
+
+# Estilo padrão de cada tipo (specs incompletas, ex.: lote em Setup/Lote.py)
+DEFAULT_STYLES = {
+    "dispersao": {"tamanho": 15, "cor": "steelblue", "marcador": "o", "alpha": 0.8, "colormap": "viridis",
+                  "cor_min": None, "cor_max": None},
+    "barras": {"largura": 0.8, "alinhamento": "center", "cor": "steelblue", "borda": "black", "hachura": "",
+               "agregacao": "soma"},
+    "histograma": {"cor": "steelblue", "borda": "black", "orientacao": "vertical", "alinhamento": "mid",
+                   "tipo": "bar", "preenchimento": True, "densidade": False, "log": False,
+                   "bins_personalizados": False, "range_min": 0, "range_max": 0, "funcao": "auto"},
+}
+DEFAULT_LABELS = {"titulo": "", "eixo_x": "", "eixo_y": "", "grade": False, "legenda": False}
+PLOT_TYPE_NAMES = {"dispersao": "Dispersão", "barras": "Barras", "histograma": "Histograma"}
+
+
+class PlotData:
+    """Colunas já filtradas e codificadas para um gráfico."""
+
+    def __init__(self, x, y, estrat, x_labels, y_labels, version=None, hist=None, bars=None):
+        self.x = x
+        self.y = y
+        self.estrat = estrat
+        self.x_labels = x_labels
+        self.y_labels = y_labels
+        self.version = version  # Versão do dataset usada
+        self.hist = hist  # HistogramResult (histogramas são contados antes de desenhar)
+        self.bars = bars  # BarResult (barras são agregadas antes de desenhar)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in (self.x, self.y, self.estrat, self.hist, self.bars)
+                   if values is not None)
+
+    @property
+    def point_count(self):
+        """Número de pontos desenhados (bins no histograma, barras no gráfico de barras)."""
+        if self.hist is not None:
+            return self.hist.counts.size
+        if self.bars is not None:
+            return self.bars.values.size
+        return len(self.x)
+
+    @property
+    def group_count(self):
+        """Número de estratos desenhados com cores próprias em histogramas e barras."""
+        summary = self.hist.counts if self.hist is not None else self.bars.values if self.bars is not None else None
+        return 1 if summary is None else summary.shape[0]
+
+
+class PlotArtists:
+    """Artistas desenhados para uma spec (usados nas atualizações de estilo)."""
+
+    def __init__(self, ax, mode, main=None, colorbar=None):
+        self.ax = ax
+        self.mode = mode  # 'dispersao', 'densidade', 'barras' ou 'histograma'
+        self.main = main  # PathCollection, AxesImage ou lista de patches
+        self.colorbar = colorbar
+
+
+def plot_title(spec):
+    """Título da janela do gráfico: 'Gráfico de <tipo> - <título>'."""
+    return f"Gráfico de {PLOT_TYPE_NAMES[spec['tipo']]} - {spec['rotulos']['titulo']}"
+
+
+def complete_spec(spec):
+    """Spec com os campos que faltam preenchidos pelos padrões do tipo."""
+    tipo = spec.get("tipo", "dispersao")
+    if tipo not in DEFAULT_STYLES:
+        raise ValueError(f"Tipo de gráfico desconhecido: {tipo}")
+    complete = {"tipo": tipo, "arquivo": "", "x": "", "y": "", "estrat": "", "estratificacao": False,
+                "limite_pontos": DEFAULT_POINT_THRESHOLD}
+    complete.update({key: value for key, value in spec.items() if key not in ("estilo", "rotulos")})
+    complete["estilo"] = {**DEFAULT_STYLES[tipo], **(spec.get("estilo") or {})}
+    complete["rotulos"] = {**DEFAULT_LABELS, **(spec.get("rotulos") or {})}
+    return complete
+
+
+def data_signature(spec):
+    signature = tuple(spec.get(field) for field in DATA_FIELDS)
+    style_fields = STYLE_DATA_FIELDS.get(spec.get("tipo"), ())
+    return signature + tuple(spec["estilo"].get(field) for field in style_fields)
+
+
+def encode_column(dataset, column_name, mask):
+    """Coluna numérica como float ou categórica como códigos (em cache por versão do dataset)."""
+    if dataset.is_numeric(column_name):
+        return dataset.numeric(column_name)[mask], None  # Keep numbers as they are
+
+    codes, labels = dataset.encoded(column_name)
+    return codes[mask], labels
+
+
+def prepare_data(dataset, spec):
+    """Seleciona e codifica as colunas da spec; retorna None se faltarem colunas."""
+    tipo = spec["tipo"]
+    has_y = dataset.has_column(spec.get("y"))
+    use_estrat = spec.get("estratificacao") and dataset.has_column(spec.get("estrat"))
+
+    if not dataset.has_column(spec.get("x")) or (tipo != "histograma" and not has_y):
+        print("Selected columns not found.")
+        return None
+    if tipo == "histograma":
+        return prepare_histogram(dataset, spec, has_y, use_estrat)
+    if tipo == "barras":
+        return prepare_bars(dataset, spec, use_estrat)
+
+    # Keep only rows where every selected column has a value
+    mask = dataset.valid_mask(spec["x"])
+    if has_y:
+        mask = mask & dataset.valid_mask(spec["y"])
+    if use_estrat:
+        mask = mask & dataset.valid_mask(spec["estrat"])
+
+    x_data, x_labels = encode_column(dataset, spec["x"], mask)
+    y_data, y_labels = encode_column(dataset, spec["y"], mask) if has_y else (None, None)
+    estrat_data = encode_column(dataset, spec["estrat"], mask)[0] if use_estrat else None
+
+    return PlotData(x_data, y_data, estrat_data, x_labels, y_labels, dataset.version)
+
+
+def prepare_histogram(dataset, spec, has_weights, use_estrat):
+    """Conta o histograma da spec (pesos, estratificação e bins personalizados) direto no dataset."""
+    if not dataset.is_numeric(spec["x"]) or (has_weights and not dataset.is_numeric(spec["y"])):
+        print("Histogram columns must be numeric.")
+        return None
+
+    style = spec["estilo"]
+    strategy, value_range = DEFAULT_BINS, None
+    if style["bins_personalizados"]:
+        strategy = style["funcao"]
+        if style["range_min"] < style["range_max"]:
+            value_range = (style["range_min"], style["range_max"])
+
+    hist = dataset_histogram(dataset, spec["x"], spec["y"] if has_weights else None,
+                             spec["estrat"] if use_estrat else None, strategy, value_range)
+    if hist is None:
+        print("Selected column has no values.")
+        return None
+    return PlotData(None, None, None, None, None, dataset.version, hist)
+
+
+def prepare_bars(dataset, spec, use_estrat):
+    """Agrega a altura por X (e estrato) antes de desenhar: uma barra por categoria."""
+    if not dataset.is_numeric(spec["y"]):
+        print("Bar height column must be numeric.")
+        return None
+
+    bars, x_labels = aggregate_bars(dataset, spec["x"], spec["y"], spec["estrat"] if use_estrat else None,
+                                    spec["estilo"].get("agregacao", "soma"))
+    return PlotData(None, None, None, x_labels, None, dataset.version, bars=bars)
+
+
+def uses_density(spec, data):
+    """Dispersões acima do limite de pontos são desenhadas como raster de densidade."""
+    return spec["tipo"] == "dispersao" and len(data.x) > spec.get("limite_pontos", DEFAULT_POINT_THRESHOLD)
+
+
+def color_norm(style):
+    return colors.Normalize(vmin=style["cor_min"], vmax=style["cor_max"])
+
+
+def draw_plot(fig, spec, data):
+    """Limpa a figura e desenha o gráfico da spec; retorna os PlotArtists."""
+    fig.clear()
+    ax = fig.add_subplot()
+    tipo = spec["tipo"]
+
+    if tipo == "dispersao":
+        artists = draw_scatter(fig, ax, spec, data)
+    elif tipo == "barras":
+        artists = draw_bars(ax, spec, data)
+    else:
+        artists = draw_histogram(ax, spec, data)
+
+    apply_labels(ax, spec, data)
+    return artists
+
+
+def render_rgba(spec, data):
+    """Desenha a spec em uma figura Agg própria e retorna (largura, altura, bytes RGBA).
+
+    Não usa Qt nem pyplot: pode rodar em outra thread ou em outro processo
+    (Setup/Renderizacao.py). A figura tem o tamanho padrão, o mesmo das janelas de gráfico.
+    """
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    draw_plot(fig, spec, data)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    return width, height, bytes(canvas.buffer_rgba())
+
+
+def draw_scatter(fig, ax, spec, data):
+    style = spec["estilo"]
+    estratificacao = data.estrat is not None
+
+    if uses_density(spec, data):
+        # Level of detail: too many points for a true scatter, draw a density raster instead
+        if estratificacao:
+            image = draw_density(ax, data.x, data.y, data.estrat, cmap=style["colormap"], norm=color_norm(style),
+                                 alpha=style["alpha"])
+            colorbar = fig.colorbar(image, ax=ax, label=f"{spec['estrat']} (média)")
+        else:
+            image = draw_density(ax, data.x, data.y, color=style["cor"], alpha=style["alpha"])
+            colorbar = fig.colorbar(image, ax=ax, label="Pontos por célula")
+        return PlotArtists(ax, "densidade", image, colorbar)
+
+    if estratificacao:
+        scatter = ax.scatter(data.x, data.y, s=style["tamanho"], marker=style["marcador"], c=data.estrat,
+                             cmap=style["colormap"], norm=color_norm(style), alpha=style["alpha"])
+        colorbar = fig.colorbar(scatter, ax=ax, label=spec["estrat"])
+        return PlotArtists(ax, "dispersao", scatter, colorbar)
+
+    scatter = ax.scatter(data.x, data.y, s=style["tamanho"], marker=style["marcador"], c=style["cor"],
+                         alpha=style["alpha"])
+    return PlotArtists(ax, "dispersao", scatter)
+
+
+def draw_bars(ax, spec, data):
+    """Desenha as barras agregadas; estratos ficam lado a lado dentro da largura escolhida."""
+    style = spec["estilo"]
+    bars = data.bars
+    groups = data.group_count
+    width = style["largura"] / groups
+
+    patches = []
+    for group in range(groups):
+        offset = (group - (groups - 1) / 2) * width
+        container = ax.bar(bars.positions + offset, bars.values[group], width=width, align=style["alinhamento"],
+                           color=style["cor"] if groups == 1 else None, edgecolor=style["borda"],
+                           hatch=style["hachura"] or None,
+                           yerr=None if bars.errors is None else bars.errors[group], capsize=3,
+                           label=bars.group_labels[group] if bars.group_labels else None)
+        patches.extend(container.patches)
+    return PlotArtists(ax, "barras", patches)
+
+
+def draw_histogram(ax, spec, data):
+    """Desenha as contagens já calculadas: um valor por bin com a contagem como peso."""
+    style = spec["estilo"]
+    hist = data.hist
+    groups = hist.counts.shape[0]
+    left_edges = hist.edges[:-1]
+
+    _, _, patches = ax.hist([left_edges] * groups, bins=hist.edges, weights=list(hist.counts),
+                            color=style["cor"] if groups == 1 else None, label=hist.labels,
+                            edgecolor=style["borda"], orientation=style["orientacao"], align=style["alinhamento"],
+                            histtype=style["tipo"], fill=style["preenchimento"], density=style["densidade"],
+                            log=style["log"])
+    return PlotArtists(ax, "histograma", flatten_patches(patches))
+
+
+def flatten_patches(patches):
+    """ax.hist retorna uma lista de patches (ou lista de listas quando empilhado)."""
+    flat = []
+    for patch in patches:
+        if isinstance(patch, (list, tuple)) or hasattr(patch, "patches"):
+            flat.extend(flatten_patches(list(patch)))
+        else:
+            flat.append(patch)
+    return flat
+
+
+def apply_labels(ax, spec, data):
+    """Rótulos categóricos dos eixos, título, nomes dos eixos e grade."""
+    if data.x_labels is not None:
+        ax.set_xticks(range(len(data.x_labels)))
+        ax.set_xticklabels([data.x_labels[i] for i in range(len(data.x_labels))], rotation=45)
+
+    if data.y_labels is not None and spec["tipo"] != "histograma":
+        ax.set_yticks(range(len(data.y_labels)))
+        ax.set_yticklabels([data.y_labels[i] for i in range(len(data.y_labels))])
+
+    apply_text(ax, spec)
+
+
+def apply_text(ax, spec):
+    """Título, nomes dos eixos e grade (não mexe nos limites dos eixos)."""
+    rotulos = spec["rotulos"]
+    ax.set_xlabel(rotulos["eixo_x"])
+    ax.set_ylabel(rotulos["eixo_y"])
+    ax.set_title(rotulos["titulo"])
+    ax.grid(rotulos["grade"])
+
+    legend = ax.get_legend()
+    if rotulos.get("legenda") and ax.get_legend_handles_labels()[0]:
+        ax.legend()
+    elif legend is not None:
+        legend.remove()
+
+
+def marker_path(marker):
+    """Caminho do marcador já com a transformação usada por ax.scatter."""
+    marker_style = mmarkers.MarkerStyle(marker)
+    return marker_style.get_path().transformed(marker_style.get_transform())
+
+
+def update_style(artists, old_spec, new_spec, data):
+    """Aplica nos artistas existentes as mudanças de estilo entre duas specs.
+
+    Retorna False quando a mudança não pode ser feita no lugar (o gráfico deve ser
+    redesenhado a partir dos dados já preparados).
+    """
+    if data_signature(old_spec) != data_signature(new_spec):
+        return False
+    if old_spec.get("limite_pontos") != new_spec.get("limite_pontos"):
+        return False
+
+    old_style, style = old_spec["estilo"], new_spec["estilo"]
+    changed = {key for key in style if style[key] != old_style.get(key)}
+    if not changed <= IN_PLACE_STYLE[artists.mode]:
+        return False
+
+    main = artists.main
+    if isinstance(main, Collection):
+        # Dispersão (também quando o modo densidade foi ampliado até virar dispersão)
+        if "tamanho" in changed:
+            main.set_sizes([style["tamanho"]])
+        if "marcador" in changed:
+            main.set_paths([marker_path(style["marcador"])])
+        if "cor" in changed and data.estrat is None:
+            main.set_color(style["cor"])
+        if "alpha" in changed:
+            main.set_alpha(style["alpha"])
+        if data.estrat is not None:
+            update_color_mapping(main, changed, style)
+    elif isinstance(main, AxesImage):
+        if "alpha" in changed:
+            main.set_alpha(style["alpha"])
+        if data.estrat is not None:
+            update_color_mapping(main, changed, style)
+        elif "cor" in changed:
+            main.set_cmap(single_color_map(style["cor"]))
+    else:
+        for patch in main:
+            if "cor" in changed and data.group_count == 1:  # Strata keep the color cycle
+                patch.set_facecolor(style["cor"])
+            if "borda" in changed:
+                patch.set_edgecolor(style["borda"])
+            if "hachura" in changed:
+                patch.set_hatch(style["hachura"] or None)
+
+    apply_text(artists.ax, new_spec)
+    return True
+
+
+def update_color_mapping(mappable, changed, style):
+    if "colormap" in changed:
+        mappable.set_cmap(style["colormap"])
+    if "cor_min" in changed or "cor_max" in changed:
+        mappable.set_clim(style["cor_min"], style["cor_max"])  # A colorbar acompanha o mappable
@@ -0,0 +1,280 @@
+"""Arquivo de projeto: camadas, gráficos salvos e estado da interface.
+
+O projeto é a própria pasta: <projeto>/projeto.arandu (JSON) guarda só a
+árvore de camadas, as dimensões de cada tabela, as specs dos gráficos e o
+estado das janelas. As colunas das tabelas ficam no cache de colunas do
+projeto (<projeto>/Cache/Tabelas, arquivos .npy lidos com memory-map) e as
+specs em <projeto>/Graficos. Abrir o projeto lê apenas o arquivo; cada
+dataset é mapeado quando é usado pela primeira vez.
+"""
+import json
+import os
+import tempfile
+import time
+
+from PyQt5.QtCore import QByteArray, QRunnable, QThreadPool, Qt, pyqtSlot
+from PyQt5.QtWidgets import QFileDialog, QMdiSubWindow, QMessageBox
+
+from Setup.Camadas import SPEC_PATH_ROLE, THUMBNAIL_ROLE, get_layer_registry
+
+PROJECT_FILE = "projeto.arandu"
+PROJECT_FORMAT = "arandu-projeto"
+PROJECT_VERSION = 1
+
+_running_writers = set()
+
+
+def project_file(project_folder):
+    return os.path.join(project_folder, PROJECT_FILE)
+
+
+def stored_path(path, project_folder):
+    """Caminho relativo ao projeto quando o arquivo está dentro dele (o projeto pode ser movido)."""
+    if not path:
+        return path
+    relative = os.path.relpath(os.path.abspath(path), project_folder)
+    return path if relative.startswith("..") or os.path.isabs(relative) else relative.replace("\\", "/")
+
+
+def resolve_path(path, project_folder):
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.normpath(os.path.join(project_folder, path)).replace("\\", "/")
+
+
+def project_snapshot(main_window):
+    """Camadas e gráficos da árvore, para saber se há mudanças desde o último salvamento/abertura."""
+    layers = get_layer_registry(main_window).layers.values()
+    return sorted((layer.path, sorted(layer.plot_items)) for layer in layers)
+
+
+def has_unsaved_changes(main_window):
+    registry = get_layer_registry(main_window)
+    return bool(registry.layers) and project_snapshot(main_window) != getattr(main_window, 'saved_snapshot', [])
+
+
+def describe_layer(info):
+    if not info.get("linhas") and not info.get("colunas"):
+        return None
+    return f"{info.get('linhas', '?')} linhas × {len(info.get('colunas') or [])} colunas"
+
+
+# Gravação ---------------------------------------------------------------------
+
+class CacheWriter(QRunnable):
+    """Grava tabelas no cache de colunas do projeto fora da thread da interface."""
+
+    def __init__(self, tables, project_folder):
+        super().__init__()
+        self.tables = tables  # [(caminho da camada, DataFrame)]
+        self.project_folder = project_folder
+
+    @pyqtSlot()
+    def run(self):
+        from Setup.Cache import ColumnCache, cache_root
+
+        cache = ColumnCache(cache_root(self.project_folder))
+        for path, df in self.tables:
+            try:
+                cache.put(path, df)
+            except (OSError, ValueError) as e:
+                print(f"Não foi possível gravar o cache de {path}: {e}")
+        _running_writers.discard(self)
+
+
+def cache_datasets(main_window, project_folder):
+    """Grava no cache do projeto (em segundo plano) as colunas das camadas carregadas que ainda não estão lá."""
+    from Setup.Cache import ColumnCache, cache_root
+    from Setup.Leitores import load_preferences, select_reader
+
+    cache = ColumnCache(cache_root(project_folder))
+    preferences = load_preferences(project_folder)
+    tables = []
+    for layer in get_layer_registry(main_window).layers.values():
+        dataset = layer.dataset
+        if dataset is None:
+            continue
+        try:
+            if select_reader(layer.path, preferences).cacheable and not cache.contains(layer.path):
+                tables.append((layer.path, dataset.df))  # Os DataFrames não são alterados, só trocados
+        except ValueError as e:
+            print(f"Não foi possível gravar o cache de {layer.path}: {e}")
+    if not tables:
+        return None
+
+    writer = CacheWriter(tables, project_folder)
+    _running_writers.add(writer)  # Mantém o worker vivo até a conclusão
+    QThreadPool.globalInstance().start(writer)
+    return writer
+
+
+def save_open_plots(main_window):
+    """Atualiza as specs dos gráficos abertos (ficam em <projeto>/Graficos)."""
+    graficos_dock = getattr(main_window, 'graficos_dock', None)
+    if graficos_dock is None:
+        return
+    for window in list(get_layer_registry(main_window).window_items):
+        if window.data is None:
+            continue
+        dataset = graficos_dock.get_dataset_by_filename(window.spec["arquivo"])
+        if dataset is not None:
+            graficos_dock.save_plot_spec(window, dataset)
+
+
+def layer_entry(layer, project_folder):
+    dataset = layer.dataset
+    if dataset is not None:
+        layer.info = {"linhas": dataset.row_count, "colunas": [str(name) for name in dataset.columns()]}
+
+    plots = []
+    for title, item in layer.plot_items.items():
+        spec_path = item.data(SPEC_PATH_ROLE)
+        if spec_path:
+            plots.append({"titulo": title, "spec": stored_path(spec_path, project_folder),
+                          "miniatura": stored_path(item.data(THUMBNAIL_ROLE), project_folder)})
+    return {"caminho": stored_path(layer.path, project_folder), **layer.info, "graficos": plots}
+
+
+def interface_state(main_window):
+    state = {"janelas": bytes(main_window.saveState().toBase64()).decode("ascii"),
+             "geometria": bytes(main_window.saveGeometry().toBase64()).decode("ascii")}
+    graficos_dock = getattr(main_window, 'graficos_dock', None)
+    if graficos_dock is not None:
+        state["graficos"] = {"aberto": graficos_dock.isVisible(), "arquivo": graficos_dock.combo_box.currentText(),
+                             "secao": graficos_dock.toolbox.currentIndex(),
+                             "atualizar_ativo": graficos_dock.atualizar_ativo.isChecked()}
+    return state
+
+
+def write_project(document, project_folder):
+    """Escrita atômica do projeto.arandu; retorna o caminho"""
+    file_path = project_file(project_folder)
+    fd, tmp_path = tempfile.mkstemp(dir=project_folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return file_path
+
+
+def save_project(main_window):
+    """Grava o projeto na pasta aberta (pede uma pasta se nenhum projeto foi aberto); retorna o caminho"""
+    from Setup.Auxiliares import status_bar_message, update_file_browser_root
+
+    project_folder = getattr(main_window, 'project_folder', None)
+    if not project_folder:
+        project_folder = QFileDialog.getExistingDirectory(main_window, "Salvar Projeto em", "")
+        if not project_folder:
+            return None
+        main_window.project_folder = project_folder
+        update_file_browser_root(main_window.nav_folder, project_folder)
+
+    start = time.perf_counter()
+    save_open_plots(main_window)
+    cache_datasets(main_window, project_folder)
+
+    layers = get_layer_registry(main_window).layers.values()
+    document = {"formato": PROJECT_FORMAT, "versao": PROJECT_VERSION,
+                "camadas": [layer_entry(layer, project_folder) for layer in layers],
+                "interface": interface_state(main_window)}
+    try:
+        file_path = write_project(document, project_folder)
+    except OSError as e:
+        status_bar_message(main_window.statusbar, f"Erro ao salvar o projeto: {e}", 6000)
+        return None
+    main_window.saved_snapshot = project_snapshot(main_window)
+    status_bar_message(main_window.statusbar,
+                       f"Projeto salvo: {len(document['camadas'])} camada(s) em {time.perf_counter() - start:.1f} s")
+    return file_path
+
+
+# Fechamento -------------------------------------------------------------------
+
+def confirm_close_project(main_window):
+    """Pergunta se as mudanças do projeto aberto devem ser salvas; retorna False se o usuário cancelar."""
+    if not has_unsaved_changes(main_window):
+        return True
+    answer = QMessageBox.question(main_window, "Projeto não salvo",
+                                  "O projeto aberto tem mudanças não salvas. Deseja salvá-las?",
+                                  QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel, QMessageBox.Save)
+    if answer == QMessageBox.Save:
+        return save_project(main_window) is not None
+    return answer == QMessageBox.Discard
+
+
+def clear_project(main_window):
+    """Fecha as tabelas e gráficos das camadas e remove todas as camadas e datasets."""
+    from Setup.Datasets import dataset_registry
+
+    registry = get_layer_registry(main_window)
+    windows = list(registry.window_items) + [layer.table_window for layer in registry.layers.values()]
+    windows += list(getattr(main_window, 'opened_subwindows', {}).values())
+    for window in windows:
+        if isinstance(window, QMdiSubWindow):
+            window.close()  # Os gráficos ainda salvam a spec no projeto que está sendo fechado
+    for path in list(registry.layers):
+        dataset_registry.remove(path)
+    registry.clear()
+    getattr(main_window, 'opened_subwindows', {}).clear()
+    main_window.saved_snapshot = []
+
+
+# Abertura ---------------------------------------------------------------------
+
+def read_project(project_folder):
+    """Lê o projeto.arandu; levanta ValueError se não for um projeto ou for de uma versão mais nova."""
+    with open(project_file(project_folder), encoding="utf-8") as f:
+        document = json.load(f)
+    if not isinstance(document, dict) or document.get("formato") != PROJECT_FORMAT:
+        raise ValueError(f"{project_file(project_folder)} não é um projeto do Arandu.")
+    if document.get("versao", 0) > PROJECT_VERSION:
+        raise ValueError(f"Projeto de versão {document['versao']} não suportada (máx. {PROJECT_VERSION}).")
+    return document
+
+
+def restore_interface(main_window, state):
+    graficos = state.get("graficos")
+    if graficos and graficos.get("aberto"):
+        from Setup.Auxiliares import open_graficos_dock
+        open_graficos_dock(main_window, main_window.content, main_window.mdiArea)
+        graficos_dock = main_window.graficos_dock
+        graficos_dock.toolbox.setCurrentIndex(graficos.get("secao", 0))
+        graficos_dock.atualizar_ativo.setChecked(graficos.get("atualizar_ativo", True))
+        if graficos_dock.combo_box.findText(graficos.get("arquivo", "")) >= 0:
+            graficos_dock.combo_box.setCurrentText(graficos["arquivo"])  # Só essa camada é mapeada agora
+
+    if state.get("geometria"):
+        main_window.restoreGeometry(QByteArray.fromBase64(state["geometria"].encode("ascii")))
+    if state.get("janelas"):
+        main_window.restoreState(QByteArray.fromBase64(state["janelas"].encode("ascii")))
+
+
+def open_project(main_window, project_folder):
+    """Restaura a árvore de camadas, os gráficos salvos e a interface sem ler nenhuma tabela.
+
+    Retorna o número de camadas; levanta OSError/ValueError se o arquivo não puder ser lido.
+    """
+    from Setup.Auxiliares import status_bar_message
+
+    start = time.perf_counter()
+    document = read_project(project_folder)
+    clear_project(main_window)  # As camadas do projeto anterior não podem ir para o manifesto deste
+    registry = get_layer_registry(main_window)
+    for entry in document.get("camadas", []):
+        path = resolve_path(entry["caminho"], project_folder)
+        layer = registry.add_layer(path)
+        layer.info = {key: entry[key] for key in ("linhas", "colunas") if key in entry}
+        layer.item.setData(describe_layer(layer.info), Qt.ToolTipRole)
+        for plot in entry.get("graficos", []):
+            registry.add_saved_plot(path, plot["titulo"], resolve_path(plot["spec"], project_folder),
+                                    resolve_path(plot.get("miniatura"), project_folder))
+
+    restore_interface(main_window, document.get("interface") or {})
+    main_window.saved_snapshot = project_snapshot(main_window)
+    count = len(document.get("camadas", []))
+    status_bar_message(main_window.statusbar,
+                       f"Projeto aberto: {count} camada(s) em {time.perf_counter() - start:.2f} s")
+    return count
@@ -0,0 +1,155 @@
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from Setup.Plotagem import prepare_data, render_rgba
+
+# Gráficos com mais pontos que isso são renderizados fora da thread da interface
+RENDER_OFFLOAD_POINTS = 100000
+
+_datasets = {}  # Por processo: camada -> (chave da origem, Dataset), reaproveitado entre renderizações
+
+
+def mapped_source(source, project_folder=None):
+    """True se um processo consegue mapear a tabela sozinho: formato em memory-map ou entrada no cache de colunas."""
+    from Setup.Cache import ColumnCache, cache_root
+    from Setup.Leitores import load_preferences, select_reader, split_source
+
+    if source is None or not os.path.exists(split_source(source)[0]):
+        return False
+    try:
+        if not select_reader(source, load_preferences(project_folder)).cacheable:
+            return True
+        return ColumnCache(cache_root(project_folder)).contains(source)
+    except (OSError, ValueError):
+        return False
+
+
+def mapped_dataset(source, project_folder=None):
+    """Dataset da camada com as colunas em memory-map (do arquivo ou do cache); roda nos processos do pool."""
+    from Setup.Cache import ColumnCache, cache_root, source_key
+    from Setup.Datasets import Dataset
+    from Setup.Leitores import load_preferences, select_reader, split_source
+
+    key = source_key(source)  # Muda junto com o arquivo: um Dataset antigo nunca é reaproveitado
+    cached = _datasets.get(source)
+    if cached is None or cached[0] != key:
+        reader = select_reader(source, load_preferences(project_folder))
+        if reader.cacheable:
+            df = ColumnCache(cache_root(project_folder)).get(source)
+            if df is None:
+                raise LookupError(f"{source} não está no cache de colunas.")
+        else:
+            df = reader.read(*split_source(source))
+        cached = _datasets[source] = (key, Dataset(source, df))
+    return cached[1]
+
+
+def render_spec(spec, source, data=None, project_folder=None):
+    """Renderiza a spec; sem data, os dados são preparados no próprio processo a partir da tabela mapeada."""
+    if data is None:
+        data = prepare_data(mapped_dataset(source, project_folder), spec)
+        if data is None:
+            raise ValueError("As colunas selecionadas não podem ser desenhadas.")
+    return render_rgba(spec, data)
+
+
+class RenderManager(QObject):
+    """Renderiza gráficos (Agg) em um pool de processos e entrega a imagem na thread da interface.
+
+    Cada pedido vira uma tarefa independente, então vários gráficos pedidos ao
+    mesmo tempo são renderizados em paralelo nos núcleos disponíveis. Se o pool
+    de processos não puder ser usado, as tarefas rodam em um pool de threads.
+    Quando a tabela pode ser mapeada (cache de colunas ou formato em memory-map)
+    só a spec vai para o processo, que prepara os dados; senão os dados
+    preparados são copiados junto com o pedido.
+    """
+
+    rendered = pyqtSignal(int, object, object)  # id do pedido, (largura, altura, RGBA), erro
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = None
+        self.callbacks = {}  # id do pedido -> on_ready(width, height, rgba, error)
+        self.futures = {}
+        self.ids = itertools.count(1)
+        # Os futures terminam em threads do executor; o sinal leva o resultado à thread da interface
+        self.rendered.connect(self.deliver)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def create_executor(self):
+        workers = max(1, (os.cpu_count() or 2) - 1)  # Um núcleo fica livre para a interface
+        try:
+            # spawn: um fork copiaria os locks das threads Qt (carregamento, perfis) e poderia travar o processo
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            print(f"Pool de processos indisponível ({e}); renderizando em threads.")
+            return ThreadPoolExecutor(max_workers=workers)
+
+    def submit(self, spec, data, on_ready, source=None, project_folder=None):
+        """Agenda a renderização; on_ready(width, height, rgba, error) é chamado na thread da interface.
+
+        source é a chave do dataset (arquivo ou 'arquivo::planilha') de onde o processo lê as colunas.
+        """
+        if self.executor is None:
+            self.executor = self.create_executor()
+        if mapped_source(source, project_folder):
+            data = None  # O processo mapeia as colunas: nada de PlotData serializado
+
+        request_id = next(self.ids)
+        try:
+            future = self.executor.submit(render_spec, spec, source, data, project_folder)
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: falta de memória): recomeça com um pool novo
+            self.executor = self.create_executor()
+            future = self.executor.submit(render_spec, spec, source, data, project_folder)
+
+        self.callbacks[request_id] = on_ready
+        self.futures[request_id] = future
+        future.add_done_callback(lambda done: self.on_done(request_id, done))
+        return request_id
+
+    def on_done(self, request_id, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.rendered.emit(request_id, None if error else future.result(), error)
+
+    def deliver(self, request_id, result, error):
+        self.futures.pop(request_id, None)
+        on_ready = self.callbacks.pop(request_id, None)
+        if on_ready is None:
+            return  # Pedido cancelado (janela fechada)
+        if error is not None:
+            on_ready(None, None, None, error)
+        else:
+            on_ready(*result, None)
+
+    def cancel(self, request_id):
+        """Descarta o resultado do pedido (e cancela a tarefa se ainda não começou)."""
+        self.callbacks.pop(request_id, None)
+        future = self.futures.pop(request_id, None)
+        if future is not None:
+            future.cancel()
+
+    def pending(self):
+        return len(self.callbacks)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def get_render_manager(main_window):
+    """Retorna (criando se necessário) o gerenciador de renderizações da janela principal"""
+    if not hasattr(main_window, 'render_manager') or main_window.render_manager is None:
+        main_window.render_manager = RenderManager(main_window)
+    return main_window.render_manager
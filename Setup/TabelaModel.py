@@ -0,0 +1,91 @@
+from bisect import bisect_right
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtWidgets import QTableView, QHeaderView
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Modelo de tabela que lê as colunas do DataFrame diretamente.
+
+    Nenhum objeto é criado por célula: o Qt só pede ao modelo as células
+    visíveis no viewport e apenas essas são formatadas como texto.
+    """
+
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self._headers = [str(name) for name in df.columns]
+        self._stats = None
+        self._set_frame(df)
+
+    def _set_frame(self, df):
+        self._df = df
+        # Um array NumPy por coluna (iloc evita problemas com nomes repetidos)
+        self._chunks = [[df.iloc[:, col].to_numpy() for col in range(df.shape[1])]]
+        self._offsets = [0]  # Primeira linha de cada bloco
+        self._row_count = df.shape[0]
+
+    def dataframe(self):
+        """Retorna o DataFrame original (tipado) que alimenta o modelo."""
+        return self._df
+
+    def append_chunk(self, chunk):
+        """Acrescenta um bloco de linhas lido em segundo plano (exibição progressiva)."""
+        if chunk.shape[0] == 0:
+            return
+        first = self._row_count
+        self.beginInsertRows(QModelIndex(), first, first + chunk.shape[0] - 1)
+        self._chunks.append([chunk.iloc[:, col].to_numpy() for col in range(chunk.shape[1])])
+        self._offsets.append(first)
+        self._row_count += chunk.shape[0]
+        self._df = None  # Só existe DataFrame completo após set_dataframe
+        self.endInsertRows()
+
+    def set_dataframe(self, df):
+        """Substitui os blocos pelo DataFrame final, já com as colunas concatenadas."""
+        self.beginResetModel()
+        self._set_frame(df)
+        self.endResetModel()
+
+    def set_column_stats(self, stats):
+        """Define as estatísticas exibidas no tooltip dos cabeçalhos."""
+        self._stats = stats
+        if self._headers:
+            self.headerDataChanged.emit(Qt.Horizontal, 0, len(self._headers) - 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = index.row()
+        chunk = 0
+        if len(self._offsets) > 1:
+            chunk = bisect_right(self._offsets, row) - 1
+            row -= self._offsets[chunk]
+        return str(self._chunks[chunk][index.column()][row])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.ToolTipRole and orientation == Qt.Horizontal and self._stats is not None:
+            return self._stats.describe(section)
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)  # Numeração de linhas igual à do QTableWidget
+
+
+def create_table_view(df, parent=None):
+    """Cria um QTableView virtualizado para o DataFrame."""
+    table_view = QTableView(parent)
+    model = DataFrameModel(df, table_view)
+    table_view.setModel(model)
+
+    # Altura fixa das linhas: o Qt não precisa medir cada linha da tabela
+    vertical_header = table_view.verticalHeader()
+    vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+    vertical_header.setDefaultSectionSize(table_view.fontMetrics().height() + 6)
+    return table_view
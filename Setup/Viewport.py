@@ -0,0 +1,79 @@
+from PyQt5.QtCore import QTimer
+
+from Setup.Densidade import SpatialIndex, draw_density
+
+DEBOUNCE_MS = 150  # Espera o fim do pan/zoom antes de redesenhar
+
+
+class ViewportDecimator:
+    """Redesenha uma dispersão grande conforme a área visível dos eixos.
+
+    A cada mudança de limites (pan/zoom da barra de navegação) consulta o índice
+    espacial pelos pontos visíveis: se couberem no limite de pontos são desenhados
+    como dispersão real; senão, como raster de densidade apenas da área visível.
+    """
+
+    def __init__(self, artists, x, y, values=None, threshold=200000, style=None):
+        self.artists = artists  # PlotArtists: main é substituído a cada redesenho
+        self.ax = artists.ax
+        self.index = SpatialIndex(x, y, values)
+        self.threshold = threshold
+        self.style = style or {}  # s, marker, color, cmap, norm, alpha
+        self.canvas = None
+        self._updating = False
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def attach(self, canvas):
+        """Liga o decimador ao canvas; o desenho inicial (artists.main) é substituído no primeiro zoom."""
+        self.canvas = canvas
+        self.ax.set_autoscale_on(False)  # Os limites passam a ser definidos só pelo usuário
+        self.callback_ids = [self.ax.callbacks.connect("xlim_changed", self.schedule),
+                             self.ax.callbacks.connect("ylim_changed", self.schedule)]
+
+    def detach(self):
+        """Desliga o decimador (figura redesenhada ou janela fechada)."""
+        self.timer.stop()
+        for callback_id in getattr(self, "callback_ids", []):
+            self.ax.callbacks.disconnect(callback_id)
+        self.canvas = None
+
+    def schedule(self, _ax=None):
+        if not self._updating:
+            self.timer.start()  # Reinicia a contagem: um único redesenho ao final da interação
+
+    def refresh(self):
+        if self.canvas is None:
+            return
+        xmin, xmax = sorted(self.ax.get_xlim())
+        ymin, ymax = sorted(self.ax.get_ylim())
+        x, y, values = self.index.query(xmin, xmax, ymin, ymax)
+
+        self._updating = True
+        try:
+            if self.artists.main is not None:
+                self.artists.main.remove()
+            self.artists.main = self.draw(x, y, values, (xmin, xmax, ymin, ymax))
+            colorbar = self.artists.colorbar
+            if colorbar is not None and self.artists.main.get_array() is not None:
+                colorbar.update_normal(self.artists.main)
+            self.ax.set_xlim(xmin, xmax)
+            self.ax.set_ylim(ymin, ymax)
+        finally:
+            self._updating = False
+        self.canvas.draw_idle()
+
+    def draw(self, x, y, values, extent):
+        style = self.style
+        if len(x) <= self.threshold:
+            # Poucos pontos visíveis: detalhe total
+            if values is not None:
+                return self.ax.scatter(x, y, s=style.get("s"), marker=style.get("marker"), c=values,
+                                       cmap=style.get("cmap"), norm=style.get("norm"), alpha=style.get("alpha"))
+            return self.ax.scatter(x, y, s=style.get("s"), marker=style.get("marker"), c=style.get("color"),
+                                   alpha=style.get("alpha"))
+        return draw_density(self.ax, x, y, values, cmap=style.get("cmap"), norm=style.get("norm"),
+                            color=style.get("color", "black"), alpha=style.get("alpha", 1.0), extent=extent)
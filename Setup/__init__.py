@@ -1,11 +1,28 @@
-from Setup.GuiSetup import UiSetup
-from Setup.Auxiliares import setup_file_browser
-from Setup.Auxiliares import resource_path
-from Setup.Auxiliares import setup_layers_tree
-from Setup.Auxiliares import open_existing_project
-from Setup.Auxiliares import update_file_browser_root
-from Setup.Auxiliares import set_default_layout
-from Setup.Auxiliares import show_context_menu
-from Setup.Auxiliares import setup_second_tree
-from Setup.Auxiliares import status_bar_message
-from Setup.AjusteDock import AjusteDock
\ No newline at end of file
+# Os submódulos são importados sob demanda (PEP 562): "import Setup.Lote" ou
+# "import Setup.Cache" não carregam a interface nem o matplotlib.
+_EXPORTS = {
+    "UiSetup": "Setup.GuiSetup",
+    "setup_file_browser": "Setup.Auxiliares",
+    "resource_path": "Setup.Auxiliares",
+    "setup_layers_tree": "Setup.Auxiliares",
+    "open_existing_project": "Setup.Auxiliares",
+    "update_file_browser_root": "Setup.Auxiliares",
+    "set_default_layout": "Setup.Auxiliares",
+    "show_context_menu": "Setup.Auxiliares",
+    "setup_second_tree": "Setup.Auxiliares",
+    "status_bar_message": "Setup.Auxiliares",
+    "AjusteDock": "Setup.AjusteDock",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'Setup' has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
@@ -18,7 +18,19 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()  # Worker processes of the plot renderer in frozen builds
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        # Headless batch plotting: python main.py batch lote.yaml (see Setup/Lote.py)
+        from Setup.Lote import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    from Setup.Inicializacao import preload_modules, show_splash
+
     app = QApplication(sys.argv)
+    splash = show_splash(app, UiSetup.__version__)
     window = MainWindow()
     window.show()
+    splash.finish(window)
+    preload_modules()  # pandas/matplotlib load in the background while the window is already usable
     sys.exit(app.exec_())
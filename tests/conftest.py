@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Os testes importam os módulos de Setup/ como o main.py (a partir da raiz do repositório)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def app():
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def pump(app, seconds=0.05):
+    from PyQt5.QtCore import QEventLoop
+
+    end = time.time() + seconds
+    while time.time() < end:
+        app.processEvents(QEventLoop.AllEvents, 50)
+        time.sleep(0.005)
+
+
+def load_table(app, window, path):
+    """Adiciona a camada e abre a tabela como pelo navegador de arquivos, esperando a leitura."""
+    from Setup.Auxiliares import add_layer_file, load_excel
+
+    add_layer_file(window.content, path)
+    load_excel(path, window.mdiArea, window.opened_subwindows)
+    while window.load_manager.workers:
+        pump(app, 0.01)
+
+
+@pytest.fixture
+def main_window(app, tmp_path, monkeypatch):
+    """Janela principal com o diretório de trabalho na pasta do teste (Graficos/ e Cache/ ficam lá)."""
+    monkeypatch.setattr(os, "getlogin", lambda: "teste")
+    monkeypatch.chdir(ROOT)  # Ui/ é lida da raiz
+    import main
+
+    window = main.MainWindow()
+    monkeypatch.chdir(tmp_path)
+    yield window
+    for subwindow in window.mdiArea.subWindowList():
+        subwindow.close()
+    pump(app)
+    window.deleteLater()
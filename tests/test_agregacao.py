@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup.Agregacao import QUANTILE_AGGREGATIONS, aggregate_bars, grouped_quantiles
+from Setup.Datasets import Dataset
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 2000
+    altura = rng.gamma(2.0, 5.0, n)
+    altura[::53] = np.nan
+    return pd.DataFrame({
+        "talhao": rng.choice(["T1", "T2", "T3", "T4"], n),
+        "idade": rng.integers(1, 6, n),
+        "altura": altura,
+        "especie": rng.choice(["euc", "pin"], n),
+    })
+
+
+def expected(df, by, funcao):
+    grouped = df.dropna(subset=["altura"]).groupby(by)["altura"]
+    if funcao == "média":
+        return grouped.mean()
+    return grouped.quantile(QUANTILE_AGGREGATIONS[funcao])
+
+
+@pytest.mark.parametrize("funcao", ["média", "mediana", "p05", "p25", "p75", "p95"])
+def test_categorical_x_matches_groupby(df, funcao):
+    bars, labels = aggregate_bars(Dataset("teste", df), "talhao", "altura", funcao=funcao)
+    result = pd.Series(bars.values[0], index=[labels[int(p)] for p in bars.positions])
+    pd.testing.assert_series_equal(result.sort_index(), expected(df, "talhao", funcao).sort_index(),
+                                   check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize("funcao", ["média", "mediana", "p95"])
+def test_numeric_x_matches_groupby(df, funcao):
+    bars, labels = aggregate_bars(Dataset("teste", df), "idade", "altura", funcao=funcao)
+    reference = expected(df, "idade", funcao)
+    assert labels is None
+    np.testing.assert_array_equal(bars.positions, reference.index.to_numpy())
+    np.testing.assert_allclose(bars.values[0], reference.to_numpy())
+
+
+@pytest.mark.parametrize("funcao", ["média", "p25"])
+def test_strata_match_groupby(df, funcao):
+    bars, labels = aggregate_bars(Dataset("teste", df), "talhao", "altura", "especie", funcao=funcao)
+    reference = expected(df, ["especie", "talhao"], funcao)
+    for row, especie in enumerate(bars.group_labels):
+        for position in bars.positions:
+            talhao = labels[int(position)]
+            assert bars.values[row, int(position)] == pytest.approx(reference[(especie, talhao)])
+
+
+def test_mean_error_is_standard_deviation(df):
+    bars, labels = aggregate_bars(Dataset("teste", df), "talhao", "altura", funcao="média")
+    std = df.groupby("talhao")["altura"].std()[[labels[int(p)] for p in bars.positions]].to_numpy()
+    np.testing.assert_allclose(bars.errors[0, 0], std)
+    np.testing.assert_allclose(bars.errors[0, 1], std)
+
+
+def test_grouped_quantiles_match_numpy():
+    rng = np.random.default_rng(5)
+    cells = rng.integers(0, 4, 500)
+    values = rng.normal(size=500)
+    quantiles = [0.05, 0.5, 0.9]
+
+    result = grouped_quantiles(cells, values, 5, quantiles)
+    for cell in range(4):
+        np.testing.assert_allclose(result[:, cell], np.quantile(values[cells == cell], quantiles))
+    assert np.isnan(result[:, 4]).all()  # Célula sem linhas
+
+
+@pytest.mark.parametrize("funcao", ["média", "desvio"])
+def test_std_with_large_offset(funcao):
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({"grupo": rng.choice(["a", "b"], 1000), "valor": 1e9 + rng.normal(0, 1, 1000)})
+    std = df.groupby("grupo")["valor"].std()
+
+    bars, labels = aggregate_bars(Dataset("teste", df), "grupo", "valor", funcao=funcao)
+    names = [labels[int(p)] for p in bars.positions]
+    result = bars.errors[0, 0] if funcao == "média" else bars.values[0]
+    np.testing.assert_allclose(result, std[names].to_numpy(), rtol=1e-6)
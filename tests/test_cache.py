@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup.Cache import ColumnCache, source_key
+
+
+def table(path, rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "dap": rng.normal(20, 4, rows),
+        "idade": rng.integers(1, 10, rows),
+        "viva": rng.random(rows) > 0.1,
+        "data": pd.date_range("2020-01-01", periods=rows, freq="h"),
+        "talhao": rng.choice(["A", "B", None], rows),
+    })
+    df.to_csv(path, index=False)  # O arquivo de origem só importa pelo caminho, tamanho e data
+    return df
+
+
+def is_memory_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ColumnCache(str(tmp_path / "Cache"))
+
+
+def test_round_trip(tmp_path, cache):
+    path = str(tmp_path / "inventario.csv")
+    df = table(path)
+    cache.put(path, df)
+
+    cached = cache.get(path)
+    assert list(cached.columns) == list(df.columns)
+    for name in ["dap", "idade", "viva", "data"]:
+        np.testing.assert_array_equal(cached[name].to_numpy(), df[name].to_numpy())
+    assert is_memory_mapped(cached["dap"].to_numpy())
+    assert cached["talhao"].isna().equals(df["talhao"].isna())
+    assert (cached["talhao"].dropna() == df["talhao"].dropna()).all()
+
+
+def test_sheets_are_separate_entries(tmp_path, cache):
+    path = str(tmp_path / "planilhas.xlsx")
+    df = table(path)
+    cache.put(path, df, sheet="A")
+    cache.put(path, df.head(10), sheet="B")
+
+    assert cache.get(path, "A").shape[0] == len(df)
+    assert cache.get(f"{path}::B").shape[0] == 10
+    assert cache.get(path) is None
+
+
+def test_modified_source_is_invalidated(tmp_path, cache):
+    path = str(tmp_path / "inventario.csv")
+    cache.put(path, table(path))
+    assert cache.contains(path)
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not cache.contains(path)
+    assert cache.get(path) is None
+
+
+def test_missing_source(tmp_path, cache):
+    assert cache.get(str(tmp_path / "nao_existe.csv")) is None
+    assert not cache.contains(str(tmp_path / "nao_existe.csv"))
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, cache):
+    paths = [str(tmp_path / f"t{i}.csv") for i in range(3)]
+    frames = [table(path, seed=i) for i, path in enumerate(paths)]
+    cache.put(paths[0], frames[0])
+    entry_size = sum(size for _, size, _ in cache.entries())
+    cache.max_bytes = int(entry_size * 2.5)  # Cabem duas entradas
+
+    cache.put(paths[1], frames[1])
+    assert cache.get(paths[0]) is not None  # t0 passa a ser a mais recente
+    cache.put(paths[2], frames[2])
+
+    assert cache.contains(paths[0])
+    assert not cache.contains(paths[1])
+    assert cache.contains(paths[2])
+    assert sorted(os.listdir(cache.root)) == sorted([source_key(paths[0]), source_key(paths[2])])
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+from Setup.Cache import ColumnCache
+from Setup.Carregamento import LoadCancelled, LoadWorker
+from Setup.Leitores import select_reader
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / "dados.csv")
+    rng = np.random.default_rng(0)
+    pd.DataFrame({"talhao": rng.choice(["A", "B"], 500), "dap": rng.normal(20, 4, 500),
+                  "idade": rng.integers(1, 9, 500)}).to_csv(path, index=False)
+    return path
+
+
+def run_worker(worker):
+    events = {}
+    worker.signals.finished.connect(lambda path, df, stats: events.setdefault("finished", (df, stats)))
+    worker.signals.failed.connect(lambda path, message: events.setdefault("failed", message))
+    worker.signals.cancelled.connect(lambda path: events.setdefault("cancelled", path))
+    worker.run()  # Na mesma thread os sinais chamam os slots diretamente
+    return events
+
+
+def test_read_with_reader_and_stats(csv_path):
+    worker = LoadWorker(csv_path, reader=select_reader(csv_path))
+    df, stats = run_worker(worker)["finished"]
+
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_path))
+    assert stats.rows == 500
+    assert stats.mean(1) == pytest.approx(df["dap"].mean())
+
+
+def test_second_read_comes_from_the_cache(csv_path, tmp_path):
+    cache = ColumnCache(str(tmp_path / "Cache"))
+    first = run_worker(LoadWorker(csv_path, cache, select_reader(csv_path)))["finished"][0]
+    assert cache.contains(csv_path)
+
+    class NoReader:
+        def read(self, *args):
+            raise AssertionError("the cached table must not be read again")
+
+    second, stats = run_worker(LoadWorker(csv_path, cache, NoReader()))["finished"]
+    assert list(second.columns) == list(first.columns)
+    for name in first.columns:
+        assert list(second[name]) == list(first[name])  # Numeric columns come back memory-mapped
+    assert stats.rows == 500
+
+
+def test_cancelled_before_reading(csv_path):
+    worker = LoadWorker(csv_path, reader=select_reader(csv_path))
+    worker.cancel()
+    assert worker.is_cancelled()
+    with pytest.raises(LoadCancelled):
+        worker.check_cancelled()
+    assert run_worker(worker) == {"cancelled": csv_path}
+
+
+def test_read_error_is_reported(tmp_path):
+    path = str(tmp_path / "nao_existe.csv")
+    events = run_worker(LoadWorker(path, reader=select_reader(path)))
+    assert list(events) == ["failed"]
+
+
+# Leitura em blocos (StreamingLoadWorker + ColumnBuffers) ----------------------
+
+from Setup.Carregamento import ColumnBuffers, StreamingLoadWorker, common_dtype
+from Setup.LeitorXlsx import iter_xlsx_chunks
+
+
+@pytest.fixture
+def xlsx_path(tmp_path):
+    pytest.importorskip("openpyxl")
+    rows = 60
+    altura = np.linspace(1, 30, rows)
+    altura[[3, 20, 41]] = np.nan
+    tardia = [None] * 25 + [f"obs {i}" for i in range(rows - 25)]  # Vazia nos primeiros blocos
+    mista = list(range(30)) + [f"x{i}" for i in range(rows - 30)]  # Números e depois texto
+    df = pd.DataFrame({"id": np.arange(rows), "altura": altura, "talhao": [f"T{i % 4}" for i in range(rows)],
+                       "data": pd.date_range("2024-01-01", periods=rows, freq="D"), "tardia": tardia,
+                       "mista": mista})
+    path = str(tmp_path / "inventario.xlsx")
+    df.to_excel(path, index=False)
+    return path
+
+
+def assert_same_values(df, expected):
+    assert list(df.columns) == list(expected.columns)
+    assert df.shape == expected.shape
+    for name in expected.columns:
+        left, right = df[name], expected[name]
+        assert left.isna().tolist() == right.isna().tolist(), name
+        assert left.dropna().tolist() == right.dropna().tolist(), name
+
+
+@pytest.mark.parametrize("chunk_size", [7, 25, 1000])
+def test_streaming_read_matches_read_excel(xlsx_path, chunk_size):
+    df = StreamingLoadWorker(xlsx_path, chunk_size=chunk_size).read()
+    expected = pd.read_excel(xlsx_path)
+
+    assert_same_values(df, expected)
+    for name in ("id", "altura", "data"):
+        assert df[name].dtype == expected[name].dtype, name
+
+
+def test_buffers_grow_without_the_row_count(xlsx_path):
+    chunks = list(iter_xlsx_chunks(xlsx_path, 9))
+    buffers = ColumnBuffers(list(chunks[0].columns))  # Sem <dimension>: capacidade desconhecida
+    for chunk in chunks:
+        buffers.append(chunk)
+
+    assert_same_values(buffers.frame(), pd.read_excel(xlsx_path))
+
+
+def test_empty_buffers():
+    df = ColumnBuffers(["a", "b"], 100).frame()
+    assert list(df.columns) == ["a", "b"] and df.empty
+
+
+@pytest.mark.parametrize("current, incoming", [
+    ("int64", "int64"), ("int64", "float64"), ("int32", "int64"), ("float32", "int64"),
+    ("int64", "object"), ("datetime64[ns]", "datetime64[us]"), ("datetime64[ns]", "float64"), ("bool", "int64"),
+])
+def test_common_dtype_matches_concat(current, incoming):
+    left = pd.Series(np.zeros(2).astype(current))
+    right = pd.Series(np.zeros(2).astype(incoming))
+    expected = pd.concat([left, right]).dtype
+    dtype = common_dtype(np.dtype(current), np.dtype(incoming))
+    assert dtype == expected or (dtype == object and expected == object)
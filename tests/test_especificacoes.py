@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from Setup.Datasets import Dataset
+from Setup.Especificacoes import load_spec, safe_file_name, save_spec, source_changed
+from Setup.Plotagem import complete_spec
+
+
+@pytest.fixture
+def project(tmp_path):
+    folder = tmp_path / "projeto"
+    folder.mkdir()
+    data_path = folder / "dados.csv"
+    data_path.write_text("x,y\n1,2\n3,4\n", encoding="utf-8")
+    dataset = Dataset(str(data_path), pd.read_csv(data_path))
+    spec = complete_spec({"tipo": "dispersao", "arquivo": "dados.csv", "x": "x", "y": "y",
+                          "rotulos": {"titulo": "Altura"}})
+    return folder, dataset, spec
+
+
+def test_round_trip(project):
+    folder, dataset, spec = project
+    path = save_spec(spec, dataset, "Altura: x/y", str(folder))
+
+    assert os.path.dirname(path) == str(folder / "Graficos")
+    assert os.path.basename(path) == "Altura_ x_y.json"
+    assert not [name for name in os.listdir(folder / "Graficos") if name.endswith(".tmp")]
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["dataset"]["id"] == "dados.csv"  # Relativo ao projeto
+
+    document = load_spec(path)
+    assert document["titulo"] == "Altura: x/y"
+    assert document["spec"] == spec
+    assert document["dataset"]["id"] == dataset.key.replace("\\", "/")
+    assert document["dataset"]["linhas"] == 2
+    assert not source_changed(document)
+
+
+def test_moved_project_resolves_dataset(project, tmp_path):
+    folder, dataset, spec = project
+    save_spec(spec, dataset, "Altura", str(folder))
+    moved = tmp_path / "movido"
+    shutil.move(str(folder), str(moved))
+
+    document = load_spec(str(moved / "Graficos" / "Altura.json"))
+    assert document["dataset"]["id"] == str(moved / "dados.csv").replace("\\", "/")
+    assert not source_changed(document)  # A versão do arquivo não depende do caminho
+
+
+def test_source_changed_after_edit(project):
+    folder, dataset, spec = project
+    document = load_spec(save_spec(spec, dataset, "Altura", str(folder)))
+
+    with open(dataset.key, "a", encoding="utf-8") as f:
+        f.write("5,6\n")
+    assert source_changed(document)
+
+    os.remove(dataset.key)
+    assert source_changed(document)
+
+
+def test_rejects_other_documents(tmp_path):
+    path = tmp_path / "outro.json"
+    path.write_text(json.dumps({"formato": "outro"}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_spec(str(path))
+
+    path.write_text(json.dumps({"formato": "arandu-grafico", "versao": 99}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_spec(str(path))
+
+
+def test_safe_file_name():
+    assert safe_file_name('a<b>:"c"?') == "a_b___c__"
+    assert safe_file_name(" . ") == "grafico"
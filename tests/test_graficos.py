@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import load_table, pump
+
+
+@pytest.fixture
+def dock(app, main_window, tmp_path):
+    """Janela principal com dados.csv e dados2.csv carregados e o dock de gráficos aberto."""
+    from Setup.GraficosDock import open_graficos_dock
+
+    rng = np.random.default_rng(1)
+    for name in ("dados.csv", "dados2.csv"):
+        path = str(tmp_path / name).replace("\\", "/")
+        pd.DataFrame({"dap": rng.normal(20, 4, 200), "ht": rng.normal(15, 2, 200),
+                      "idade": rng.integers(1, 6, 200)}).to_csv(path, index=False)
+        load_table(app, main_window, path)
+    pump(app)
+
+    open_graficos_dock(main_window, main_window.content, main_window.mdiArea)
+    return main_window.graficos_dock
+
+
+def scatter(dock, file_name, x, y):
+    dock.combo_box.setCurrentText(file_name)
+    dock.populate_table_columns()
+    dock.var_x.setCurrentText(x)
+    dock.var_y.setCurrentText(y)
+    return dock.plot_graph("dispersao")
+
+
+def test_other_columns_open_a_new_window(dock):
+    first = scatter(dock, "dados.csv", "dap", "ht")
+    second = scatter(dock, "dados.csv", "idade", "ht")
+
+    assert second is not first
+    assert (first.spec["x"], second.spec["x"]) == ("dap", "idade")
+    assert first.windowTitle() != second.windowTitle()
+    assert first.spec_path != second.spec_path
+    assert len(os.listdir("Graficos")) == 2
+
+
+def test_other_file_opens_a_new_window(dock):
+    first = scatter(dock, "dados.csv", "dap", "ht")
+    second = scatter(dock, "dados2.csv", "dap", "ht")
+
+    assert second is not first
+    assert first.spec["arquivo"] == "dados.csv"
+    assert second.spec["arquivo"] == "dados2.csv"
+    assert dock.layers.plot_item(second).parent().text() == "dados2.csv"
+    assert dock.layers.plot_item(first).parent().text() == "dados.csv"
+    assert first.spec_path != second.spec_path
+
+
+def test_same_data_is_restyled_in_place(dock):
+    first = scatter(dock, "dados.csv", "dap", "ht")
+    dock.alpha.setValue(0.3)
+    second = scatter(dock, "dados.csv", "dap", "ht")
+
+    assert second is first
+    assert first.spec["estilo"]["alpha"] == pytest.approx(0.3)
+
+
+def test_typed_title_updates_the_plot_once(app, dock, monkeypatch):
+    window = scatter(dock, "dados.csv", "dap", "ht")
+    dock.atualizar_ativo.setChecked(True)
+    dock.mdi_area.setActiveSubWindow(window)
+    renames = []
+    monkeypatch.setattr(dock.layers, "rename_plot", renames.append)
+
+    for size in range(1, 11):
+        dock.title.setText("Altura"[:size] + "x" * max(0, size - 6))
+    assert renames == []
+    pump(app, 0.6)
+
+    assert renames == [window]
+    assert window.spec["rotulos"]["titulo"] == "Alturaxxxx"
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup.Datasets import Dataset
+from Setup.Histograma import HistogramAccumulator, bin_edges, dataset_histogram
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(7)
+    n = 5000
+    x = rng.normal(10, 3, n)
+    x[::97] = np.nan
+    df = pd.DataFrame({"x": x, "peso": rng.uniform(0, 2, n), "grupo": rng.choice(["a", "b", "c"], n)})
+    return Dataset("teste", df)
+
+
+def valid_x(dataset):
+    x = dataset.numeric("x")
+    return x[~np.isnan(x)]
+
+
+@pytest.mark.parametrize("strategy", [10, 25, "sturges"])
+def test_edges_and_counts_match_numpy(dataset, strategy):
+    x = valid_x(dataset)
+    counts, edges = np.histogram(x, bins=strategy)
+
+    hist = dataset_histogram(dataset, "x", strategy=strategy)
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts[0], counts)
+
+
+def test_counts_by_chunks_match_single_pass(dataset):
+    whole = dataset_histogram(dataset, "x", strategy=20)
+    chunked = dataset_histogram(dataset, "x", strategy=20, chunk_rows=333)
+    np.testing.assert_allclose(chunked.edges, whole.edges)
+    np.testing.assert_array_equal(chunked.counts, whole.counts)
+
+
+def test_weighted_counts_match_numpy(dataset):
+    x, weights = dataset.numeric("x"), dataset.numeric("peso")
+    valid = ~np.isnan(x)
+    counts, edges = np.histogram(x[valid], bins=15, weights=weights[valid])
+
+    hist = dataset_histogram(dataset, "x", "peso", strategy=15, chunk_rows=1000)
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_allclose(hist.counts[0], counts)
+
+
+def test_value_range_ignores_values_outside(dataset):
+    x = valid_x(dataset)
+    counts, edges = np.histogram(x, bins=8, range=(5, 15))
+
+    hist = dataset_histogram(dataset, "x", strategy=8, value_range=(5, 15))
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts[0], counts)
+
+
+def test_groups_match_numpy_per_group(dataset):
+    hist = dataset_histogram(dataset, "x", group_name="grupo", strategy=12)
+    x, groups = dataset.numeric("x"), dataset.series("grupo").to_numpy()
+
+    assert sorted(hist.labels) == ["a", "b", "c"]
+    for row, label in enumerate(hist.labels):
+        values = x[(groups == label) & ~np.isnan(x)]
+        counts, _ = np.histogram(values, bins=hist.edges)
+        np.testing.assert_array_equal(hist.counts[row], counts)
+
+
+def test_empty_column_has_no_histogram():
+    dataset = Dataset("vazio", pd.DataFrame({"x": np.full(10, np.nan)}))
+    assert bin_edges(dataset, "x") is None
+    assert dataset_histogram(dataset, "x") is None
+
+
+def test_accumulator_with_empty_block():
+    accumulator = HistogramAccumulator(np.linspace(0, 1, 5))
+    accumulator.update(np.array([]))
+    accumulator.update(np.array([]), weights=np.array([]))
+    np.testing.assert_array_equal(accumulator.result().counts, np.zeros((1, 4)))
+
+
+def test_constant_column_matches_numpy():
+    values = np.full(50, 3.0)
+    counts, edges = np.histogram(values, bins=10)
+
+    hist = dataset_histogram(Dataset("constante", pd.DataFrame({"x": values})), "x")
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts[0], counts)
@@ -0,0 +1,66 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Setup.Importacao import import_sources, ingest_table, report_lines
+from Setup.Leitores import sheet_source
+
+
+def write_csv(path, rows=3):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame({"a": range(rows), "b": "x"}).to_csv(path, index=False)
+    return path.replace("\\", "/")
+
+
+@pytest.fixture
+def folder(tmp_path):
+    pytest.importorskip("openpyxl")
+    root = str(tmp_path / "dados").replace("\\", "/")
+    files = {
+        "a": write_csv(f"{root}/a.csv"),
+        "b": write_csv(f"{root}/sub/b.csv"),
+        "oculto": write_csv(f"{root}/.oculta/c.csv"),
+    }
+    with open(f"{root}/notas.txt", "w", encoding="utf-8") as f:
+        f.write("sem leitor")
+    with pd.ExcelWriter(f"{root}/plan.xlsx", engine="openpyxl") as writer:
+        pd.DataFrame({"x": [1, 2]}).to_excel(writer, sheet_name="Um", index=False)
+        pd.DataFrame({"y": [3.5]}).to_excel(writer, sheet_name="Dois", index=False)
+    with pd.ExcelWriter(f"{root}/unica.xlsx", engine="openpyxl") as writer:
+        pd.DataFrame({"z": [1]}).to_excel(writer, sheet_name="Só", index=False)
+    return root, files
+
+
+def test_import_sources_walks_folders(folder):
+    root, files = folder
+    assert import_sources([root]) == [files["a"], sheet_source(f"{root}/plan.xlsx", "Um"),
+                                      sheet_source(f"{root}/plan.xlsx", "Dois"), f"{root}/unica.xlsx",
+                                      files["b"]]  # Arquivos da pasta antes das subpastas; .oculta ignorada
+
+
+def test_import_sources_skips_repeats_and_unsupported(folder):
+    root, files = folder
+    sources = import_sources([files["a"], f"{root}/notas.txt", f"{root}/sub", files["b"]])
+    assert sources == [files["a"], files["b"]]
+
+
+def test_ingest_table_writes_the_column_cache(folder, tmp_path):
+    root, files = folder
+    project = str(tmp_path / "projeto")
+
+    summary = ingest_table(files["a"], project)
+    assert (summary["linhas"], summary["colunas"], summary["cache"]) == (3, ["a", "b"], False)
+    assert ingest_table(files["a"], project)["cache"]
+
+    sheet = ingest_table(sheet_source(f"{root}/plan.xlsx", "Dois"), project)
+    assert (sheet["linhas"], sheet["colunas"]) == (1, ["y"])
+
+
+def test_report_lines():
+    results = {"/dados/a.csv": ({"linhas": 3, "colunas": ["a", "b"], "tempo": 0.5, "cache": True}, None),
+               sheet_source("/dados/plan.xlsx", "Um"): (None, "arquivo corrompido")}
+    header, first, second = report_lines(results)
+    assert header.split() == ["Tabela", "linhas", "colunas", "tempo"]
+    assert first.split() == ["a.csv", "3", "2", "0.50", "(cache)"]
+    assert second.startswith("plan.xlsx [Um]") and second.endswith("ERRO: arquivo corrompido")
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup import IndiceArquivos
+from Setup.IndiceArquivos import (MetadataIndex, column_number, csv_table, describe_metadata, dimension_text,
+                                  file_metadata, file_signature, summary_text, workbook_sheets, xlsx_sheets)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "inventario.xlsx"
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame({"a": range(10), "b": 1.5, "c": "x"}).to_excel(writer, sheet_name="Parcelas", index=False)
+        pd.DataFrame(np.zeros((3, 30))).to_excel(writer, sheet_name="Larga", index=False)
+        writer.book.create_sheet("Vazia")
+    return str(path)
+
+
+def test_column_number():
+    assert [column_number(letters) for letters in ("A", "Z", "AA", "AD", "ZZ")] == [1, 26, 27, 30, 702]
+
+
+def test_xlsx_sheets_match_pandas(workbook):
+    sheets = xlsx_sheets(workbook)
+    assert [sheet["nome"] for sheet in sheets] == ["Parcelas", "Larga", "Vazia"]
+    for sheet in sheets[:2]:
+        df = pd.read_excel(workbook, sheet_name=sheet["nome"])
+        assert (sheet["linhas"], sheet["colunas"]) == df.shape
+    assert sheets[2]["linhas"] == 0  # openpyxl grava <dimension ref="A1:A1"> em planilhas vazias
+
+    assert workbook_sheets(workbook) == sheets
+    assert summary_text(file_metadata(workbook)) == "3 planilhas"
+
+
+@pytest.mark.parametrize("text", ["a,b,c\n1,2,3\n4,5,6\n", "a,b,c\n1,2,3\n4,5,6", "a,b,c\n"])
+def test_csv_table(tmp_path, text):
+    path = tmp_path / "dados.csv"
+    path.write_text(text, encoding="utf-8")
+    expected = pd.read_csv(path).shape
+    assert csv_table(str(path)) == {"nome": None, "linhas": expected[0], "colunas": expected[1]}
+
+
+def test_large_csv_rows_are_estimated(tmp_path, monkeypatch):
+    path = tmp_path / "dados.tsv"
+    path.write_text("a\tb\n" + "10\t20\n" * 5000, encoding="utf-8")
+    monkeypatch.setattr(IndiceArquivos, "CSV_SCAN_BYTES", 1000)
+    monkeypatch.setattr(IndiceArquivos, "CSV_SAMPLE_BYTES", 600)
+
+    table = csv_table(str(path))
+    assert table["estimado"] and table["colunas"] == 2
+    assert table["linhas"] == pytest.approx(5000, rel=0.01)
+    assert dimension_text(table).startswith("~")
+
+
+def test_file_metadata_keeps_errors(tmp_path):
+    path = tmp_path / "quebrado.xlsx"
+    path.write_bytes(b"nao e um zip")
+    metadata = file_metadata(str(path))
+    assert metadata["tabelas"] == [] and "erro" in metadata
+    assert (metadata["tamanho"], metadata["mtime"]) == file_signature(str(path))
+    assert "Erro ao ler metadados" in describe_metadata(metadata)
+
+
+def test_index_ignores_changed_files(tmp_path):
+    path = tmp_path / "dados.csv"
+    path.write_text("a\n1\n", encoding="utf-8")
+    index = MetadataIndex(str(tmp_path))
+    index.put(str(path), file_metadata(str(path)))
+    index.save()
+
+    reopened = MetadataIndex(str(tmp_path))
+    assert reopened.get(str(path), file_signature(str(path)))["tabelas"][0]["linhas"] == 1
+    path.write_text("a\n1\n2\n", encoding="utf-8")
+    assert reopened.get(str(path), file_signature(str(path))) is None
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Setup import Inicializacao
+from Setup.Inicializacao import HEAVY_MODULES, check_budget, parse_importtime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |       3100 |   PyQt5.QtCore
+import time:      1800 |      48000 | main
+Traceback line without the prefix
+"""
+
+
+def test_parse_importtime():
+    assert parse_importtime(IMPORTTIME) == [("_io", 0.00012, 0.00012), ("PyQt5.QtCore", 0.0025, 0.0031),
+                                            ("main", 0.0018, 0.048)]
+
+
+@pytest.mark.parametrize("modules, ok", [
+    ([("main", 0.1, 0.3), ("PyQt5.QtCore", 0.2, 0.2)], True),
+    ([("main", 0.4, 0.7), ("PyQt5.QtCore", 0.3, 0.3)], False),  # Fora do orçamento
+    ([("main", 0.1, 0.3), ("pandas.core", 0.1, 0.1)], False),  # Módulo pesado na abertura
+])
+def test_check_budget(monkeypatch, capsys, modules, ok):
+    monkeypatch.setattr(Inicializacao, "measure_imports", lambda project_folder=None: (
+        sum(self_time for _, self_time, _ in modules), modules))
+    assert check_budget(0.5) is ok
+    assert ("Dentro do orçamento." in capsys.readouterr().out) is ok
+
+
+def test_main_does_not_import_heavy_modules():
+    script = "import sys, main; print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert not set(result.stdout.split()) & set(HEAVY_MODULES)
@@ -0,0 +1,65 @@
+import pytest
+
+from Setup import Leitores
+from Setup.Leitores import (Reader, available_readers, is_supported, select_reader, sheet_source, source_label,
+                            split_source)
+
+
+@pytest.fixture
+def readers(monkeypatch):
+    """Registro isolado com leitores falsos para a extensão .tab."""
+    monkeypatch.setattr(Leitores, "READERS", {})
+    read = lambda file_path, sheet=None: None
+    Leitores.register_reader(Reader("ausente", (".tab",), read, modules=("modulo_que_nao_existe",)))
+    Leitores.register_reader(Reader("rapido", (".tab",), read))
+    Leitores.register_reader(Reader("blocos", (".tab",), read, streaming=True))
+    Leitores.register_reader(Reader("lento", (".tab",), read))
+
+
+def names(readers):
+    return [reader.name for reader in readers]
+
+
+def test_first_available_reader_is_the_default(readers):
+    assert names(available_readers("dados.tab")) == ["rapido", "blocos", "lento"]
+    assert select_reader("dados.tab").name == "rapido"
+
+
+def test_benchmark_winner_is_preferred(readers):
+    assert select_reader("dados.tab", {".tab": "lento"}).name == "lento"
+    assert select_reader("dados.tab", {".tab": "ausente"}).name == "rapido"  # Vencedor não instalado
+
+
+def test_large_files_stream_in_the_interface(readers, tmp_path, monkeypatch):
+    path = tmp_path / "grande.tab"
+    path.write_bytes(b"x" * 100)
+    monkeypatch.setattr(Leitores, "STREAMING_MIN_BYTES", 50)
+
+    assert select_reader(str(path), {".tab": "lento"}, streaming=True).name == "blocos"
+    assert select_reader(str(path), {".tab": "lento"}).name == "lento"  # Processos e lote não usam blocos
+
+    monkeypatch.setattr(Leitores, "STREAMING_MIN_BYTES", 200)
+    assert select_reader(str(path), streaming=True).name == "rapido"
+
+
+def test_unsupported_format(readers):
+    assert not is_supported("dados.xyz")
+    with pytest.raises(ValueError):
+        select_reader("dados.xyz")
+
+
+def test_sheet_sources():
+    source = sheet_source("/dados/inventario.xlsx", "Plan 1")
+    assert split_source(source) == ("/dados/inventario.xlsx", "Plan 1")
+    assert source_label(source) == "inventario.xlsx [Plan 1]"
+    assert split_source("/dados/inventario.xlsx") == ("/dados/inventario.xlsx", None)
+    assert split_source("/dados/tabela.csv::x") == ("/dados/tabela.csv::x", None)  # Só pastas de trabalho
+
+
+def test_registered_formats():
+    assert is_supported("dados.csv")
+    assert select_reader("dados.csv").cacheable
+    if is_supported("dados.parquet"):
+        assert not select_reader("dados.parquet").cacheable  # Já é lido com memory-map
+    if "openpyxl" in names(available_readers("dados.xlsx")):
+        assert select_reader("dados.xlsx", streaming=False).name in names(available_readers("dados.xlsx"))
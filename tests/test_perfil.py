@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup.Perfil import QUANTILES, StreamingStats, describe_profile, profile_column, profile_dataframe
+
+
+def chunked_stats(df, chunk_rows):
+    stats = StreamingStats(df.columns)
+    for start in range(0, df.shape[0], chunk_rows):
+        stats.update(df.iloc[start:start + chunk_rows])
+    return stats
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 97, 10000])
+def test_streaming_stats_match_pandas(chunk_rows):
+    rng = np.random.default_rng(2)
+    values = rng.normal(50, 10, 3000)
+    values[::17] = np.nan
+    df = pd.DataFrame({"x": values, "n": rng.integers(0, 9, 3000), "texto": ["a"] * 3000})
+
+    stats = chunked_stats(df, chunk_rows)
+    assert stats.rows == 3000
+    assert list(stats.nulls) == [int(df["x"].isna().sum()), 0, 0]
+    for col, name in enumerate(["x", "n"]):
+        assert stats.mean(col) == pytest.approx(df[name].mean())
+        assert stats.std(col) == pytest.approx(df[name].std())
+        assert stats.minimum[col] == df[name].min()
+        assert stats.maximum[col] == df[name].max()
+    assert stats.numeric_count[2] == 0 and np.isnan(stats.std(2))
+
+
+def test_streaming_std_with_large_offset():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({"x": 1e9 + rng.normal(0, 1, 5000)})
+
+    stats = chunked_stats(df, 333)
+    assert stats.std(0) == pytest.approx(df["x"].std(), rel=1e-6)
+    assert stats.mean(0) == pytest.approx(df["x"].mean(), rel=1e-12)
+
+
+def test_profile_numeric_column():
+    values = pd.Series([4.0, np.nan, 1.0, 9.0, 4.0, 2.5])
+    profile = profile_column(values)
+
+    assert profile["kind"] == "numeric"
+    assert (profile["count"], profile["nulls"], profile["distinct"]) == (5, 1, 4)
+    assert (profile["min"], profile["max"]) == (1.0, 9.0)
+    expected = np.quantile([4.0, 1.0, 9.0, 4.0, 2.5], QUANTILES)
+    assert list(profile["quantiles"]) == list(QUANTILES)
+    assert list(profile["quantiles"].values()) == pytest.approx(expected)
+    assert "Mediana: 4" in describe_profile(profile)
+
+
+def test_profile_other_kinds():
+    categorical = profile_column(pd.Series(["a", "b", None, "a"]))
+    assert (categorical["kind"], categorical["distinct"], categorical["nulls"]) == ("categorical", 2, 1)
+    assert categorical["min"] is None and categorical["quantiles"] == {}
+
+    dates = profile_column(pd.Series(pd.to_datetime(["2024-03-01", None, "2023-01-15"])))
+    assert dates["kind"] == "datetime"
+    assert (dates["min"], dates["max"]) == ("2023-01-15 00:00:00", "2024-03-01 00:00:00")
+
+    assert profile_column(pd.Series([True, False, True]))["kind"] == "bool"
+
+
+def test_profile_all_null_column():
+    profile = profile_column(pd.Series([np.nan, np.nan]))
+    assert (profile["count"], profile["nulls"], profile["distinct"]) == (0, 2, 0)
+    assert profile["min"] is None and profile["quantiles"] == {}
+    assert "Mín." not in describe_profile(profile)
+
+
+def test_profile_dataframe_keys_by_column_name():
+    profiles = profile_dataframe(pd.DataFrame({"x": [1, 2], "y": ["a", "b"]}))
+    assert list(profiles) == ["x", "y"]
+    assert profiles["y"]["kind"] == "categorical"
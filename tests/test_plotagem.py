@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import colors
+from matplotlib.figure import Figure
+
+from Setup.Datasets import Dataset
+from Setup.Plotagem import complete_spec, data_signature, draw_plot, prepare_data, update_style
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"x": rng.normal(size=200), "y": rng.normal(size=200),
+                       "grupo": rng.choice(["a", "b"], 200), "idade": rng.integers(1, 5, 200)})
+    return Dataset("dados.csv", df)
+
+
+def drawn(dataset, **fields):
+    spec = complete_spec({"arquivo": "dados.csv", **fields})
+    data = prepare_data(dataset, spec)
+    fig = Figure()
+    return spec, data, draw_plot(fig, spec, data)
+
+
+def restyled(spec, **style):
+    return {**spec, "estilo": {**spec["estilo"], **style}}
+
+
+def test_scatter_style_changes_apply_in_place(dataset):
+    spec, data, artists = drawn(dataset, tipo="dispersao", x="x", y="y")
+    new_spec = restyled(spec, tamanho=40, cor="red", alpha=0.3)
+    new_spec["rotulos"] = {**spec["rotulos"], "titulo": "Altura"}
+
+    assert update_style(artists, spec, new_spec, data)
+    assert list(artists.main.get_sizes()) == [40]
+    assert colors.to_hex(artists.main.get_facecolor()[0]) == "#ff0000"
+    assert artists.main.get_alpha() == 0.3
+    assert artists.ax.get_title() == "Altura"
+
+
+def test_stratified_scatter_updates_color_mapping(dataset):
+    spec, data, artists = drawn(dataset, tipo="dispersao", x="x", y="y", estrat="idade", estratificacao=True)
+
+    assert update_style(artists, spec, restyled(spec, colormap="plasma", cor_min=0, cor_max=10), data)
+    assert artists.main.get_cmap().name == "plasma"
+    assert artists.main.get_clim() == (0, 10)
+
+
+def test_bar_edges_apply_in_place(dataset):
+    spec, data, artists = drawn(dataset, tipo="barras", x="grupo", y="x")
+
+    assert update_style(artists, spec, restyled(spec, borda="red", hachura="//"), data)
+    assert all(colors.to_hex(patch.get_edgecolor()) == "#ff0000" for patch in artists.main)
+    assert all(patch.get_hatch() == "//" for patch in artists.main)
+
+
+def test_changes_that_need_a_redraw(dataset):
+    spec, data, artists = drawn(dataset, tipo="dispersao", x="x", y="y")
+
+    assert not update_style(artists, spec, {**spec, "y": "idade"}, data)
+    assert not update_style(artists, spec, {**spec, "limite_pontos": 10}, data)
+
+    spec, data, artists = drawn(dataset, tipo="histograma", x="x")
+    assert not update_style(artists, spec, restyled(spec, orientacao="horizontal"), data)
+    assert not update_style(artists, spec, restyled(spec, bins_personalizados=True), data)
+
+
+def test_data_signature_includes_aggregation_fields():
+    spec = complete_spec({"tipo": "barras", "arquivo": "dados.csv", "x": "grupo", "y": "x"})
+    assert data_signature(spec) == data_signature(restyled(spec, cor="red"))
+    assert data_signature(spec) != data_signature(restyled(spec, agregacao="média"))
+    assert data_signature(spec) != data_signature({**spec, "arquivo": "outro.csv"})
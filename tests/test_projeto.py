@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import load_table, pump
+
+
+def test_stored_and_resolved_paths(tmp_path):
+    from Setup.Projeto import resolve_path, stored_path
+
+    project = str(tmp_path / "projeto")
+    inside = os.path.join(project, "dados", "a.csv")
+    outside = str(tmp_path / "fora.csv")
+
+    assert stored_path(inside, project) == "dados/a.csv"
+    assert stored_path(outside, project) == outside  # Fora do projeto continua absoluto
+    assert stored_path(None, project) is None
+    assert resolve_path("dados/a.csv", project) == inside.replace("\\", "/")
+    assert resolve_path(outside, project) == outside
+    assert resolve_path(None, project) is None
+
+
+def test_read_project_rejects_other_files(tmp_path):
+    from Setup.Projeto import PROJECT_FILE, read_project
+
+    (tmp_path / PROJECT_FILE).write_text(json.dumps({"formato": "outro"}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_project(str(tmp_path))
+
+
+@pytest.fixture
+def project(app, main_window, tmp_path):
+    """Projeto com dados.csv carregado e um gráfico de dispersão aberto."""
+    from PyQt5.QtCore import QThreadPool
+    from Setup.GraficosDock import open_graficos_dock
+
+    folder = tmp_path / "projeto"
+    folder.mkdir()
+    main_window.project_folder = str(folder)
+    path = str(folder / "dados.csv").replace("\\", "/")
+    rng = np.random.default_rng(7)
+    pd.DataFrame({"dap": rng.normal(20, 4, 100), "ht": rng.normal(15, 2, 100)}).to_csv(path, index=False)
+    load_table(app, main_window, path)
+
+    open_graficos_dock(main_window, main_window.content, main_window.mdiArea)
+    dock = main_window.graficos_dock
+    dock.combo_box.setCurrentText("dados.csv")
+    dock.populate_table_columns()
+    dock.var_x.setCurrentText("dap")
+    dock.var_y.setCurrentText("ht")
+    dock.plot_graph("dispersao")
+    pump(app)
+    yield main_window, folder, path
+    QThreadPool.globalInstance().waitForDone()
+
+
+def test_manifest_paths_are_relative(app, project):
+    from PyQt5.QtCore import QThreadPool
+    from Setup.Cache import ColumnCache, cache_root
+    from Setup.Projeto import has_unsaved_changes, read_project, save_project
+
+    main_window, folder, path = project
+    assert has_unsaved_changes(main_window)
+    save_project(main_window)
+    assert not has_unsaved_changes(main_window)
+    QThreadPool.globalInstance().waitForDone()  # O cache é gravado em segundo plano
+
+    layer, = read_project(str(folder))["camadas"]
+    assert layer["caminho"] == "dados.csv"
+    assert (layer["linhas"], layer["colunas"]) == (100, ["dap", "ht"])
+    plot, = layer["graficos"]
+    assert plot["spec"].startswith("Graficos/") and os.path.exists(folder / plot["spec"])
+    assert plot["miniatura"].startswith("Cache/Graficos/") and os.path.exists(folder / plot["miniatura"])
+    assert ColumnCache(cache_root(str(folder))).contains(path)
+
+
+def test_moved_project_reopens(app, project, tmp_path):
+    from PyQt5.QtCore import QThreadPool, Qt
+    from Setup.Camadas import SPEC_PATH_ROLE, THUMBNAIL_ROLE, get_layer_registry
+    from Setup.Projeto import clear_project, open_project, save_project
+
+    main_window, folder, path = project
+    save_project(main_window)
+    QThreadPool.globalInstance().waitForDone()
+    clear_project(main_window)
+    pump(app)
+    moved = tmp_path / "movido"
+    shutil.move(str(folder), str(moved))
+
+    assert open_project(main_window, str(moved)) == 1
+    registry = get_layer_registry(main_window)
+    moved_path = str(moved / "dados.csv").replace("\\", "/")
+    assert list(registry.layers) == [moved_path]
+    layer = registry.layers[moved_path]
+    assert layer.dataset is None  # Nenhuma tabela é lida ao abrir
+    assert layer.item.data(Qt.ToolTipRole) == "100 linhas × 2 colunas"
+
+    item, = layer.plot_items.values()
+    assert item.data(SPEC_PATH_ROLE).startswith(str(moved).replace("\\", "/"))
+    thumbnail = item.data(THUMBNAIL_ROLE)
+    assert thumbnail.startswith(str(moved).replace("\\", "/")) and os.path.exists(thumbnail)
+    assert os.path.basename(thumbnail) in item.data(Qt.ToolTipRole)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Setup import Renderizacao
+from Setup.Cache import ColumnCache, cache_root
+from Setup.Datasets import Dataset
+from Setup.Plotagem import complete_spec, prepare_data, render_rgba
+from Setup.Renderizacao import mapped_dataset, mapped_source, render_spec
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(Renderizacao, "_datasets", {})
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame({"x": rng.normal(size=300), "y": rng.normal(size=300), "grupo": rng.choice(["a", "b"], 300)})
+    path = tmp_path / "dados.csv"
+    df.to_csv(path, index=False)
+    return str(tmp_path), str(path)
+
+
+def test_mapped_source_needs_the_column_cache(project):
+    folder, path = project
+    assert not mapped_source(None, folder)
+    assert not mapped_source(path + ".inexistente", folder)
+    assert not mapped_source(path, folder)  # CSV fora do cache: os dados vão junto com o pedido
+
+    ColumnCache(cache_root(folder)).put(path, pd.read_csv(path))
+    assert mapped_source(path, folder)
+
+
+@pytest.mark.parametrize("fields", [{"tipo": "dispersao", "x": "x", "y": "y"},
+                                    {"tipo": "barras", "x": "grupo", "y": "y"},
+                                    {"tipo": "histograma", "x": "x"}])
+def test_render_spec_from_cache_matches_prepared_data(project, fields):
+    folder, path = project
+    df = pd.read_csv(path)
+    ColumnCache(cache_root(folder)).put(path, df)
+    spec = complete_spec({"arquivo": "dados.csv", **fields})
+
+    expected = render_rgba(spec, prepare_data(Dataset(path, df), spec))
+    assert render_spec(spec, path, None, folder) == expected
+
+
+def test_mapped_dataset_is_reused_until_the_file_changes(project):
+    folder, path = project
+    cache = ColumnCache(cache_root(folder))
+    cache.put(path, pd.read_csv(path))
+    dataset = mapped_dataset(path, folder)
+    assert mapped_dataset(path, folder) is dataset
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("1.0,2.0,c\n")
+    with pytest.raises(LookupError):
+        mapped_dataset(path, folder)  # Arquivo novo ainda não está no cache
+
+    cache.put(path, pd.read_csv(path))
+    assert mapped_dataset(path, folder).row_count == 301
+
+
+def test_render_spec_rejects_missing_columns(project):
+    folder, path = project
+    ColumnCache(cache_root(folder)).put(path, pd.read_csv(path))
+    with pytest.raises(ValueError):
+        render_spec(complete_spec({"tipo": "dispersao", "x": "x", "y": "z"}), path, None, folder)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+from PyQt5.QtCore import Qt
+
+from Setup.Perfil import StreamingStats
+from Setup.TabelaModel import DataFrameModel
+
+
+def cell(model, row, col, role=Qt.DisplayRole):
+    return model.data(model.index(row, col), role)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"talhao": ["A", "B", None], "dap": [10.5, np.nan, 12.0], "idade": [1, 2, 3]})
+
+
+def test_cells_come_from_the_columns(df):
+    model = DataFrameModel(df)
+    assert (model.rowCount(), model.columnCount()) == (3, 3)
+    assert [cell(model, 0, col) for col in range(3)] == ["A", "10.5", "1"]
+    assert cell(model, 1, 1) == "nan"
+    assert cell(model, 1, 0, Qt.ToolTipRole) == "B"
+    assert cell(model, 0, 0, Qt.EditRole) is None
+    assert model.dataframe() is df
+
+
+def test_headers(df):
+    model = DataFrameModel(df)
+    assert [model.headerData(col, Qt.Horizontal) for col in range(3)] == ["talhao", "dap", "idade"]
+    assert model.headerData(0, Qt.Vertical) == "1"
+    assert model.headerData(0, Qt.Horizontal, Qt.ToolTipRole) is None
+
+    stats = StreamingStats(df.columns)
+    stats.update(df)
+    model.set_column_stats(stats)
+    assert "Média: 11.25" in model.headerData(1, Qt.Horizontal, Qt.ToolTipRole)
+
+
+def test_repeated_column_names():
+    df = pd.DataFrame([[1, 2], [3, 4]], columns=["x", "x"])
+    model = DataFrameModel(df)
+    assert [cell(model, 1, col) for col in range(2)] == ["3", "4"]
+
+
+def test_chunks_are_shown_as_they_arrive(df):
+    model = DataFrameModel(df.iloc[:0])
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    for start in range(3):
+        model.append_chunk(df.iloc[start:start + 1])
+    model.append_chunk(df.iloc[:0])
+
+    assert inserted == [(0, 0), (1, 1), (2, 2)]
+    assert model.rowCount() == 3
+    assert [cell(model, row, 2) for row in range(3)] == ["1", "2", "3"]
+    assert model.dataframe() is None  # Only the final DataFrame replaces the chunks
+
+    model.set_dataframe(df)
+    assert model.dataframe() is df
+    assert cell(model, 2, 1) == "12.0"